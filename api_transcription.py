@@ -0,0 +1,173 @@
+"""Transkrypcja przez OpenAI Whisper API z równoległym wysyłaniem segmentów.
+
+Jeden klient OpenAI (z pulą połączeń HTTP) jest współdzielony przez wszystkie
+wątki. Segmenty dużego pliku są wysyłane przez ograniczoną pulę wątków,
+błędy 429/5xx są ponawiane z wykładniczym opóźnieniem, a wyniki wracają
+w kolejności segmentów.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 5
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def create_api_client(base_url=None, concurrency=None):
+    """Utwórz klienta OpenAI z pulą połączeń dopasowaną do liczby równoległych żądań"""
+    from openai import OpenAI
+
+    pool_size = max(concurrency or get_concurrency(), 1)
+    try:
+        import httpx
+        http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=httpx.Timeout(600.0, connect=10.0),
+        )
+    except ImportError:
+        http_client = None  # domyślny klient biblioteki openai (też z pulą połączeń)
+    return OpenAI(
+        api_key=os.getenv('OPENAI_API_KEY'),
+        base_url=base_url or os.getenv('OPENAI_BASE_URL') or None,
+        max_retries=0,  # ponawianiem zajmuje się transcribe_with_retry
+        http_client=http_client,
+    )
+
+
+def get_api_client():
+    """Zwróć współdzielonego klienta OpenAI (tworzony raz na proces)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = create_api_client()
+        return _client
+
+
+def get_concurrency():
+    """Liczba równoległych żądań do API (WHISPER_API_CONCURRENCY)"""
+    return max(int(os.getenv('WHISPER_API_CONCURRENCY', DEFAULT_CONCURRENCY)), 1)
+
+
+def is_retryable(error):
+    """Czy błąd API jest przejściowy (limit zapytań, błąd serwera, zerwane połączenie)"""
+    import openai
+
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def _retry_delay(error, attempt, base_delay):
+    """Opóźnienie przed ponowieniem: Retry-After z odpowiedzi lub wykładnicze z losowym rozrzutem"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        retry_after = response.headers.get('retry-after')
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), 60.0)
+        except ValueError:
+            pass
+    return base_delay * (2 ** attempt) * (0.5 + random.random())
+
+
+def transcribe_file(client, wav_file, model=None, temperature=None):
+    """Wyślij jeden plik do API i zwróć wynik w formacie lokalnego Whisper"""
+    with open(wav_file, 'rb') as audio_file:
+        transcript = client.audio.transcriptions.create(
+            model=model or os.getenv('WHISPER_API_MODEL', 'whisper-1'),
+            file=audio_file,
+            response_format="verbose_json",
+            timestamp_granularities=["word"],
+            temperature=float(os.getenv('WHISPER_TEMPERATURE', 0.0)) if temperature is None else temperature,
+        )
+    return convert_api_response(transcript)
+
+
+def convert_api_response(transcript):
+    """Konwertuj format odpowiedzi API do zgodnego z lokalnym Whisper"""
+    segments = []
+    if hasattr(transcript, 'words') and transcript.words:
+        current_segment = {
+            'start': 0,
+            'end': 0,
+            'text': '',
+            'words': []
+        }
+
+        for word in transcript.words:
+            if not current_segment['words']:
+                current_segment['start'] = word.start
+
+            current_segment['end'] = word.end
+            current_segment['text'] += word.word + ' '
+            current_segment['words'].append({
+                'start': word.start,
+                'end': word.end,
+                'word': word.word.strip(),
+                'probability': getattr(word, 'probability', 1.0)
+            })
+
+        if current_segment['words']:
+            current_segment['text'] = current_segment['text'].strip()
+            segments.append(current_segment)
+
+    return {
+        'segments': segments
+    }
+
+
+def transcribe_with_retry(client, wav_file, max_retries=None, base_delay=1.0, **kwargs):
+    """Transkrybuj plik, ponawiając przy błędach 429/5xx"""
+    if max_retries is None:
+        max_retries = int(os.getenv('WHISPER_API_MAX_RETRIES', DEFAULT_MAX_RETRIES))
+    attempt = 0
+    while True:
+        try:
+            return transcribe_file(client, wav_file, **kwargs)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            time.sleep(_retry_delay(e, attempt, base_delay))
+            attempt += 1
+
+
+def transcribe_chunks(chunk_files, client=None, concurrency=None, on_chunk_done=None, on_chunk_result=None,
+                      **kwargs):
+    """Transkrybuj segmenty równolegle i zwróć wyniki w kolejności segmentów.
+
+    on_chunk_result(indeks, wynik) i on_chunk_done(indeks, liczba_gotowych,
+    liczba_wszystkich) są wywoływane w wątku wywołującym po zakończeniu
+    każdego segmentu (np. zapis segmentu w manifeście zadania, postęp).
+    """
+    client = client or get_api_client()
+    concurrency = concurrency or get_concurrency()
+    results = [None] * len(chunk_files)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, max(len(chunk_files), 1))) as pool:
+        futures = {
+            pool.submit(transcribe_with_retry, client, chunk_file, **kwargs): index
+            for index, chunk_file in enumerate(chunk_files)
+        }
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                results[index] = future.result()
+                if on_chunk_result:
+                    on_chunk_result(index, results[index])
+                if on_chunk_done:
+                    on_chunk_done(index, done, len(chunk_files))
+        except BaseException:
+            # Błąd lub przerwanie zadania (np. z on_chunk_done) - nie wysyłaj pozostałych segmentów
+            for future in futures:
+                future.cancel()
+            raise
+
+    return results
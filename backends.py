@@ -0,0 +1,66 @@
+"""Leniwe ładowanie bibliotek rozpoznawania mowy i obsługi audio/wideo.
+
+Przy starcie sprawdzamy jedynie, czy biblioteki są zainstalowane
+(importlib.util.find_spec - bez ich importowania). Import następuje dopiero
+przy pierwszym użyciu albo w tle, jeśli włączono wstępne ładowanie.
+Dzięki temu okno i tryb wsadowy startują bez czekania na torch/whisper,
+openai czy moviepy.
+"""
+import importlib
+import importlib.util
+import os
+import threading
+
+# Nazwa backendu -> moduł, który trzeba zaimportować
+BACKEND_MODULES = {
+    'speech_recognition': 'speech_recognition',
+    'whisper': 'whisper',
+    'faster_whisper': 'faster_whisper',
+    'openai': 'openai',
+    'pydub': 'pydub',
+    'moviepy': 'moviepy.editor',
+    'numpy': 'numpy',
+    'pyaudio': 'pyaudio',
+    'webrtcvad': 'webrtcvad',
+}
+
+
+def is_installed(name):
+    """Czy pakiet jest zainstalowany (bez importowania go)"""
+    top_level = BACKEND_MODULES.get(name, name).split('.')[0]
+    try:
+        return importlib.util.find_spec(top_level) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def load(name):
+    """Zaimportuj moduł backendu (przy pierwszym wywołaniu) i zwróć go"""
+    return importlib.import_module(BACKEND_MODULES.get(name, name))
+
+
+def preload(names, background=True):
+    """Zaimportuj wskazane backendy z wyprzedzeniem, domyślnie w wątku w tle"""
+    names = [n.strip() for n in names if n.strip() and is_installed(n.strip())]
+
+    def run():
+        for name in names:
+            try:
+                load(name)
+            except Exception as e:
+                print(f"Uwaga: nie udało się wstępnie załadować {name}: {e}")
+
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def preload_from_env():
+    """Wstępnie załaduj backendy z BACKEND_PRELOAD (np. "whisper,pydub")"""
+    names = os.getenv('BACKEND_PRELOAD', '').split(',')
+    if any(n.strip() for n in names):
+        return preload(names)
+    return None
@@ -0,0 +1,162 @@
+"""Rozpoznawanie wielu krótkich nagrań jednym przebiegiem lokalnego Whisper.
+
+model.transcribe rozpoznaje jedno nagranie naraz: osobny spektrogram
+i pętla dekodera dla paczki o rozmiarze 1. Przy wielu krótkich plikach
+(poczta głosowa, fragmenty rozmów) koder i dekoder pracują więc daleko
+poniżej możliwości CPU. Tutaj nagrania są dzielone na okna do 30 s (cięte
+w ciszy), okna wszystkich plików trafiają do wspólnych paczek whisper.decode,
+a czasy słów (whisper.timing) są liczone dla każdego okna i przesuwane
+o jego początek, więc wracają na oś czasu własnego pliku.
+
+Okna są dekodowane bez kontekstu poprzedniego okna i bez zmiany temperatury;
+okno, którego wynik wygląda na nieudany (zbyt powtarzalny tekst lub niska
+pewność - te same progi co w model.transcribe), jest rozpoznawane ponownie
+zwykłą metodą.
+"""
+import numpy as np
+
+from censor_render import read_wav_samples
+from chunking import ENERGY_WINDOW_MS, DEFAULT_SEARCH_S, plan_chunks, window_energy
+
+SAMPLE_RATE = 16000  # whisper.audio.SAMPLE_RATE
+WINDOW_S = 30  # whisper.audio.CHUNK_LENGTH
+MAX_FILE_S = 120  # dłuższe nagrania lepiej rozpoznać zwykle (z kontekstem między oknami)
+MAX_WINDOWS_PER_PASS = 16  # okna w jednym przebiegu dekodera (ogranicza zużycie pamięci)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def load_audio(wav_file):
+    """Nagranie jako mono float32 16 kHz; plik 16 kHz bez ffmpeg, inne przez whisper.load_audio"""
+    samples, params = read_wav_samples(wav_file)
+    if params.framerate != SAMPLE_RATE:
+        import whisper
+        return whisper.load_audio(wav_file)
+    scale = float(1 << (8 * params.sampwidth - 1))
+    return (samples.astype(np.float32).mean(axis=1) / scale).astype(np.float32)
+
+
+def plan_windows(audio):
+    """Zakresy próbek [start, end) okien do WINDOW_S, cięte w najcichszym miejscu przed granicą"""
+    window_frames = SAMPLE_RATE * ENERGY_WINDOW_MS // 1000
+    energy = window_energy(audio[:, None], window_frames)
+    return plan_chunks(energy, window_frames, len(audio), WINDOW_S * SAMPLE_RATE,
+                       overlap_frames=0, search_frames=int(DEFAULT_SEARCH_S * SAMPLE_RATE))
+
+
+def get_tokenizer(model, language):
+    from whisper.tokenizer import get_tokenizer as whisper_tokenizer
+    try:
+        return whisper_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                 language=language, task='transcribe')
+    except (TypeError, AttributeError):  # starsze wersje openai-whisper
+        return whisper_tokenizer(model.is_multilingual, language=language, task='transcribe')
+
+
+def log_mel(audio, n_mels):
+    from whisper.audio import log_mel_spectrogram, pad_or_trim
+    if n_mels == 80:
+        return log_mel_spectrogram(pad_or_trim(audio))
+    return log_mel_spectrogram(pad_or_trim(audio), n_mels)
+
+
+def split_segments(tokens, tokenizer, duration, precision):
+    """Tokeny wyniku dekodowania -> segmenty {'seek', 'start', 'end', 'text', 'tokens'} według znaczników czasu"""
+    segments = []
+    text_tokens = []
+    start = 0.0
+    for token in tokens:
+        if token >= tokenizer.timestamp_begin:
+            time = (token - tokenizer.timestamp_begin) * precision
+            if text_tokens:
+                segments.append({'seek': 0, 'start': start, 'end': time,
+                                 'text': tokenizer.decode(text_tokens), 'tokens': text_tokens})
+                text_tokens = []
+            start = time
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+    if text_tokens:
+        segments.append({'seek': 0, 'start': start, 'end': duration,
+                         'text': tokenizer.decode(text_tokens), 'tokens': text_tokens})
+    return segments
+
+
+def add_word_timestamps(model, tokenizer, segments, mel, num_frames):
+    from whisper.timing import add_word_timestamps as whisper_word_timestamps
+    try:
+        whisper_word_timestamps(segments=segments, model=model, tokenizer=tokenizer, mel=mel,
+                                num_frames=num_frames, last_speech_timestamp=0.0)
+    except TypeError:  # starsze wersje openai-whisper (bez last_speech_timestamp)
+        whisper_word_timestamps(segments=segments, model=model, tokenizer=tokenizer, mel=mel,
+                                num_frames=num_frames)
+
+
+def is_silence(result):
+    """Czy w oknie nie ma mowy (progi jak w model.transcribe)"""
+    return result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def decoding_failed(result):
+    """Czy wynik okna wygląda na nieudany: zapętlony tekst lub niska pewność"""
+    return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+
+def transcribe_window(model, audio, language):
+    """Jedno okno zwykłą metodą (model.transcribe) - dla okien z nieudanym wynikiem paczki"""
+    result = model.transcribe(audio, language=language, word_timestamps=True,
+                              fp16=model.device.type == 'cuda')
+    return result['segments']
+
+
+def transcribe_files(model, wav_files, language='pl'):
+    """Rozpoznaj nagrania wspólnymi paczkami okien; zwraca listę {'segments': [...]} w kolejności plików"""
+    import torch
+    import whisper
+    from whisper.audio import HOP_LENGTH
+
+    n_mels = getattr(model.dims, 'n_mels', 80)
+    precision = WINDOW_S / model.dims.n_audio_ctx
+    tokenizer = get_tokenizer(model, language)
+    options = whisper.DecodingOptions(language=language, task='transcribe', fp16=model.device.type == 'cuda')
+
+    # (plik, początek okna w s, próbki okna)
+    windows = []
+    for index, wav_file in enumerate(wav_files):
+        audio = load_audio(wav_file)
+        for start, end in plan_windows(audio):
+            if end - start < HOP_LENGTH:
+                continue
+            windows.append((index, start / SAMPLE_RATE, audio[start:end]))
+
+    outputs = [{'segments': []} for _ in wav_files]
+    for first in range(0, len(windows), MAX_WINDOWS_PER_PASS):
+        group = windows[first:first + MAX_WINDOWS_PER_PASS]
+        mels = [log_mel(samples, n_mels) for _, _, samples in group]
+        with torch.no_grad():
+            results = whisper.decode(model, torch.stack(mels).to(model.device), options)
+
+        for (index, offset, samples), mel, result in zip(group, mels, results):
+            duration = len(samples) / SAMPLE_RATE
+            if is_silence(result):
+                segments = []
+            elif decoding_failed(result):
+                segments = transcribe_window(model, samples, language)
+            else:
+                segments = split_segments(result.tokens, tokenizer, duration, precision)
+                if segments:
+                    add_word_timestamps(model, tokenizer, segments, mel.to(model.device),
+                                        len(samples) // HOP_LENGTH)
+            outputs[index]['segments'].extend(shift_segment(s, offset) for s in segments)
+
+    for output in outputs:
+        for i, segment in enumerate(output['segments']):
+            segment['id'] = i
+    return outputs
+
+
+def shift_segment(segment, offset):
+    """Segment okna przesunięty na oś czasu całego pliku"""
+    shifted = dict(segment, start=segment['start'] + offset, end=segment['end'] + offset)
+    shifted['words'] = [dict(w, start=w['start'] + offset, end=w['end'] + offset) for w in segment.get('words') or []]
+    return shifted
@@ -0,0 +1,71 @@
+"""Benchmark: sekwencyjne vs równoległe wysyłanie segmentów do (udawanego) Whisper API.
+
+Uruchom: python benchmarks/bench_api_upload.py --chunks 16 --concurrency 4 --latency 0.5
+
+Korzysta z lokalnego serwera z fake_transcription_server.py, więc nie wymaga
+klucza API. Sprawdza też, czy wyniki wracają w kolejności segmentów mimo
+symulowanych błędów 429/5xx.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_transcription import create_api_client, transcribe_chunks  # noqa: E402
+from fake_transcription_server import start_server  # noqa: E402
+
+
+def make_chunks(directory, count, base_seconds=2):
+    """Utwórz segmenty WAV o różnej długości (cisza 16 kHz mono)"""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"chunk_{i}.wav")
+        with wave.open(path, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(b'\x00\x00' * 16000 * (base_seconds + i))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunks', type=int, default=16)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    os.environ.setdefault('OPENAI_API_KEY', 'fake-key')
+    server = start_server(latency=args.latency, error_rate=args.error_rate)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        chunks = make_chunks(tmp, args.chunks)
+        timings = {}
+        for concurrency in (1, args.concurrency):
+            client = create_api_client(base_url=server.base_url, concurrency=concurrency)
+            server.max_in_flight = 0
+            t0 = time.perf_counter()
+            results = transcribe_chunks(chunks, client=client, concurrency=concurrency, base_delay=0.05)
+            timings[concurrency] = time.perf_counter() - t0
+
+            # Segment i trwa (2 + i) s -> (2 + i) * 2 słów; sprawdza kolejność wyników
+            counts = [len(r['segments'][0]['words']) for r in results]
+            in_order = counts == [(2 + i) * 2 for i in range(args.chunks)]
+            print(f"równolegle={concurrency}: {timings[concurrency]:.2f}s, "
+                  f"maks. żądań naraz: {server.max_in_flight}, kolejność OK: {in_order}")
+            if not in_order:
+                sys.exit(1)
+
+    print(f"Żądania: {server.requests}, symulowane błędy: {server.errors}")
+    print(f"Przyspieszenie: {timings[1] / timings[args.concurrency]:.1f}x")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
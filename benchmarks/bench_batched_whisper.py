@@ -0,0 +1,66 @@
+"""Benchmark: krótkie nagrania lokalnym Whisper - po kolei i we wspólnych paczkach okien.
+
+Uruchom: python benchmarks/bench_batched_whisper.py katalog_z_wav/ --model base --batch 8
+
+Katalog to np. poczta głosowa lub fragmenty rozmów (pliki do 2 min). Każdy
+plik jest rozpoznawany zwykłym model.transcribe, a potem przez
+batched_whisper.transcribe_files w grupach po --batch plików. Wynik to
+liczba nagrań na godzinę w obu trybach i zgodność tekstu (słowa wspólne
+według difflib). Ładowanie modelu nie wlicza się do czasu.
+"""
+import argparse
+import difflib
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batched_whisper import MAX_FILE_S, transcribe_files  # noqa: E402
+from recognizers import audio_duration  # noqa: E402
+from word_matcher import transcript_tokens  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('corpus', help="katalog z krótkimi plikami WAV")
+    parser.add_argument('--model', default='base')
+    parser.add_argument('--batch', type=int, default=8, help="liczba plików w jednej paczce")
+    args = parser.parse_args()
+
+    files = sorted(f for f in glob.glob(os.path.join(args.corpus, '*.wav')) if audio_duration(f) <= MAX_FILE_S)
+    if not files:
+        sys.exit(f"Brak plików WAV do {MAX_FILE_S}s w {args.corpus}")
+    total = sum(audio_duration(f) for f in files)
+    print(f"Korpus: {len(files)} plików, {total / 60:.1f} min, model {args.model}, rdzenie: {os.cpu_count()}")
+
+    import whisper
+    model = whisper.load_model(args.model, device='cpu')
+    model.transcribe(files[0], language='pl', fp16=False)  # rozgrzewka
+
+    t0 = time.perf_counter()
+    sequential = [model.transcribe(f, language='pl', word_timestamps=True, fp16=False) for f in files]
+    elapsed_seq = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batched = []
+    for first in range(0, len(files), args.batch):
+        batched += transcribe_files(model, files[first:first + args.batch])
+    elapsed_batch = time.perf_counter() - t0
+
+    for name, elapsed in (("po kolei", elapsed_seq), (f"paczki po {args.batch}", elapsed_batch)):
+        print(f"{name:>16}: {elapsed:7.1f}s, {3600 * len(files) / elapsed:7.0f} nagrań/h, RTF {elapsed / total:.3f}")
+    print(f"Przyspieszenie: {elapsed_seq / elapsed_batch:.2f}x")
+
+    same = words = 0
+    for a, b in zip(sequential, batched):
+        ref = [t[0] for t in transcript_tokens(a['segments'])]
+        hyp = [t[0] for t in transcript_tokens(b['segments'])]
+        same += sum(block.size for block in difflib.SequenceMatcher(None, ref, hyp, autojunk=False).get_matching_blocks())
+        words += len(ref)
+    print(f"Zgodność słów z trybem po kolei: {same}/{words} ({100 * same / max(words, 1):.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
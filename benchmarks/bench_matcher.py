@@ -0,0 +1,80 @@
+"""Benchmark: wyszukiwanie listy słów w transkrypcji - pętla po słowach (stara metoda) vs WordMatcher.
+
+Uruchom: python benchmarks/bench_matcher.py --words 100000 --terms 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_matcher import WordMatcher  # noqa: E402
+
+SYLLABLES = ['ka', 'to', 'mi', 'prze', 'sło', 'wo', 'rze', 'cz', 'ną', 'ły', 'pa', 'de', 'gó', 'ra']
+
+
+def random_word(rnd):
+    """Losowe słowo złożone z polskich sylab"""
+    return ''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(1, 4)))
+
+
+def make_transcript(word_count, rnd):
+    """Syntetyczna transkrypcja: segmenty po 20 słów, słowo co 0,4 s"""
+    segments = []
+    for first in range(0, word_count, 20):
+        words = [{'word': ' ' + random_word(rnd), 'start': i * 0.4, 'end': i * 0.4 + 0.3}
+                 for i in range(first, min(first + 20, word_count))]
+        segments.append({'start': words[0]['start'], 'end': words[-1]['end'],
+                         'text': ''.join(w['word'] for w in words), 'words': words})
+    return segments
+
+
+def legacy_find(segments, terms):
+    """Dotychczasowe podejście: osobny przebieg (podciągi znaków) dla każdego słowa"""
+    hits = []
+    for term in terms:
+        word_lower = term.lower()
+        for segment in segments:
+            if word_lower in segment['text'].lower():
+                for word_info in segment['words']:
+                    if word_lower in word_info['word'].lower():
+                        hits.append((word_info['start'], word_info['end']))
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=100000, help="liczba słów w transkrypcji")
+    parser.add_argument('--terms', type=int, default=5000, help="liczba słów/fraz na liście")
+    parser.add_argument('--phrases', type=float, default=0.2, help="odsetek fraz dwuwyrazowych")
+    parser.add_argument('--skip-legacy', action='store_true')
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    segments = make_transcript(args.words, rnd)
+    terms = [random_word(rnd) + (' ' + random_word(rnd) if rnd.random() < args.phrases else '')
+             for _ in range(args.terms)]
+
+    t0 = time.perf_counter()
+    matcher = WordMatcher(terms)
+    build_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    hits = matcher.find_in_segments(segments)
+    match_time = time.perf_counter() - t0
+    print(f"WordMatcher: budowa {build_time:.3f}s, wyszukiwanie {match_time:.3f}s, trafień: {len(hits)}")
+
+    if args.skip_legacy:
+        return
+    # Stara metoda jest liniowa względem liczby słów na liście - mierzymy na próbce i ekstrapolujemy
+    sample = terms[:min(len(terms), 200)]
+    t0 = time.perf_counter()
+    legacy_find(segments, sample)
+    legacy_time = (time.perf_counter() - t0) * len(terms) / len(sample)
+    print(f"Pętla po słowach (ekstrapolacja z {len(sample)} słów): {legacy_time:.1f}s")
+    print(f"Przyspieszenie: {legacy_time / (build_time + match_time):.0f}x")
+
+
+if __name__ == '__main__':
+    main()
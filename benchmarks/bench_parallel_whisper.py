@@ -0,0 +1,54 @@
+"""Benchmark: skalowanie równoległego rozpoznawania lokalnym Whisper na CPU.
+
+Uruchom: python benchmarks/bench_parallel_whisper.py nagranie.wav --model small --workers 1,2,4
+
+Dla każdej liczby procesów pula jest uruchamiana od nowa i rozgrzewana na
+krótkim fragmencie (ładowanie modelu nie wlicza się do pomiaru), po czym
+mierzony jest czas rozpoznania całego pliku. Wymaga openai-whisper i torch.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parallel_whisper import ParallelWhisper  # noqa: E402
+from wav_stream import copy_frames, wav_params  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('wav_file', help="nagranie WAV (najlepiej 16 kHz mono, co najmniej kilka minut)")
+    parser.add_argument('--model', default='small')
+    parser.add_argument('--workers', default='1,2,4', help="liczby procesów oddzielone przecinkami")
+    parser.add_argument('--threads', type=int, help="wątki torch na proces (domyślnie rdzenie / procesy)")
+    args = parser.parse_args()
+
+    params = wav_params(args.wav_file)
+    duration = params.nframes / params.framerate
+    print(f"Plik: {duration / 60:.1f} min, model {args.model}, rdzenie: {os.cpu_count()}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        warmup = os.path.join(tmp, 'warmup.wav')
+        copy_frames(args.wav_file, warmup, 0, min(params.nframes, params.framerate * 5))
+
+        baseline = None
+        for workers in [int(w) for w in args.workers.split(',')]:
+            engine = ParallelWhisper(args.model, workers, args.threads)
+            try:
+                engine.warm_up(warmup)
+                t0 = time.perf_counter()
+                result = engine.transcribe(args.wav_file)
+                elapsed = time.perf_counter() - t0
+            finally:
+                engine.shutdown()
+            words = sum(len(s.get('words') or []) for s in result['segments'])
+            baseline = baseline or elapsed
+            print(f"{workers:>2} proc. x {engine.threads_per_worker:>2} wątków: {elapsed:7.1f}s, "
+                  f"RTF {elapsed / duration:.3f}, przyspieszenie {baseline / elapsed:.2f}x, słów: {words}")
+
+
+if __name__ == '__main__':
+    main()
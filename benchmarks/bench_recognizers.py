@@ -0,0 +1,104 @@
+"""Benchmark: szybkość (RTF) i dokładność czasów słów metod rozpoznawania mowy.
+
+Uruchom: python benchmarks/bench_recognizers.py korpus/ --model small --backends faster-whisper,whisper
+
+Korpus to katalog z plikami WAV. Obok nagranie.wav może leżeć nagranie.json
+z referencją {"words": [{"word", "start", "end"}, ...]} (np. z ręcznie
+poprawionej transkrypcji). Bez referencji wzorcem jest wynik pierwszej
+metody z --backends. Słowa są dopasowywane po znormalizowanym tekście
+(difflib), a dla dopasowanych liczony jest błąd początku i końca słowa.
+Ładowanie modelu (rozgrzewka na pierwszym pliku) nie wlicza się do czasu.
+"""
+import argparse
+import difflib
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recognizers import RECOGNIZERS, audio_duration, create_recognizer  # noqa: E402
+from word_matcher import transcript_tokens  # noqa: E402
+
+
+def load_reference(wav_file):
+    """Tokeny referencji z pliku .json obok nagrania (albo None)"""
+    path = os.path.splitext(wav_file)[0] + '.json'
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return transcript_tokens([{'start': 0.0, 'end': 0.0, 'text': '', 'words': json.load(f)['words']}])
+
+
+def compare(reference, hypothesis):
+    """Dopasuj tokeny; zwraca (liczba dopasowanych, błędy początków, błędy końców)"""
+    matcher = difflib.SequenceMatcher(None, [t[0] for t in reference], [t[0] for t in hypothesis], autojunk=False)
+    start_errors, end_errors = [], []
+    for block in matcher.get_matching_blocks():
+        for k in range(block.size):
+            ref, hyp = reference[block.a + k], hypothesis[block.b + k]
+            start_errors.append(abs(ref[1] - hyp[1]))
+            end_errors.append(abs(ref[2] - hyp[2]))
+    return len(start_errors), start_errors, end_errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('corpus', help="katalog z plikami WAV (i opcjonalnymi referencjami .json)")
+    parser.add_argument('--model', default='small')
+    parser.add_argument('--backends', default='faster-whisper,whisper',
+                        help=f"metody oddzielone przecinkami ({', '.join(RECOGNIZERS)})")
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.corpus, '*.wav')))
+    if not files:
+        sys.exit(f"Brak plików WAV w {args.corpus}")
+    names = [n.strip() for n in args.backends.split(',') if n.strip()]
+    missing = [n for n in names if not RECOGNIZERS[n].available()]
+    if missing:
+        sys.exit(f"Niedostępne metody: {', '.join(missing)}")
+
+    total = sum(audio_duration(f) for f in files)
+    print(f"Korpus: {len(files)} plików, {total / 60:.1f} min, model {args.model}, rdzenie: {os.cpu_count()}")
+
+    outputs = {}
+    for name in names:
+        recognizer = create_recognizer(name, args.model, log=lambda message: None)
+        recognizer.transcribe(files[0])  # rozgrzewka: załadowanie modelu
+        elapsed = 0.0
+        outputs[name] = {}
+        for wav_file in files:
+            t0 = time.perf_counter()
+            result = recognizer.transcribe(wav_file)
+            elapsed += time.perf_counter() - t0
+            outputs[name][wav_file] = transcript_tokens(result['segments'])
+        print(f"{name:>15}: {elapsed:7.1f}s, RTF {elapsed / total:.3f}")
+
+    references = {f: load_reference(f) for f in files}
+    source = "referencja .json" if all(references.values()) else f"referencja .json lub wynik {names[0]}"
+    print(f"\nCzasy słów względem: {source}")
+    for name in names:
+        matched = ref_words = 0
+        start_errors, end_errors = [], []
+        for wav_file in files:
+            reference = references[wav_file] or outputs[names[0]][wav_file]
+            count, starts, ends = compare(reference, outputs[name][wav_file])
+            matched += count
+            ref_words += len(reference)
+            start_errors += starts
+            end_errors += ends
+        if not matched:
+            print(f"{name:>15}: brak dopasowanych słów")
+            continue
+        print(f"{name:>15}: dopasowano {matched}/{ref_words} słów ({100 * matched / max(ref_words, 1):.0f}%), "
+              f"|Δ początku| śr. {1000 * statistics.mean(start_errors):.0f} ms "
+              f"(mediana {1000 * statistics.median(start_errors):.0f} ms), "
+              f"|Δ końca| śr. {1000 * statistics.mean(end_errors):.0f} ms "
+              f"(mediana {1000 * statistics.median(end_errors):.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Benchmark: nakładanie cenzury przez pydub (stara metoda) vs jednoprzebiegowy renderer NumPy.
+
+Uruchom: python benchmarks/bench_render.py --minutes 10 --hits 300
+
+Trafienia są wyrównane do 10 ms (441 ramek przy 44,1 kHz), dzięki czemu stara
+metoda nie przesuwa nagrania o pojedyncze ramki i wyniki można porównać próbka
+po próbce. Zgodność próbka po próbce dotyczy tylko nagrań 44,1 kHz; dla innych
+częstotliwości sprawdzana jest opisana w censor_render różnica: stara metoda
+zmienia częstotliwość lub długość nagrania, renderer je zachowuje.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from censor_effects import EFFECTS  # noqa: E402
+from censor_render import read_wav_samples, render_censored_wav, write_wav_samples  # noqa: E402
+from wav_stream import censor_wav_streaming  # noqa: E402
+
+
+def legacy_apply_censorship(wav_file, censored_segments, output_file):
+    """Dotychczasowa implementacja z main.py (pydub, O(k*N))"""
+    from pydub import AudioSegment
+    from pydub.generators import Sine
+
+    audio = AudioSegment.from_wav(wav_file)
+    beep = Sine(1000).to_audio_segment(duration=1000)
+    for segment in reversed(censored_segments):
+        start_ms = int(segment['start'] * 1000)
+        end_ms = min(int(segment['end'] * 1000), len(audio))
+        if start_ms < end_ms:
+            word_duration = end_ms - start_ms
+            beep_adjusted = beep[:word_duration] if word_duration < len(beep) else beep
+            audio = audio[:start_ms] + beep_adjusted + audio[end_ms:]
+    audio.export(output_file, format='wav')
+
+
+def make_input(path, minutes, channels, rate=44100):
+    """Utwórz syntetyczny plik WAV (szum 16 bit)"""
+    class Params:
+        nchannels = channels
+        sampwidth = 2
+        framerate = rate
+    frames = int(minutes * 60 * rate)
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-8000, 8000, size=(frames, channels), dtype=np.int16)
+    write_wav_samples(path, samples, Params)
+
+
+def make_hits(minutes, count):
+    """Losowe, nienakładające się trafienia krótsze niż 1 s, wyrównane do 10 ms"""
+    rnd = random.Random(0)
+    slots = sorted(rnd.sample(range(int(minutes * 60 * 100) - 100), count))
+    hits = []
+    last_end = 0
+    for slot in slots:
+        start = max(slot, last_end)
+        end = start + rnd.randint(10, 90)
+        # +0,5 ms chroni przed zaokrągleniem w dół przy int(sekundy * 1000)
+        hits.append({'start': (start * 10 + 0.5) / 1000, 'end': (end * 10 + 0.5) / 1000, 'word': 'x'})
+        last_end = end
+    return hits
+
+
+def check_other_rates(tmp, rates=(16000, 22050, 48000)):
+    """Nagrania spoza 44,1 kHz: renderer zachowuje format, stara metoda go zmieniała (bez zgodności próbek)"""
+    ok = True
+    for rate in rates:
+        src = os.path.join(tmp, f'input_{rate}.wav')
+        make_input(src, 0.25, 1, rate=rate)
+        hits = make_hits(0.25, 10)
+        old_out = os.path.join(tmp, f'old_{rate}.wav')
+        new_out = os.path.join(tmp, f'new_{rate}.wav')
+        legacy_apply_censorship(src, hits, old_out)
+        render_censored_wav(src, hits, new_out)
+        with wave.open(src) as wf, wave.open(old_out) as old, wave.open(new_out) as new:
+            source = (wf.getframerate(), wf.getnframes())
+            before = (old.getframerate(), old.getnframes())
+            after = (new.getframerate(), new.getnframes())
+        print(f"{rate} Hz: wejście {source}, pydub {before}, renderer {after} (częstotliwość, ramki)")
+        # Poniżej 44,1 kHz pydub przepróbkowywał całe nagranie do częstotliwości beepa
+        expected_old_rate = max(rate, 44100)
+        if after != source or before[0] != expected_old_rate:
+            print(f"{rate} Hz: wynik niezgodny z opisem w censor_render!")
+            ok = False
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--minutes', type=float, default=10)
+    parser.add_argument('--hits', type=int, default=300)
+    parser.add_argument('--channels', type=int, default=2)
+    parser.add_argument('--skip-legacy', action='store_true', help="pomiń pomiar starej metody")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'input.wav')
+        new_out = os.path.join(tmp, 'new.wav')
+        stream_out = os.path.join(tmp, 'stream.wav')
+        old_out = os.path.join(tmp, 'old.wav')
+        make_input(src, args.minutes, args.channels)
+        hits = make_hits(args.minutes, args.hits)
+
+        t0 = time.perf_counter()
+        render_censored_wav(src, hits, new_out)
+        new_time = time.perf_counter() - t0
+        print(f"Renderer NumPy: {new_time:.3f}s ({len(hits)} trafień, {args.minutes} min audio)")
+
+        t0 = time.perf_counter()
+        censor_wav_streaming(src, hits, stream_out)
+        print(f"Renderer strumieniowy (bloki 10 s): {time.perf_counter() - t0:.3f}s")
+        stream_samples, _ = read_wav_samples(stream_out)
+        if not np.array_equal(stream_samples, read_wav_samples(new_out)[0]):
+            print("Renderer strumieniowy daje inny wynik niż renderer w pamięci!")
+            sys.exit(1)
+
+        # Efekty z censor_effects (ton, szum, zmiana głosu) z przenikaniem na krawędziach; każdy musi dać
+        # ten sam wynik w pamięci i blok po bloku (także przy blokach krótszych niż trafienie)
+        effect_out = os.path.join(tmp, 'effect.wav')
+        for effect in EFFECTS:
+            t0 = time.perf_counter()
+            render_censored_wav(src, hits, effect_out, effect=effect)
+            print(f"Efekt {effect}: {time.perf_counter() - t0:.3f}s")
+            censor_wav_streaming(src, hits, stream_out, block_seconds=0.37, effect=effect)
+            if not np.array_equal(read_wav_samples(stream_out)[0], read_wav_samples(effect_out)[0]):
+                print(f"Efekt {effect}: renderer strumieniowy daje inny wynik niż renderer w pamięci!")
+                sys.exit(1)
+
+        if args.skip_legacy:
+            return
+
+        t0 = time.perf_counter()
+        legacy_apply_censorship(src, hits, old_out)
+        old_time = time.perf_counter() - t0
+        print(f"pydub (stara metoda): {old_time:.3f}s")
+        print(f"Przyspieszenie: {old_time / new_time:.1f}x")
+
+        new_samples, _ = read_wav_samples(new_out)
+        old_samples, _ = read_wav_samples(old_out)
+        identical = new_samples.shape == old_samples.shape and np.array_equal(new_samples, old_samples)
+        print(f"Wynik identyczny próbka po próbce (44,1 kHz): {'TAK' if identical else 'NIE'}")
+        if not identical or not check_other_rates(tmp):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark czasu startu: import potoku cenzury i aplikacji w świeżym procesie.
+
+Uruchom: python benchmarks/bench_startup.py --max-seconds 1.0
+
+Kończy się kodem 1, jeśli import trwa dłużej niż --max-seconds albo jeśli
+przy starcie zostanie zaimportowana któraś z ciężkich bibliotek (torch,
+whisper, openai, moviepy, pydub, speech_recognition) - powinny być ładowane
+dopiero przy pierwszym użyciu.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['torch', 'whisper', 'openai', 'moviepy', 'pydub', 'speech_recognition']
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeats):
+    """Najlepszy z kilku pomiarów czasu importu modułu w nowym interpreterze"""
+    best = None
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-seconds', type=float, default=1.0)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--modules', nargs='+', default=['pipeline', 'cli', 'main'])
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        try:
+            result = measure(module, args.repeats)
+        except subprocess.CalledProcessError as e:
+            print(f"{module}: import nieudany\n{e.stderr}")
+            failed = True
+            continue
+        status = "OK"
+        if result['seconds'] > args.max_seconds:
+            status = f"ZA WOLNO (limit {args.max_seconds:.2f}s)"
+            failed = True
+        if result['loaded']:
+            status = f"ZAIMPORTOWANO PRZY STARCIE: {', '.join(result['loaded'])}"
+            failed = True
+        print(f"{module}: {result['seconds'] * 1000:.0f} ms - {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
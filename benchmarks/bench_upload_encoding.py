@@ -0,0 +1,57 @@
+"""Benchmark: rozmiar wysyłki i liczba żądań do Whisper API dla formatów wysyłki.
+
+Uruchom: python benchmarks/bench_upload_encoding.py nagranie.wav --formats wav,flac,mp3,opus --limit-mb 20
+
+Dla każdego formatu nagranie jest kodowane tak, jak przed wysyłką do API
+(mono 16 kHz, upload_encoding.prepare_upload), a wynik porównywany z wysyłką
+surowego WAV dzielonego według bajtów WAV (chunking.split_wav_on_silence).
+Wymaga ffmpeg; nie wysyła niczego do API.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunking import split_wav_on_silence  # noqa: E402
+from upload_encoding import UPLOAD_FORMATS, prepare_upload  # noqa: E402
+from wav_stream import wav_params  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('wav_file')
+    parser.add_argument('--formats', default='flac,mp3,opus', help=f"formaty ({', '.join(UPLOAD_FORMATS)})")
+    parser.add_argument('--limit-mb', type=float, default=20.0, help="limit rozmiaru żądania (MAX_FILE_SIZE_MB)")
+    args = parser.parse_args()
+
+    params = wav_params(args.wav_file)
+    duration = params.nframes / params.framerate
+    limit = int(args.limit_mb * 1024 * 1024)
+    wav_mb = os.path.getsize(args.wav_file) / (1024 * 1024)
+    print(f"Plik: {duration / 60:.1f} min, {params.framerate} Hz, kanały: {params.nchannels}, {wav_mb:.1f}MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        chunks = split_wav_on_silence(args.wav_file, limit, out_dir=tmp)
+        elapsed = time.perf_counter() - t0
+        sent = sum(os.path.getsize(c['path']) for c in chunks if c['path'] != args.wav_file)
+        sent = sent or os.path.getsize(args.wav_file)
+        print(f"{'WAV (bez zmian)':>16}: {sent / (1024*1024):7.1f}MB, żądań: {len(chunks):3d}, przygotowanie {elapsed:5.1f}s")
+        baseline = sent
+
+        for fmt in [f.strip() for f in args.formats.split(',') if f.strip()]:
+            t0 = time.perf_counter()
+            chunks = prepare_upload(args.wav_file, limit, fmt, tmp)
+            elapsed = time.perf_counter() - t0
+            sent = sum(os.path.getsize(c['path']) for c in chunks)
+            for chunk in chunks:
+                os.unlink(chunk['path'])
+            print(f"{fmt:>16}: {sent / (1024*1024):7.1f}MB, żądań: {len(chunks):3d}, przygotowanie {elapsed:5.1f}s, "
+                  f"{baseline / sent:.1f}x mniej danych")
+
+
+if __name__ == '__main__':
+    main()
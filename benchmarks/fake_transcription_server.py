@@ -0,0 +1,119 @@
+"""Lokalny serwer udający endpoint /v1/audio/transcriptions OpenAI.
+
+Pozwala testować wysyłanie segmentów (równoległość, ponawianie, kolejność
+wyników) bez klucza API i bez kosztów. Odpowiada w formacie verbose_json
+z jednym "słowem" co pół sekundy nagrania.
+
+Uruchom: python benchmarks/fake_transcription_server.py --port 8765 --latency 0.5 --error-rate 0.1
+Następnie ustaw OPENAI_BASE_URL=http://127.0.0.1:8765/v1 i dowolny OPENAI_API_KEY.
+"""
+import argparse
+import io
+import json
+import random
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORD_STEP = 0.5  # s
+
+
+def wav_duration_from_body(body):
+    """Znajdź plik WAV w treści multipart i odczytaj jego długość z nagłówka"""
+    start = body.find(b'RIFF')
+    if start < 0:
+        return 0.0
+    try:
+        with wave.open(io.BytesIO(body[start:]), 'rb') as wf:
+            return wf.getnframes() / wf.getframerate()
+    except (wave.Error, EOFError):
+        return 0.0
+
+
+def fake_transcript(duration):
+    """Odpowiedź verbose_json: słowa 'slowoN' co WORD_STEP sekund"""
+    words = []
+    t = 0.0
+    while t + WORD_STEP <= duration + 1e-9:
+        words.append({'word': f"slowo{len(words)}", 'start': round(t, 3), 'end': round(t + WORD_STEP * 0.8, 3)})
+        t += WORD_STEP
+    return {
+        'task': 'transcribe',
+        'language': 'polish',
+        'duration': duration,
+        'text': ' '.join(w['word'] for w in words),
+        'words': words,
+    }
+
+
+class TranscriptionHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        with server.stats_lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+            if not self.path.endswith('/audio/transcriptions'):
+                self._send(404, {'error': {'message': 'not found'}})
+            elif server.rng.random() < server.error_rate:
+                with server.stats_lock:
+                    server.errors += 1
+                status = server.rng.choice([429, 500, 503])
+                self._send(status, {'error': {'message': f'symulowany błąd {status}'}}, retry_after='0')
+            else:
+                self._send(200, fake_transcript(wav_duration_from_body(body)))
+        finally:
+            with server.stats_lock:
+                server.in_flight -= 1
+
+    def _send(self, status, payload, retry_after=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if retry_after is not None:
+            self.send_header('Retry-After', retry_after)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, latency=0.2, error_rate=0.0, seed=0):
+    """Uruchom serwer w wątku w tle i zwróć go (adres: server.base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), TranscriptionHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.rng = random.Random(seed)
+    server.stats_lock = threading.Lock()
+    server.requests = server.errors = server.in_flight = server.max_in_flight = 0
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokalny serwer udający Whisper API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help="opóźnienie odpowiedzi w sekundach")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="odsetek odpowiedzi 429/5xx")
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.latency, args.error_rate)
+    print(f"Serwer działa: OPENAI_BASE_URL={server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
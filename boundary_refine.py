@@ -0,0 +1,150 @@
+"""Dopasowanie granic trafień do nagrania bez ponownego rozpoznawania.
+
+Czasy słów z Whisper (zwłaszcza modeli tiny/base) bywają przesunięte
+o 50-200 ms, przez co z cenzury "wystają" sylaby. Dla każdego trafienia
+czytany jest tylko krótki fragment nagrania wokół jego początku i końca,
+liczona jest obwiednia energii (średnia kwadratu w oknie 10 ms, wektorowo
+przez sumy skumulowane), a granica jest przesuwana do najbliższego słowu
+cichego miejsca w ograniczonym oknie wyszukiwania - głównie na zewnątrz
+słowa (wystająca sylaba jest gorsza niż kawałek ciszy pod beepem).
+Na koniec granica trafia w najbliższe przejście przez zero (bez trzasków)
+i jest poszerzana o margines z polityki dopełnienia.
+
+Tryby: energy (energia + przejście przez zero), zero (tylko przejście przez
+zero przy czasie z rozpoznawania) i off (bez dopasowania, sam margines).
+"""
+import wave
+
+import numpy as np
+
+from censor_render import bytes_to_samples
+
+REFINE_MODES = ('energy', 'zero', 'off')
+DEFAULT_MODE = 'energy'
+SEARCH_MS = 150  # jak daleko na zewnątrz słowa szukamy ciszy
+INWARD_MS = 40  # jak daleko do wnętrza słowa wolno przesunąć granicę
+ENVELOPE_MS = 10
+QUIET_DB = 6.0  # okna do tyle ponad minimum w oknie wyszukiwania uznajemy za ciche
+ZERO_CROSSING_MS = 3
+DEFAULT_PAD_MS = (20.0, 20.0)  # margines przed i po słowie
+
+
+def parse_padding(value):
+    """Margines w ms: '20' (z obu stron) lub '20,40' (przed, po)"""
+    if value is None or value == '':
+        return DEFAULT_PAD_MS
+    if isinstance(value, (int, float)):
+        return float(value), float(value)
+    parts = [float(p) for p in str(value).split(',')]
+    if len(parts) == 1:
+        parts *= 2
+    if len(parts) != 2 or min(parts) < 0:
+        raise ValueError(f"Nieprawidłowy margines: {value} (oczekiwano 'ms' lub 'przed,po')")
+    return parts[0], parts[1]
+
+
+def envelope_db(mono, window_frames):
+    """Obwiednia energii w dB: wartość dla okna zaczynającego się w każdej próbce"""
+    power = np.concatenate(([0.0], np.cumsum(np.square(mono, dtype=np.float64))))
+    energy = (power[window_frames:] - power[:-window_frames]) / window_frames
+    return 10 * np.log10(np.maximum(energy, 1e-12))
+
+
+def nearest_zero_crossing(mono, frame, radius):
+    """Najbliższe frame przejście sygnału przez zero w promieniu radius (frame, jeśli brak)"""
+    lo = max(frame - radius, 0)
+    hi = min(frame + radius + 1, len(mono))
+    if hi - lo < 2:
+        return frame
+    crossings = np.flatnonzero(np.diff(np.signbit(mono[lo:hi]))) + lo + 1
+    if not len(crossings):
+        return frame
+    return int(crossings[np.argmin(np.abs(crossings - frame))])
+
+
+class BoundaryRefiner:
+    """Przesuwanie granic trafień do cichych miejsc nagrania i margines wokół słów"""
+
+    def __init__(self, mode=DEFAULT_MODE, pad_ms=None, search_ms=SEARCH_MS, inward_ms=INWARD_MS):
+        if mode not in REFINE_MODES:
+            raise ValueError(f"Nieznany tryb dopasowania granic: {mode} (dostępne: {', '.join(REFINE_MODES)})")
+        self.mode = mode
+        self.pad_before_ms, self.pad_after_ms = parse_padding(pad_ms)
+        self.search_ms = search_ms if mode == 'energy' else 0
+        self.inward_ms = inward_ms if mode == 'energy' else 0
+
+    @property
+    def reach_s(self):
+        """O ile sekund granica może się przesunąć przed czas z rozpoznawania"""
+        return (self.search_ms + self.pad_before_ms + ZERO_CROSSING_MS) / 1000
+
+    def __call__(self, wav_file, hits):
+        return self.refine(wav_file, hits)
+
+    def refine(self, wav_file, hits):
+        """Zwróć kopie trafień z dopasowanymi start/end (oryginalne czasy w raw_start/raw_end)"""
+        if not hits:
+            return []
+        with wave.open(wav_file, 'rb') as wf:
+            params = wf.getparams()
+            return [self._refine_hit(wf, params, hit) for hit in hits]
+
+    def _refine_hit(self, wf, params, hit):
+        rate = params.framerate
+        total = params.nframes
+        start = min(int(round(hit['start'] * rate)), total)
+        end = min(int(round(hit['end'] * rate)), total)
+        refined = dict(hit, raw_start=hit['start'], raw_end=hit['end'])
+        if start >= end:
+            return refined
+
+        if self.mode != 'off':
+            window = max(int(rate * ENVELOPE_MS / 1000), 1)
+            margin = int(rate * (self.search_ms + ZERO_CROSSING_MS) / 1000) + window
+            lo = max(start - margin, 0)
+            hi = min(end + margin, total)
+            wf.setpos(lo)
+            samples = bytes_to_samples(wf.readframes(hi - lo), params.sampwidth, params.nchannels)
+            mono = samples.astype(np.float32).mean(axis=1)
+            start, end = self._snap(mono, start - lo, end - lo, rate, window)
+            start += lo
+            end += lo
+
+        start = max(start - int(rate * self.pad_before_ms / 1000), 0)
+        end = min(end + int(rate * self.pad_after_ms / 1000), total)
+        refined['start'] = start / rate
+        refined['end'] = end / rate
+        return refined
+
+    def _snap(self, mono, start, end, rate, window):
+        """Dopasuj granice (ramki względem początku fragmentu mono)"""
+        new_start, new_end = start, end
+        if self.mode == 'energy' and len(mono) > window:
+            db = envelope_db(mono, window)
+            half = window // 2
+            middle = (start + end) // 2
+            outward = int(rate * self.search_ms / 1000)
+            inward = int(rate * self.inward_ms / 1000)
+
+            # Początek: ostatnie ciche okno przed słowem (najbliższe słowu)
+            first = max(start - outward - half, 0)
+            last = min(start + inward, middle) - half
+            if last > first:
+                part = db[first:last]
+                quiet = np.flatnonzero(part <= part.min() + QUIET_DB)
+                new_start = first + int(quiet[-1]) + half
+
+            # Koniec: pierwsze ciche okno po słowie
+            first = max(max(end - inward, middle) - half, 0)
+            last = min(end + outward - half, len(db))
+            if last > first:
+                part = db[first:last]
+                quiet = np.flatnonzero(part <= part.min() + QUIET_DB)
+                new_end = first + int(quiet[0]) + half
+
+        radius = int(rate * ZERO_CROSSING_MS / 1000)
+        new_start = nearest_zero_crossing(mono, new_start, radius)
+        new_end = nearest_zero_crossing(mono, new_end, radius)
+        if new_start >= new_end:
+            return start, end
+        return new_start, new_end
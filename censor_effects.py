@@ -0,0 +1,161 @@
+"""Efekty cenzury generowane w NumPy: beep, wyciszenie, szum i zmiana wysokości głosu.
+
+Ton i szum są liczone raz na format nagrania (częstotliwość, kanały,
+rozdzielczość) i trzymane w pamięci jako krótki bank próbek - dla tonu
+dokładnie całkowita liczba okresów, więc powielony bank daje ciągłą sinusoidę
+dowolnej długości. Fragment jest indeksowany od początku trafienia, dlatego
+ten sam efekt można nakładać blok po bloku. Zmiana głosu czyta całe ziarna
+(także ramki sprzed bloku i za nim) z oryginału przekazanego przez wywołującego
+(context), więc i ona nie zależy od podziału na bloki. Na krawędziach trafienia efekt
+jest płynnie przenikany z oryginałem (domyślnie 5 ms), co usuwa trzaski.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+EFFECTS = ('beep', 'mute', 'noise', 'pitch', 'legacy')
+DEFAULT_EFFECT = 'beep'
+DEFAULT_FADE_MS = 5
+
+BEEP_FREQ = 1000  # Hz
+BEEP_LEVEL = 0.5  # -6 dBFS
+NOISE_LEVEL = 0.25
+NOISE_BANK_S = 1
+PITCH_FACTOR = 1.5  # o kwintę w górę
+PITCH_GRAIN_MS = 40
+
+
+def full_scale(sample_width):
+    """Największa wartość próbki dla danej rozdzielczości"""
+    return float((1 << (8 * sample_width - 1)) - 1)
+
+
+@lru_cache(maxsize=64)
+def tone_bank(frame_rate, channels, sample_width, freq=BEEP_FREQ, level=BEEP_LEVEL):
+    """Najkrótszy fragment tonu z całkowitą liczbą okresów (ramki, kanały), tylko do odczytu"""
+    period = frame_rate // math.gcd(frame_rate, freq)
+    mono = np.sin(2 * np.pi * freq * np.arange(period) / frame_rate) * (level * full_scale(sample_width))
+    bank = np.repeat(mono.astype(np.float32)[:, None], channels, axis=1)
+    bank.setflags(write=False)
+    return bank
+
+
+@lru_cache(maxsize=64)
+def noise_bank(frame_rate, channels, sample_width, level=NOISE_LEVEL):
+    """Sekunda szumu białego (ta sama przy każdym uruchomieniu), tylko do odczytu"""
+    rng = np.random.default_rng(frame_rate * 16 + channels)
+    bank = rng.uniform(-1.0, 1.0, size=(frame_rate * NOISE_BANK_S, channels)) * (level * full_scale(sample_width))
+    bank = bank.astype(np.float32)
+    bank.setflags(write=False)
+    return bank
+
+
+def tile(bank, first, count):
+    """count ramek banku powielonego w nieskończoność, od ramki first"""
+    return np.take(bank, np.arange(first, first + count), axis=0, mode='wrap')
+
+
+@lru_cache(maxsize=16)
+def fade_ramp(fade_frames):
+    """Narastanie udziału efektu 0..1 przez fade_frames ramek (ramki, 1), tylko do odczytu"""
+    ramp = ((np.arange(fade_frames, dtype=np.float32) + 0.5) / fade_frames)[:, None]
+    ramp.setflags(write=False)
+    return ramp
+
+
+def fade_gain(start, end, lo, hi, fade_frames):
+    """Udział efektu (0..1) dla ramek [lo, hi) trafienia [start, end) z narastaniem na krawędziach"""
+    # Pozycje względem początku trafienia - float32 nie traci precyzji w długich nagraniach
+    position = np.arange(lo - start, hi - start, dtype=np.float32) + 0.5
+    gain = np.minimum(position, (end - start) - position) / fade_frames
+    return np.clip(gain, 0.0, 1.0)[:, None]
+
+
+def crossfade_edges(target, replacement, start, end, lo, fade_frames):
+    """Przenikanie oryginału z efektem na krawędziach trafienia (w miejscu, w replacement)"""
+    count = len(target)
+    length = end - start
+    rel = lo - start  # pozycja pierwszej ramki bloku w trafieniu
+    if fade_frames <= 0 or fade_frames <= rel <= length - fade_frames - count:
+        return replacement
+    if length < 2 * fade_frames:
+        # Krótkie trafienie: narastanie i wygasanie nachodzą na siebie
+        ranges = [(0, count, fade_gain(start, end, lo, lo + count, fade_frames))]
+    else:
+        ramp = fade_ramp(fade_frames)
+        ranges = []
+        head = min(max(fade_frames - rel, 0), count)
+        if head:
+            ranges.append((0, head, ramp[rel:rel + head]))
+        tail = min(max(length - fade_frames - rel, 0), count)
+        if tail < count:
+            first = rel + tail - (length - fade_frames)
+            ranges.append((tail, count, ramp[::-1][first:first + count - tail]))
+    for a, b, gain in ranges:
+        # oryginał + udział efektu * (efekt - oryginał)
+        original = target[a:b].astype(np.float32)
+        replacement[a:b] = original + gain * (replacement[a:b] - original)
+    return replacement
+
+
+def pitch_grain_frames(frame_rate):
+    return max(frame_rate * PITCH_GRAIN_MS // 1000, 1)
+
+
+def pitch_context_span(start, end, lo, hi, frame_rate):
+    """Ramki oryginału [od, do) potrzebne do zmiany głosu ramek [lo, hi) trafienia [start, end) - całe ziarna"""
+    grain = pitch_grain_frames(frame_rate)
+    first = start + (lo - start) // grain * grain
+    last = min(start + ((hi - 1 - start) // grain + 1) * grain, end)
+    return first, last
+
+
+def pitch_shift(context, context_lo, start, end, lo, count, factor=PITCH_FACTOR, grain_frames=None):
+    """Przyspiesz dźwięk w ziarnach stałej długości - wyższy, niezrozumiały głos tej samej długości.
+
+    Zwraca ramki [lo, lo + count) trafienia [start, end). context to oryginalne
+    ramki [context_lo, context_lo + len(context)); ziarna są liczone od początku
+    trafienia i czytane w całości, jeśli context je obejmuje (pitch_context_span),
+    inaczej są skracane do dostępnej części.
+    """
+    frames = np.arange(lo, lo + count)
+    grain_start = start + (frames - start) // grain_frames * grain_frames
+    avail_lo = np.maximum(grain_start, context_lo)
+    avail_hi = np.minimum(np.minimum(grain_start + grain_frames, end), context_lo + len(context))
+    position = np.floor((frames - grain_start) * factor).astype(np.int64) % (avail_hi - avail_lo)
+    return context[avail_lo - context_lo + position].astype(np.float32)
+
+
+def effect_samples(effect, target, start, end, lo, frame_rate, sample_width, context=None):
+    """Próbki efektu (float32) dla ramek target = [lo, lo + len(target)) trafienia [start, end).
+
+    context - (oryginalne ramki, pierwsza ramka) dla zmiany głosu; domyślnie sam target.
+    """
+    count, channels = target.shape
+    if effect == 'beep':
+        return tile(tone_bank(frame_rate, channels, sample_width), lo - start, count)
+    if effect == 'noise':
+        return tile(noise_bank(frame_rate, channels, sample_width), lo - start, count)
+    if effect == 'pitch':
+        samples, context_lo = context if context is not None else (target, lo)
+        return pitch_shift(samples, context_lo, start, end, lo, count, grain_frames=pitch_grain_frames(frame_rate))
+    if effect == 'mute':
+        return np.zeros((count, channels), dtype=np.float32)
+    raise ValueError(f"Nieznany efekt cenzury: {effect} (dostępne: {', '.join(EFFECTS)})")
+
+
+def apply_effect(target, effect, start, end, lo, frame_rate, sample_width, fade_ms=DEFAULT_FADE_MS,
+                 context=None):
+    """Nadpisz w miejscu ramki target = [lo, lo + len(target)) trafienia [start, end) efektem"""
+    if not len(target):
+        return target
+    replacement = effect_samples(effect, target, start, end, lo, frame_rate, sample_width, context)
+    crossfade_edges(target, replacement, start, end, lo, int(frame_rate * fade_ms / 1000))
+    if target.dtype.kind in 'iu':
+        # Przy pełnej skali 32-bit float32 zaokrągla się do 2**31 i po rzutowaniu zawinąłby się - przycięcie
+        # (w float64, który dokładnie odwzorowuje granice zakresu)
+        limits = np.iinfo(target.dtype)
+        replacement = np.clip(np.rint(replacement.astype(np.float64)), limits.min, limits.max)
+    target[:] = replacement
+    return target
@@ -0,0 +1,195 @@
+"""Jednoprzebiegowe nakładanie cenzury na próbki audio.
+
+Zamiast składać ścieżkę na nowo dla każdego trafienia
+(audio[:start] + beep + audio[end:], koszt O(k*N)), wszystkie fragmenty są
+nadpisywane w miejscu w jednym buforze NumPy. Dźwięk beep jest generowany
+tak samo jak w pydub (Sine(1000) 44,1 kHz, 16 bit, skonwertowany do formatu
+nagrania).
+
+Wynik jest identyczny próbka po próbce z dotychczasowym tylko dla nagrań
+44,1 kHz (częstotliwość beepa). Przy innych częstotliwościach stara metoda
+zmieniała samo nagranie: poniżej 44,1 kHz sklejanie w pydub przepróbkowywało
+cały wynik do 44,1 kHz, a powyżej konwersja beepa (ratecv) potrafiła skrócić
+nagranie o ramkę na trafienie i przesunąć wszystko, co po nim. Renderer
+zachowuje częstotliwość i długość nagrania (benchmarks/bench_render.py
+sprawdza obie sytuacje).
+"""
+import math
+import wave
+from functools import lru_cache
+
+import numpy as np
+
+from censor_effects import DEFAULT_FADE_MS, apply_effect, pitch_context_span
+
+try:
+    import audioop  # używany przez pydub do konwersji formatu beepa
+except ImportError:  # Python 3.13+ bez audioop-lts
+    audioop = None
+
+BEEP_FREQ = 1000  # Hz
+BEEP_DURATION_MS = 1000
+BEEP_SOURCE_RATE = 44100  # domyślna częstotliwość generatorów pydub
+
+_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def read_wav_samples(wav_file):
+    """Wczytaj plik WAV do tablicy (ramki, kanały) i zwróć ją razem z parametrami"""
+    with wave.open(wav_file, 'rb') as wf:
+        params = wf.getparams()
+        raw = wf.readframes(params.nframes)
+    samples = bytes_to_samples(raw, params.sampwidth, params.nchannels)
+    return samples, params
+
+
+def write_wav_samples(wav_file, samples, params):
+    """Zapisz tablicę próbek do pliku WAV z podanymi parametrami"""
+    with wave.open(wav_file, 'wb') as wf:
+        wf.setnchannels(params.nchannels)
+        wf.setsampwidth(params.sampwidth)
+        wf.setframerate(params.framerate)
+        wf.writeframes(samples_to_bytes(samples, params.sampwidth))
+
+
+def bytes_to_samples(raw, sample_width, channels):
+    """Zamień surowe ramki PCM z pliku WAV na tablicę (ramki, kanały) ze znakiem"""
+    if sample_width == 1:
+        # WAV 8-bit jest bez znaku - przesuwamy do zakresu ze znakiem (jak pydub)
+        data = (np.frombuffer(raw, dtype=np.uint8).astype(np.int16) - 128).astype(np.int8)
+    else:
+        data = bytes_to_signed(raw, sample_width).copy()
+    return data.reshape(-1, channels)
+
+
+def bytes_to_signed(data, sample_width):
+    """Zamień dane PCM ze znakiem (format audioop) na płaską tablicę"""
+    if sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        value = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        return np.where(value >= 1 << 23, value - (1 << 24), value).astype(np.int32)
+    return np.frombuffer(data, dtype=_DTYPES[sample_width])
+
+
+def samples_to_bytes(samples, sample_width):
+    """Zamień tablicę próbek z powrotem na surowe ramki PCM"""
+    flat = np.ascontiguousarray(samples).reshape(-1)
+    if sample_width == 1:
+        return (flat.astype(np.int16) + 128).astype(np.uint8).tobytes()
+    if sample_width == 3:
+        as_int = flat.astype(np.int32)
+        packed = np.empty((as_int.size, 3), dtype=np.uint8)
+        packed[:, 0] = as_int & 0xFF
+        packed[:, 1] = (as_int >> 8) & 0xFF
+        packed[:, 2] = (as_int >> 16) & 0xFF
+        return packed.tobytes()
+    return flat.astype(_DTYPES[sample_width], copy=False).tobytes()
+
+
+@lru_cache(maxsize=None)
+def _base_beep_bytes():
+    """Beep 1 s / 1 kHz / 44,1 kHz mono 16 bit - te same wartości co pydub.generators.Sine"""
+    sine_of = (BEEP_FREQ * 2 * math.pi) / BEEP_SOURCE_RATE
+    count = int(BEEP_SOURCE_RATE * (BEEP_DURATION_MS / 1000.0))
+    values = [int(math.sin(sine_of * n) * 32767) for n in range(count)]
+    return np.array(values, dtype=np.int16).tobytes()
+
+
+@lru_cache(maxsize=4096)
+def legacy_beep(duration_ms, frame_rate, channels, sample_width):
+    """Beep przycięty do duration_ms i skonwertowany do formatu nagrania (jak pydub._sync)"""
+    duration_ms = min(duration_ms, BEEP_DURATION_MS)
+    frames = int(duration_ms * (BEEP_SOURCE_RATE / 1000.0))
+    data = _base_beep_bytes()[:frames * 2]
+
+    if audioop is not None:
+        if channels == 2:
+            data = audioop.tostereo(data, 2, 1, 1)
+        elif channels > 2:
+            data = np.repeat(np.frombuffer(data, dtype=np.int16), channels).tobytes()
+        if frame_rate != BEEP_SOURCE_RATE:
+            data, _ = audioop.ratecv(data, 2, channels, BEEP_SOURCE_RATE, frame_rate, None)
+        if sample_width != 2:
+            data = audioop.lin2lin(data, 2, sample_width)
+        beep = bytes_to_signed(data, sample_width).reshape(-1, channels)
+    else:
+        # Bez audioop: synteza bezpośrednio w docelowej częstotliwości
+        count = int(duration_ms * (frame_rate / 1000.0))
+        sine_of = (BEEP_FREQ * 2 * math.pi) / frame_rate
+        mono = (np.sin(sine_of * np.arange(count)) * 32767).astype(np.int16).astype(np.int32)
+        shift = 8 * sample_width - 16
+        mono = mono << shift if shift >= 0 else mono >> -shift
+        beep = np.repeat(mono[:, None], channels, axis=1)
+    beep.setflags(write=False)
+    return beep
+
+
+def hits_to_regions(hits, frame_rate, total_frames):
+    """Zamień trafienia (sekundy) na posortowane zakresy ramek [start, end) z długością w ms"""
+    duration_ms = round(1000 * (total_frames / frame_rate))
+    regions = []
+    for hit in sorted(hits, key=lambda h: (h['start'], h['end'])):
+        start_ms = int(hit['start'] * 1000)
+        end_ms = min(int(hit['end'] * 1000), duration_ms)
+        if start_ms >= end_ms:
+            continue
+        start = int(start_ms * (frame_rate / 1000.0))
+        end = min(int(end_ms * (frame_rate / 1000.0)), total_frames)
+        if start < end:
+            regions.append((start, end, end_ms - start_ms))
+    return regions
+
+
+def render_regions(samples, regions, frame_rate, sample_width, offset=0, effect='legacy',
+                   fade_ms=DEFAULT_FADE_MS, read_original=None):
+    """Nadpisz w miejscu fragmenty z regions w buforze zaczynającym się od ramki offset.
+
+    Zakresy są w ramkach bezwzględnych, więc tę samą listę można nałożyć blok
+    po bloku. Zakresy są przetwarzane od końca, tak jak w dotychczasowej
+    implementacji - przy nakładających się trafieniach wygrywa wcześniejsze.
+    effect='legacy' odtwarza dawny beep (1 s, dalej cisza, bez przenikania),
+    pozostałe efekty pochodzą z censor_effects.
+
+    Zmiana głosu (pitch) potrzebuje całych ziaren oryginału, także spoza bloku:
+    read_original(od, do) zwraca (ramki, pierwsza ramka) oryginalnego nagrania;
+    bez niej ziarna są czytane tylko z bloku.
+    """
+    block_end = offset + len(samples)
+    channels = samples.shape[1]
+    contexts = {}
+    if effect == 'pitch':
+        # Oryginał odczytany przed nałożeniem czegokolwiek - nakładające się trafienia go nie zmienią
+        for start, end, _ in regions:
+            lo, hi = max(start, offset), min(end, block_end)
+            if lo < hi:
+                first, last = pitch_context_span(start, end, lo, hi, frame_rate)
+                if read_original is not None:
+                    contexts[start, end] = read_original(first, last)
+                else:
+                    first, last = max(first, offset), min(last, block_end)
+                    contexts[start, end] = (samples[first - offset:last - offset].copy(), first)
+    for start, end, duration_ms in reversed(regions):
+        lo = max(start, offset)
+        hi = min(end, block_end)
+        if lo >= hi:
+            continue
+        if effect != 'legacy':
+            apply_effect(samples[lo - offset:hi - offset], effect, start, end, lo, frame_rate, sample_width, fade_ms,
+                         contexts.get((start, end)))
+            continue
+        beep = legacy_beep(duration_ms, frame_rate, channels, sample_width)
+        # Beep dłuższy niż słowo jest przycinany, krótszy - dopełniany ciszą
+        target = samples[lo - offset:hi - offset]
+        available = max(0, min(hi, start + len(beep)) - lo)
+        target[:available] = beep[lo - start:lo - start + available]
+        target[available:] = 0
+    return samples
+
+
+def render_censored_wav(wav_file, hits, output_file, effect='legacy'):
+    """Ocenzuruj plik WAV jednym przebiegiem i zapisz wynik do output_file"""
+    samples, params = read_wav_samples(wav_file)
+    regions = hits_to_regions(hits, params.framerate, len(samples))
+    render_regions(samples, regions, params.framerate, params.sampwidth, effect=effect)
+    write_wav_samples(output_file, samples, params)
+    return len(regions)
@@ -0,0 +1,118 @@
+"""Dzielenie dużych plików WAV w miejscach ciszy.
+
+Granice segmentów są szukane w oknie tuż przed limitem rozmiaru, w miejscu
+o najniższej energii (RMS liczone wektorowo w oknach 20 ms), dzięki czemu
+segmenty są bliskie limitowi API i nie przecinają słów. Sąsiednie segmenty
+zachodzą na siebie o chwilę - sklejaniem wyników zajmuje się transcript_merge.
+Plik jest czytany blok po bloku, a segmenty są kopiowane bez dekodowania.
+"""
+import tempfile
+
+import numpy as np
+
+from wav_stream import copy_frames, iter_blocks, wav_params
+
+WAV_HEADER_BYTES = 44
+ENERGY_WINDOW_MS = 20
+DEFAULT_OVERLAP_S = 1.0
+DEFAULT_SEARCH_S = 3.0
+_ENERGY_BLOCK_WINDOWS = 4096  # liczba okien liczonych naraz (ogranicza zużycie pamięci)
+
+
+def window_energy(samples, window_frames):
+    """Średnia energia (kwadrat RMS) sygnału mono w kolejnych oknach"""
+    n_windows = len(samples) // window_frames
+    energy = np.empty(n_windows, dtype=np.float64)
+    for first in range(0, n_windows, _ENERGY_BLOCK_WINDOWS):
+        count = min(_ENERGY_BLOCK_WINDOWS, n_windows - first)
+        start = first * window_frames
+        chunk = samples[start:start + count * window_frames]
+        mono = chunk.astype(np.float32).mean(axis=1)
+        energy[first:first + count] = np.square(mono).reshape(count, window_frames).mean(axis=1)
+    return energy
+
+
+def wav_window_energy(wav_file, window_frames, start=0, end=None):
+    """Energia w oknach dla pliku WAV (lub zakresu ramek [start, end)), liczona blok po bloku"""
+    parts = []
+    leftover = None
+    for _, block in iter_blocks(wav_file, start, end):
+        if leftover is not None and len(leftover):
+            block = np.concatenate([leftover, block])
+        usable = len(block) // window_frames * window_frames
+        parts.append(window_energy(block[:usable], window_frames))
+        leftover = block[usable:]
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def find_quiet_frame(energy, window_frames, lo, hi):
+    """Ramka w [lo, hi] leżąca w najcichszym oknie (hi, jeśli zakres jest za krótki)"""
+    first = -(-lo // window_frames)
+    last = min(hi // window_frames, len(energy))
+    if last <= first:
+        return hi
+    # Przy równej energii wybierz okno najbliżej limitu (segmenty możliwie duże)
+    best = last - 1 - int(np.argmin(energy[first:last][::-1]))
+    return min(best * window_frames + window_frames // 2, hi)
+
+
+def find_quiet_frame_in_file(wav_file, window_frames, lo, hi):
+    """Jak find_quiet_frame, ale czyta z pliku tylko zakres [lo, hi]"""
+    base = lo // window_frames * window_frames
+    energy = wav_window_energy(wav_file, window_frames, base, hi)
+    return base + find_quiet_frame(energy, window_frames, lo - base, hi - base)
+
+
+def plan_chunks(energy, window_frames, total_frames, max_frames, overlap_frames, search_frames):
+    """Wyznacz zakresy ramek [start, end) segmentów o długości co najwyżej max_frames"""
+    chunks = []
+    start = 0
+    while total_frames - start > max_frames:
+        target = start + max_frames
+        # Szukaj ciszy tylko tam, gdzie następny segment i tak posunie się do przodu
+        lo = max(target - search_frames, start + overlap_frames + window_frames)
+        cut = find_quiet_frame(energy, window_frames, lo, target)
+        chunks.append((start, cut))
+        start = max(cut - overlap_frames, start + 1)
+    chunks.append((start, total_frames))
+    return chunks
+
+
+def plan_wav_chunks(wav_file, max_frames, overlap_s=DEFAULT_OVERLAP_S, search_s=DEFAULT_SEARCH_S):
+    """Zakresy ramek [start, end) segmentów pliku WAV o długości co najwyżej max_frames, cięte w ciszy"""
+    params = wav_params(wav_file)
+    rate = params.framerate
+    window_frames = max(rate * ENERGY_WINDOW_MS // 1000, 1)
+    overlap_frames = int(overlap_s * rate)
+    search_frames = int(search_s * rate)
+    # Każdy segment musi posunąć się o co najmniej sekundę poza zakładkę i zakres szukania ciszy -
+    # przy mniejszym limicie kolejne segmenty przesuwałyby się o pojedyncze ramki
+    min_frames = overlap_frames + search_frames + max(window_frames, rate)
+    energy = wav_window_energy(wav_file, window_frames)
+    return plan_chunks(
+        energy, window_frames, params.nframes, max(max_frames, min_frames),
+        overlap_frames=overlap_frames,
+        search_frames=search_frames,
+    )
+
+
+def split_wav_on_silence(wav_file, max_size_bytes, overlap_s=DEFAULT_OVERLAP_S,
+                         search_s=DEFAULT_SEARCH_S, out_dir=None):
+    """Podziel plik WAV na segmenty nie większe niż max_size_bytes, tnąc w miejscach ciszy.
+
+    Zwraca listę słowników {'path', 'start', 'end'} (czasy w sekundach
+    względem oryginalnego nagrania).
+    """
+    params = wav_params(wav_file)
+    rate = params.framerate
+    bytes_per_frame = params.nchannels * params.sampwidth
+    max_frames = max((max_size_bytes - WAV_HEADER_BYTES) // bytes_per_frame, rate)
+    ranges = plan_wav_chunks(wav_file, max_frames, overlap_s, search_s)
+
+    chunks = []
+    for i, (start, end) in enumerate(ranges):
+        temp_chunk = tempfile.NamedTemporaryFile(suffix=f'_segment_{i}.wav', delete=False, dir=out_dir)
+        temp_chunk.close()
+        copy_frames(wav_file, temp_chunk.name, start, end)
+        chunks.append({'path': temp_chunk.name, 'start': start / rate, 'end': end / rate})
+    return chunks
@@ -0,0 +1,257 @@
+"""Tryb wsadowy (bez okna) - cenzurowanie wielu plików z wiersza poleceń.
+
+Przykłady:
+    python cli.py nagrania/*.mp3 --word kurcze --word cholera
+    python cli.py nagrania/ --recursive --words-file lista.txt --jobs 4 --output-dir wyniki/
+    python cli.py film.mp4 --word xyz --output-template "{dir}/{stem}_beep{ext}" --api
+"""
+import argparse
+import glob
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import backends
+from instrumentation import JsonLinesSink, write_prometheus
+from pipeline import AUDIO_EXTENSIONS, CENSOR_EFFECTS, REFINE_MODES, VIDEO_EXTENSIONS, CensorPipeline
+from recognizers import LOCAL_BACKENDS, RECOGNIZERS, recognizer_chain
+from word_matcher import MATCH_MODES, load_words
+
+DEFAULT_OUTPUT_TEMPLATE = "{dir}/{stem}_ocenzurowany{ext}"
+
+_print_lock = threading.Lock()
+
+
+def log(message):
+    """Wypisz linię na stdout (bez przeplatania linii z różnych wątków)"""
+    with _print_lock:
+        print(message, flush=True)
+
+
+def collect_inputs(patterns, recursive=False):
+    """Rozwiń pliki, wzorce glob i katalogi do posortowanej listy plików audio/wideo"""
+    extensions = set(AUDIO_EXTENSIONS + VIDEO_EXTENSIONS)
+    found = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            if recursive:
+                candidates = [os.path.join(root, name) for root, _, names in os.walk(pattern) for name in names]
+            else:
+                candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+            candidates = [c for c in candidates if os.path.splitext(c)[1].lower() in extensions]
+        elif os.path.isfile(pattern):
+            candidates = [pattern]
+        else:
+            candidates = [c for c in glob.glob(pattern, recursive=recursive) if os.path.isfile(c)]
+        found.extend(os.path.abspath(c) for c in candidates)
+
+    # Usuń duplikaty
+    return sorted(dict.fromkeys(found))
+
+
+def output_path(input_file, template, output_dir=None):
+    """Zbuduj ścieżkę wyjściową z szablonu ({dir}, {stem}, {ext}, {name})"""
+    directory, name = os.path.split(input_file)
+    stem, ext = os.path.splitext(name)
+    path = template.format(dir=output_dir or directory, stem=stem, ext=ext, name=name)
+    return os.path.abspath(path)
+
+
+def path_key(path):
+    """Ścieżka do porównywania plików (bezwzględna, z wielkością liter jak w systemie plików)"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def process_file(input_file, output_file, words, args, metrics=None):
+    """Ocenzuruj jeden plik (wywoływane w wątku puli)"""
+    name = os.path.basename(input_file)
+    pipeline = CensorPipeline(
+        whisper_model=args.model,
+        use_api=args.api,
+        use_cache=not args.no_cache,
+        match_mode=args.match,
+        inflection=not args.exact_forms,
+        streaming=args.streaming,
+        window_seconds=args.window_seconds,
+        effect=args.effect,
+        vad=False if args.no_vad else None,
+        refine=args.refine,
+        pad_ms=args.pad_ms,
+        manifest=False if args.no_manifest else None,
+        force=args.force,
+        backend=args.backend,
+        metrics=metrics,
+        profile_dir=args.profile,
+        log=(lambda message: log(f"[{name}] {message}")) if args.verbose else (lambda message: None),
+    )
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    result = pipeline.run(input_file, output_file, words)
+
+    timings = ', '.join(f"{stage} {seconds:.1f}s" for stage, seconds in result['timings'].items())
+    if result.get('resumed') == 'done':
+        log(f"⏭️ {name}: wykonane wcześniej z tymi samymi ustawieniami (manifest), pomijanie")
+    elif result['status'] == 'ok':
+        log(f"✅ {name}: {result['hits']} wystąpień -> {output_file} ({timings})")
+    elif result['status'] == 'not_found':
+        log(f"➖ {name}: nie znaleziono słów ({timings})")
+    else:
+        log(f"❌ {name}: {result['error']} ({timings})")
+    return result
+
+
+def print_summary(results, elapsed):
+    """Podsumowanie przetwarzania wsadowego"""
+    ok = sum(1 for r in results if r['status'] == 'ok')
+    not_found = sum(1 for r in results if r['status'] == 'not_found')
+    failed = len(results) - ok - not_found
+    hits = sum(r['hits'] for r in results)
+    busy = sum(r['timings'].get('total', 0.0) for r in results)
+
+    log("")
+    log(f"Plików: {len(results)} | ocenzurowane: {ok} | bez trafień: {not_found} | błędy: {failed}")
+    skipped = sum(1 for r in results if r.get('resumed') == 'done')
+    resumed = sum(1 for r in results if r.get('resumed') == 'hits')
+    if skipped or resumed:
+        log(f"Z manifestu zadań: pominięte (wykonane wcześniej): {skipped} | wznowione: {resumed}")
+    log(f"Ocenzurowanych fragmentów: {hits}")
+    log(f"Czas: {elapsed:.1f}s (suma czasów plików: {busy:.1f}s)")
+
+    stages = {}
+    for r in results:
+        for stage, seconds in r['timings'].items():
+            if stage != 'total':
+                stages[stage] = stages.get(stage, 0.0) + seconds
+    if stages:
+        log("Czas etapów: " + ', '.join(f"{stage} {seconds:.1f}s" for stage, seconds in stages.items()))
+    vad = [r['vad'] for r in results if r.get('vad')]
+    if vad:
+        total = sum(v['total_s'] for v in vad)
+        skipped = sum(v['skipped_s'] for v in vad)
+        log(f"VAD: pominięto {skipped / 60:.1f} min z {total / 60:.1f} min ({100 * skipped / total if total else 0:.0f}%)")
+    disk = [r['disk']['peak_mb'] for r in results if r.get('disk')]
+    if disk:
+        log(f"Pliki pośrednie: szczytowo {max(disk):.0f} MB na plik (katalog roboczy usuwany po każdym pliku)")
+    for r in results:
+        if r['status'] == 'error':
+            log(f"  błąd: {r['input']}: {r['error']}")
+
+
+def build_parser():
+    """Parser argumentów wiersza poleceń"""
+    parser = argparse.ArgumentParser(
+        description="Automatyczna cenzura nagrań - tryb wsadowy bez interfejsu graficznego"
+    )
+    parser.add_argument('inputs', nargs='+', help="pliki, wzorce glob lub katalogi")
+    parser.add_argument('-w', '--word', action='append', dest='words', help="słowo do ocenzurowania (można powtarzać)")
+    parser.add_argument('--words-file', help="plik ze słowami do ocenzurowania (jedno w linii)")
+    parser.add_argument('--match', choices=MATCH_MODES, default='whole',
+                        help="whole: całe słowa, prefix: słowa zaczynające się od podanego (domyślnie: %(default)s)")
+    parser.add_argument('--exact-forms', action='store_true',
+                        help="nie dopasowuj odmian (kota, kotem -> kot)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="przeszukuj katalogi rekurencyjnie")
+    parser.add_argument('-o', '--output-template', default=DEFAULT_OUTPUT_TEMPLATE,
+                        help="szablon ścieżki wyjściowej: {dir}, {stem}, {ext}, {name} (domyślnie: %(default)s)")
+    parser.add_argument('--output-dir', help="katalog wyjściowy (podstawiany jako {dir})")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="liczba plików przetwarzanych równolegle")
+    parser.add_argument('-m', '--model', default="small", help="model lokalnego Whisper (domyślnie: %(default)s)")
+    parser.add_argument('--backend', choices=LOCAL_BACKENDS,
+                        help="lokalna metoda rozpoznawania: whisper, faster-whisper (int8 na CPU) lub auto "
+                             "(faster-whisper, jeśli zainstalowany); domyślnie WHISPER_BACKEND lub auto")
+    parser.add_argument('--api', action='store_true', help="użyj OpenAI Whisper API")
+    parser.add_argument('--no-cache', action='store_true', help="nie używaj cache transkrypcji")
+    parser.add_argument('--effect', choices=CENSOR_EFFECTS,
+                        help="efekt cenzury: beep, mute (cisza), noise (szum), pitch (zmieniony głos), "
+                             "legacy (dawny beep 1 s); domyślnie CENSOR_EFFECT lub beep")
+    parser.add_argument('--refine', choices=REFINE_MODES,
+                        help="dopasowanie granic słów do nagrania: energy (cisza + przejście przez zero), "
+                             "zero (tylko przejście przez zero), off; domyślnie BOUNDARY_REFINE lub energy")
+    parser.add_argument('--pad-ms', metavar='MS',
+                        help="margines cenzury wokół słowa w ms: '20' lub 'przed,po', np. '30,60' "
+                             "(domyślnie BOUNDARY_PAD_MS lub 20)")
+    parser.add_argument('--no-vad', action='store_true',
+                        help="rozpoznawaj całe nagranie, bez pomijania ciszy (domyślnie VAD z .env lub włączony)")
+    parser.add_argument('--streaming', action='store_true',
+                        help="rozpoznawaj i cenzuruj okno po oknie, zapisując wynik w trakcie (bez cache transkrypcji)")
+    parser.add_argument('--window-seconds', type=float,
+                        help="długość okna w trybie strumieniowym (domyślnie STREAM_WINDOW_SECONDS lub 60)")
+    parser.add_argument('--metrics', metavar='PLIK',
+                        help="dopisuj pomiary etapów i okien (czas, CPU, pamięć, bajty, szybkość) jako JSON lines")
+    parser.add_argument('--prometheus', metavar='PLIK',
+                        help="po zakończeniu zapisz podsumowanie pomiarów w formacie tekstowym Prometheus")
+    parser.add_argument('--profile', metavar='KATALOG',
+                        help="profiluj etapy transcribe/match/render/stream (pyinstrument, jeśli zainstalowany, "
+                             "inaczej cProfile); wymusza -j 1")
+    parser.add_argument('--skip-existing', action='store_true', help="pomiń pliki, dla których wynik już istnieje")
+    parser.add_argument('--no-manifest', action='store_true',
+                        help="nie zapisuj postępu zadań (bez wznawiania i pomijania wykonanych; domyślnie JOB_MANIFEST)")
+    parser.add_argument('--force', action='store_true',
+                        help="przetwórz ponownie pliki wykonane wcześniej z tymi samymi ustawieniami")
+    parser.add_argument('-v', '--verbose', action='store_true', help="pokazuj logi poszczególnych etapów")
+    return parser
+
+
+def main(argv=None):
+    """Uruchom przetwarzanie wsadowe; zwraca kod wyjścia procesu"""
+    args = build_parser().parse_args(argv)
+
+    words = load_words(args.words, args.words_file)
+    if not words:
+        log("❌ Podaj słowa do ocenzurowania (--word lub --words-file)")
+        return 2
+
+    # Import biblioteki wybranej metody rozpoznawania w tle, równolegle ze zbieraniem listy plików
+    chain = recognizer_chain(args.api, args.backend)
+    if chain:
+        backends.preload([RECOGNIZERS[chain[0]].backend])
+    backends.preload_from_env()
+
+    inputs = collect_inputs(args.inputs, args.recursive)
+    if not inputs:
+        log("❌ Nie znaleziono plików audio/wideo")
+        return 2
+
+    jobs = []
+    input_keys = {path_key(input_file) for input_file in inputs}
+    outputs = {}
+    for input_file in inputs:
+        output_file = output_path(input_file, args.output_template, args.output_dir)
+        key = path_key(output_file)
+        if key in input_keys:
+            log(f"❌ {input_file}: plik wyjściowy nadpisałby wejściowy - zmień --output-template")
+            return 2
+        if key in outputs:
+            # Równoległe zadania nadpisywałyby nawzajem swój wynik
+            log(f"❌ {input_file} i {outputs[key]}: ten sam plik wyjściowy {output_file} - zmień --output-template")
+            return 2
+        outputs[key] = input_file
+        if args.skip_existing and os.path.exists(output_file):
+            log(f"⏭️ {os.path.basename(input_file)}: wynik już istnieje, pomijanie")
+            continue
+        jobs.append((input_file, output_file))
+
+    if args.profile and args.jobs > 1:
+        # Profilery (cProfile od Pythona 3.12, pyinstrument) nie działają w kilku wątkach naraz
+        log("Profilowanie: przetwarzanie po jednym pliku (-j 1)")
+        args.jobs = 1
+    metrics = JsonLinesSink(args.metrics) if args.metrics else None
+
+    log(f"Plików do przetworzenia: {len(jobs)}, równolegle: {args.jobs}, słów: {len(words)}")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        futures = [pool.submit(process_file, input_file, output_file, words, args, metrics)
+                   for input_file, output_file in jobs]
+        results = [future.result() for future in futures]
+
+    print_summary(results, time.perf_counter() - started)
+    if args.prometheus:
+        write_prometheus(args.prometheus, [record for r in results for record in r.get('stages', [])])
+        log(f"Pomiary zapisano w {args.prometheus}")
+    if args.profile:
+        log(f"Profile etapów zapisano w {args.profile}")
+    return 1 if any(r['status'] == 'error' for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Wywołania FFmpeg w osobnym procesie.
+
+FFmpeg przetwarza plik strumieniowo, więc konwersja nie wymaga wczytania
+całego zdekodowanego nagrania do pamięci Pythona (jak AudioSegment.from_file),
+a przy podmianie audio w wideo strumień obrazu może być skopiowany bez
+dekodowania klatek.
+"""
+import os
+import shutil
+import subprocess
+
+
+class FFmpegError(RuntimeError):
+    """Błąd wykonania polecenia ffmpeg"""
+
+
+def ffmpeg_available():
+    """Czy ffmpeg jest dostępny w PATH"""
+    return shutil.which('ffmpeg') is not None
+
+
+def run_ffmpeg(args):
+    """Uruchom ffmpeg z podanymi argumentami (bez interakcji, tylko błędy na stderr)"""
+    command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-nostdin', '-y'] + list(args)
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', errors='replace').strip()
+        raise FFmpegError(message or f"ffmpeg zakończył się kodem {result.returncode}")
+
+
+def transcode_to_wav(input_file, output_file):
+    """Zdekoduj dowolny plik audio do WAV PCM 16 bit (bez zmiany częstotliwości i kanałów)"""
+    run_ffmpeg(['-i', input_file, '-vn', '-acodec', 'pcm_s16le', '-f', 'wav', output_file])
+    return output_file
+
+
+def extract_audio(video_file, recognition_file, full_file=None, sample_rate=16000):
+    """Wyciągnij ścieżkę audio z wideo bez dekodowania klatek obrazu.
+
+    recognition_file dostaje audio w formacie rozpoznawania mowy (WAV
+    mono 16 kHz). Jeśli podano full_file, w tym samym przebiegu powstaje też
+    kopia w oryginalnej jakości, na którą nakładana jest cenzura.
+    """
+    # Mapowany jest tylko strumień audio - ffmpeg nie dekoduje obrazu
+    args = ['-i', video_file,
+            '-map', '0:a:0', '-ac', '1', '-ar', str(sample_rate), '-acodec', 'pcm_s16le', recognition_file]
+    if full_file:
+        args += ['-map', '0:a:0', '-acodec', 'pcm_s16le', full_file]
+    run_ffmpeg(args)
+    return recognition_file, full_file
+
+
+# Kodek audio dla kontenerów wyjściowych (wideo jest kopiowane bez zmian)
+AUDIO_CODECS = {
+    '.mp4': 'aac',
+    '.m4v': 'aac',
+    '.mov': 'aac',
+    '.mkv': 'aac',
+    '.flv': 'aac',
+    '.webm': 'libopus',
+    '.avi': 'libmp3lame',
+    '.wmv': 'wmav2',
+}
+
+
+def remux_with_audio(video_file, audio_file, output_file, audio_bitrate='192k'):
+    """Zastąp ścieżkę audio w pliku wideo, kopiując strumień wideo bez ponownego kodowania"""
+    extension = os.path.splitext(output_file)[1].lower()
+    args = [
+        '-i', video_file,
+        '-i', audio_file,
+        '-map', '0:v',
+        '-map', '1:a:0',
+        '-map_metadata', '0',
+        '-c:v', 'copy',
+        '-c:a', AUDIO_CODECS.get(extension, 'aac'),
+        '-b:a', audio_bitrate,
+    ]
+    if extension in ('.mp4', '.m4v', '.mov'):
+        args += ['-movflags', '+faststart']
+    run_ffmpeg(args + [output_file])
+    return output_file
@@ -0,0 +1,249 @@
+"""Pomiary etapów potoku: czas, CPU, pamięć, operacje dyskowe i szybkość względem długości audio.
+
+StageRecorder dzieli czas zadania na kolejne etapy (extract/convert,
+transcribe, match, render, mux...) i dla każdego etapu - oraz każdego okna
+w trybie strumieniowym - zapisuje rekord:
+
+    wall_s          czas rzeczywisty
+    cpu_s           czas CPU procesu (wszystkie wątki)
+    children_cpu_s  czas CPU procesów potomnych (ffmpeg)
+    peak_rss_mb     najwyższe dotychczasowe zużycie pamięci procesu
+    read_bytes, write_bytes  bajty przeczytane i zapisane przez proces
+    audio_s, speed  długość przetworzonego audio i sekundy audio na sekundę pracy
+
+CPU, pamięć i operacje dyskowe są licznikami całego procesu - przy kilku
+plikach przetwarzanych równolegle (cli.py -j) obejmują też pozostałe zadania.
+Rekordy trafiają do pliku JSON lines, a podsumowanie można zapisać w formacie
+tekstowym Prometheus (np. dla node_exporter textfile collector).
+Opcjonalnie etapy obciążające CPU są profilowane (cProfile lub pyinstrument).
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+import backends
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILED_STAGES = ('transcribe', 'match', 'render', 'stream')
+
+
+def peak_rss_mb():
+    """Najwyższe dotychczasowe zużycie pamięci procesu w MB (None, jeśli nieznane)"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux podaje KB, macOS bajty
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    if backends.is_installed('psutil'):
+        info = backends.load('psutil').Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    return None
+
+
+def io_bytes():
+    """(bajty przeczytane, bajty zapisane) przez proces od startu; (None, None), jeśli nieznane"""
+    try:
+        # rchar/wchar - wszystkie odczyty i zapisy, także obsłużone z pamięci podręcznej systemu
+        with open('/proc/self/io') as f:
+            counters = dict(line.split(': ') for line in f.read().splitlines())
+        return int(counters['rchar']), int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        pass
+    if backends.is_installed('psutil'):
+        counters = backends.load('psutil').Process().io_counters()
+        return counters.read_bytes, counters.write_bytes
+    return None, None
+
+
+class Snapshot:
+    """Stan liczników procesu w danej chwili"""
+
+    def __init__(self):
+        self.wall = time.perf_counter()
+        times = os.times()
+        self.cpu = times.user + times.system
+        self.children_cpu = times.children_user + times.children_system
+        self.read, self.written = io_bytes()
+
+
+def _delta(after, before):
+    return None if after is None or before is None else after - before
+
+
+class Profiler:
+    """Profilowanie kolejnych etapów: pyinstrument (HTML), jeśli zainstalowany, inaczej cProfile (.prof + .txt)"""
+
+    def __init__(self, directory, prefix):
+        self.directory = directory
+        self.prefix = prefix
+        self.use_pyinstrument = backends.is_installed('pyinstrument')
+        os.makedirs(directory, exist_ok=True)
+        self._profile = None
+
+    def start(self):
+        if self.use_pyinstrument:
+            self._profile = backends.load('pyinstrument').Profiler()
+        else:
+            import cProfile
+            self._profile = cProfile.Profile()
+        try:
+            if self.use_pyinstrument:
+                self._profile.start()
+            else:
+                self._profile.enable()
+        except (RuntimeError, ValueError):
+            self._profile = None  # inny profiler jest już aktywny
+
+    def stop(self, stage, chunk=None):
+        """Zakończ bieżący pomiar; dla etapów z PROFILED_STAGES zapisz wynik, zwraca ścieżkę"""
+        profile, self._profile = self._profile, None
+        if profile is None:
+            return None
+        if self.use_pyinstrument:
+            profile.stop()
+        else:
+            profile.disable()
+        if stage not in PROFILED_STAGES:
+            return None
+        name = f"{self.prefix}.{stage}" + (f".{chunk}" if chunk is not None else '')
+        path = os.path.join(self.directory, name)
+        if self.use_pyinstrument:
+            path += '.html'
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profile.output_html())
+        else:
+            import io
+            import pstats
+            path += '.prof'
+            profile.dump_stats(path)
+            text = io.StringIO()
+            pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(30)
+            with open(path[:-5] + '.txt', 'w', encoding='utf-8') as f:
+                f.write(text.getvalue())
+        return path
+
+
+class StageRecorder:
+    """Pomiar kolejnych, następujących po sobie etapów jednego zadania"""
+
+    def __init__(self, job, sink=None, profile_dir=None):
+        self.job = job
+        self.sink = sink
+        self.audio_seconds = None  # długość nagrania, gdy jest już znana
+        self.records = []
+        self.timings = {}
+        self._profiler = None
+        if profile_dir:
+            prefix = re.sub(r'[^\w.-]', '_', os.path.basename(job))
+            self._profiler = Profiler(profile_dir, prefix)
+        self._last = Snapshot()
+        if self._profiler:
+            self._profiler.start()
+
+    def mark(self, stage, chunk=None, audio_s=None):
+        """Zakończ etap trwający od poprzedniego wywołania (lub utworzenia) i zacznij kolejny"""
+        if self._profiler:
+            self._profiler.stop(stage, chunk)
+        now = Snapshot()
+        before, self._last = self._last, now
+        wall = now.wall - before.wall
+        if audio_s is None and chunk is None:
+            audio_s = self.audio_seconds
+        record = {
+            'job': self.job,
+            'stage': stage,
+            'wall_s': wall,
+            'cpu_s': now.cpu - before.cpu,
+            'children_cpu_s': now.children_cpu - before.children_cpu,
+            'peak_rss_mb': peak_rss_mb(),
+            'read_bytes': _delta(now.read, before.read),
+            'write_bytes': _delta(now.written, before.written),
+            'audio_s': audio_s,
+            'speed': audio_s / wall if audio_s and wall > 0 else None,
+        }
+        if chunk is not None:
+            record['chunk'] = chunk
+        self.records.append(record)
+        self.timings[stage] = self.timings.get(stage, 0.0) + wall
+        if self.sink:
+            self.sink(record)
+        if self._profiler:
+            self._profiler.start()
+        # Pomiar zajmuje chwilę - kolejny etap liczymy od teraz
+        self._last.wall = time.perf_counter()
+        return record
+
+    def close(self):
+        """Zakończ profilowanie (bez zapisywania niedokończonego etapu)"""
+        if self._profiler:
+            self._profiler.stop(None)
+            self._profiler = None
+
+
+class JsonLinesSink:
+    """Dopisywanie rekordów do pliku JSON lines (bezpieczne dla wielu wątków)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        line = json.dumps(dict(record, time=time.time()), ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text(records):
+    """Podsumowanie rekordów w formacie tekstowym Prometheus (sumy per etap)"""
+    totals = {}
+    for record in records:
+        stage = totals.setdefault(record['stage'], {'wall': 0.0, 'cpu': 0.0, 'children_cpu': 0.0,
+                                                    'read': 0, 'write': 0, 'audio': 0.0, 'count': 0})
+        stage['wall'] += record['wall_s']
+        stage['cpu'] += record['cpu_s']
+        stage['children_cpu'] += record['children_cpu_s']
+        stage['read'] += record['read_bytes'] or 0
+        stage['write'] += record['write_bytes'] or 0
+        stage['audio'] += record['audio_s'] or 0.0
+        stage['count'] += 1
+
+    metrics = [
+        ('censor_stage_wall_seconds_total', 'counter', "Czas rzeczywisty etapu", 'wall'),
+        ('censor_stage_cpu_seconds_total', 'counter', "Czas CPU procesu w etapie", 'cpu'),
+        ('censor_stage_children_cpu_seconds_total', 'counter', "Czas CPU procesów potomnych w etapie", 'children_cpu'),
+        ('censor_stage_read_bytes_total', 'counter', "Bajty przeczytane w etapie", 'read'),
+        ('censor_stage_written_bytes_total', 'counter', "Bajty zapisane w etapie", 'write'),
+        ('censor_stage_audio_seconds_total', 'counter', "Sekundy audio przetworzone w etapie", 'audio'),
+        ('censor_stage_runs_total', 'counter', "Liczba wykonań etapu", 'count'),
+    ]
+    lines = []
+    for name, kind, help_text, key in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for stage, values in sorted(totals.items()):
+            lines.append(f'{name}{{stage="{_label(stage)}"}} {values[key]}')
+    peaks = [r['peak_rss_mb'] for r in records if r['peak_rss_mb'] is not None]
+    if peaks:
+        lines.append("# HELP censor_peak_rss_bytes Najwyższe zużycie pamięci procesu")
+        lines.append("# TYPE censor_peak_rss_bytes gauge")
+        lines.append(f"censor_peak_rss_bytes {int(max(peaks) * 1024 * 1024)}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path, records):
+    """Zapisz podsumowanie atomowo (plik jest czytany przez zewnętrzny kolektor)"""
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text(records))
+    os.replace(temp, path)
@@ -0,0 +1,184 @@
+"""Manifest zadań (SQLite) - wznawianie przerwanych zadań i pomijanie już wykonanych.
+
+Dla każdego zadania (skrót pliku wejściowego + słowa + ustawienia, które
+wpływają na wynik) zapisywane są kolejne gotowe etapy:
+
+    chunks   transkrypcje gotowych segmentów dużego pliku (np. wysłanych do API),
+             usuwane, gdy cała transkrypcja jest gotowa
+    matched  znalezione trafienia (po dopasowaniu granic) - wznowione zadanie
+             od razu nakłada cenzurę
+    done / not_found  zadanie zakończone; z plikiem wynikowym (rozmiar i czas
+             modyfikacji), który przy kolejnym uruchomieniu pozwala zadanie pominąć
+
+Skrót pliku wejściowego jest liczony raz i zapamiętywany razem z rozmiarem
+i czasem modyfikacji pliku, więc ponowny przebieg po tysiącach plików nie
+czyta ich w całości. Manifest może być współdzielony przez wątki i procesy
+(tryb WAL, blokady SQLite).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'censorship-recordings', 'jobs.sqlite3')
+CHUNK_MAX_AGE_S = 7 * 24 * 3600  # segmenty porzuconych zadań
+_HASH_BLOCK_BYTES = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY, input TEXT, output TEXT, status TEXT, hits TEXT,
+    output_size INTEGER, output_mtime_ns INTEGER, updated REAL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    audio_key TEXT, start REAL, end REAL, transcript TEXT, updated REAL,
+    PRIMARY KEY (audio_key, start, end)
+);
+"""
+
+
+def file_sha256(path):
+    """SHA-256 zawartości pliku"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def job_key(input_hash, settings):
+    """Klucz zadania: skrót wejścia + ustawienia (słownik, kolejność kluczy bez znaczenia)"""
+    data = json.dumps({'input': input_hash, 'settings': settings}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class ChunkCheckpoints:
+    """Gotowe segmenty jednego nagrania (kluczem są nagranie, ustawienia rozpoznawania i czasy segmentu)"""
+
+    def __init__(self, manifest, audio_key):
+        self.manifest = manifest
+        self.audio_key = audio_key
+
+    def get(self, start, end):
+        """Transkrypcja segmentu [start, end) lub None"""
+        return self.manifest.get_chunk(self.audio_key, start, end)
+
+    def put(self, start, end, transcription):
+        self.manifest.put_chunk(self.audio_key, start, end, transcription)
+
+    def clear(self):
+        """Usuń segmenty - cała transkrypcja jest już gotowa"""
+        self.manifest.forget_chunks(self.audio_key)
+
+
+class JobManifest:
+    """Manifest zadań w pliku SQLite"""
+
+    def __init__(self, path=None):
+        self.path = path or DEFAULT_MANIFEST_PATH
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            try:
+                self._db.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.OperationalError:
+                pass  # np. system plików bez obsługi WAL - zwykły dziennik
+            self._db.executescript(_SCHEMA)
+            self._db.execute("DELETE FROM chunks WHERE updated < ?", (time.time() - CHUNK_MAX_AGE_S,))
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def input_hash(self, path):
+        """Skrót pliku wejściowego (zapamiętany, dopóki plik nie zmieni rozmiaru ani czasu modyfikacji)"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        rows = self._execute("SELECT sha256 FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+                             (path, stat.st_size, stat.st_mtime_ns))
+        if rows:
+            return rows[0][0]
+        digest = file_sha256(path)
+        self._execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (path, stat.st_size, stat.st_mtime_ns, digest))
+        return digest
+
+    def get_job(self, key):
+        """Stan zadania: {'status', 'input', 'output', 'hits'} lub None"""
+        rows = self._execute("SELECT status, input, output, hits, output_size, output_mtime_ns FROM jobs WHERE key = ?",
+                             (key,))
+        if not rows:
+            return None
+        status, input_file, output_file, hits, output_size, output_mtime_ns = rows[0]
+        return {
+            'status': status, 'input': input_file, 'output': output_file,
+            'hits': json.loads(hits) if hits else None,
+            'output_size': output_size, 'output_mtime_ns': output_mtime_ns,
+        }
+
+    def finished_job(self, key, output_file):
+        """Zakończone zadanie, którego wynik (jeśli był) nadal leży w output_file bez zmian; inaczej None"""
+        job = self.get_job(key)
+        if job is None or job['status'] not in ('done', 'not_found'):
+            return None
+        if job['status'] == 'not_found':
+            return job
+        if os.path.abspath(output_file) != job['output']:
+            return None
+        try:
+            stat = os.stat(output_file)
+        except OSError:
+            return None
+        if stat.st_size != job['output_size'] or stat.st_mtime_ns != job['output_mtime_ns']:
+            return None
+        return job
+
+    def record(self, key, input_file, output_file, status, hits=None):
+        """Zapisz etap zadania: 'matched' (z trafieniami), 'done' (ze stanem pliku wynikowego) lub 'not_found'"""
+        output_size = output_mtime_ns = None
+        if status == 'done':
+            stat = os.stat(output_file)
+            output_size, output_mtime_ns = stat.st_size, stat.st_mtime_ns
+        self._execute(
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, os.path.abspath(input_file), os.path.abspath(output_file), status,
+             json.dumps(hits, ensure_ascii=False) if hits is not None else None,
+             output_size, output_mtime_ns, time.time()),
+        )
+
+    def chunk_checkpoints(self, audio_key):
+        return ChunkCheckpoints(self, audio_key)
+
+    def get_chunk(self, audio_key, start, end):
+        rows = self._execute("SELECT transcript FROM chunks WHERE audio_key = ? AND start = ? AND end = ?",
+                             (audio_key, round(start, 3), round(end, 3)))
+        return json.loads(rows[0][0]) if rows else None
+
+    def put_chunk(self, audio_key, start, end, transcription):
+        self._execute("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)",
+                      (audio_key, round(start, 3), round(end, 3),
+                       json.dumps(transcription, ensure_ascii=False, separators=(',', ':')), time.time()))
+
+    def forget_chunks(self, audio_key):
+        self._execute("DELETE FROM chunks WHERE audio_key = ?", (audio_key,))
+
+
+_shared_manifest = None
+_shared_manifest_lock = threading.Lock()
+
+
+def get_job_manifest():
+    """Współdzielony manifest z JOB_MANIFEST (ścieżka; '0' - wyłączony, wtedy None)"""
+    global _shared_manifest
+    setting = os.getenv('JOB_MANIFEST', '')
+    if setting == '0':
+        return None
+    with _shared_manifest_lock:
+        if _shared_manifest is None:
+            _shared_manifest = JobManifest(setting or None)
+        return _shared_manifest
@@ -0,0 +1,560 @@
+"""Cenzura na żywo - mikrofon, PCM ze stdin, lokalne gniazdo lub plik.
+
+Wejście jest opóźniane o stały bufor (np. 3 s). W tym czasie mały model
+Whisper rozpoznaje przesuwające się okna ostatnich kilku sekund, a znalezione
+słowa są zastępowane beepem, zanim fragment trafi na wyjście. Opóźnienie
+wyjścia jest stałe: jeśli rozpoznawanie nie nadąża, fragment jest wypuszczany
+bez sprawdzenia i liczony w metrykach, zamiast rosnącego opóźnienia.
+
+Przykłady:
+    python live.py --source mic --word kurcze
+    arecord -f S16_LE -r 16000 -c 1 | python live.py --source stdin --word kurcze --output - | aplay -f S16_LE -r 16000
+    python live.py --source file --input nagranie.wav --word kurcze --output wynik.wav
+"""
+import argparse
+import queue
+import socket
+import sys
+import threading
+import time
+import wave
+from collections import deque
+
+import numpy as np
+
+import backends
+from censor_effects import DEFAULT_EFFECT, EFFECTS, pitch_grain_frames
+from censor_render import bytes_to_samples, hits_to_regions, render_regions, samples_to_bytes
+from transcript_merge import shift_and_trim
+from word_matcher import MATCH_MODES, WordMatcher, load_words
+
+RECOGNITION_RATE = 16000  # Whisper oczekuje 16 kHz mono
+DEFAULT_BLOCK_MS = 20
+DEFAULT_DELAY_S = 3.0
+DEFAULT_WINDOW_S = 5.0
+DEFAULT_HOP_S = 1.0
+DEFAULT_QUEUE_S = 10.0
+# Słowo przecięte końcem okna jest niepewne - koniec okna uznajemy za sprawdzony dopiero w następnym
+EDGE_GUARD_S = 0.5
+
+
+class AudioParams:
+    """Format strumienia PCM (jak wave.getparams, ale bez liczby ramek)"""
+
+    def __init__(self, framerate=RECOGNITION_RATE, nchannels=1, sampwidth=2):
+        self.framerate = framerate
+        self.nchannels = nchannels
+        self.sampwidth = sampwidth
+
+    @property
+    def frame_bytes(self):
+        return self.nchannels * self.sampwidth
+
+
+class FileSource:
+    """Plik WAV odtwarzany blokami - zastępuje mikrofon przy testach bez sprzętu.
+
+    Przy realtime=True bloki są oddawane w tempie nagrania, więc opóźnienia
+    i zgubione ramki zachowują się jak przy prawdziwym wejściu.
+    """
+
+    def __init__(self, wav_file, block_ms=DEFAULT_BLOCK_MS, realtime=True):
+        self._wf = wave.open(wav_file, 'rb')
+        self.params = AudioParams(self._wf.getframerate(), self._wf.getnchannels(), self._wf.getsampwidth())
+        self.block_frames = max(self.params.framerate * block_ms // 1000, 1)
+        self.realtime = realtime
+        self._started = None
+        self._frames_read = 0
+
+    def read(self):
+        """Następny blok surowych ramek albo b'' na końcu strumienia"""
+        if self._started is None:
+            self._started = time.perf_counter()
+        raw = self._wf.readframes(self.block_frames)
+        self._frames_read += len(raw) // self.params.frame_bytes
+        if self.realtime and raw:
+            wait = self._started + self._frames_read / self.params.framerate - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        return raw
+
+    def close(self):
+        self._wf.close()
+
+
+class StdinSource:
+    """Surowy PCM (little-endian ze znakiem) ze standardowego wejścia"""
+
+    def __init__(self, params, block_ms=DEFAULT_BLOCK_MS, stream=None):
+        self.params = params
+        self.block_bytes = max(params.framerate * block_ms // 1000, 1) * params.frame_bytes
+        self._stream = stream or sys.stdin.buffer
+
+    def read(self):
+        data = b''
+        while len(data) < self.block_bytes:
+            chunk = self._stream.read(self.block_bytes - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data[:len(data) - len(data) % self.params.frame_bytes]
+
+    def close(self):
+        pass
+
+
+class SocketSource(StdinSource):
+    """Surowy PCM z lokalnego gniazda TCP - czeka na jedno połączenie"""
+
+    def __init__(self, params, port, host='127.0.0.1', block_ms=DEFAULT_BLOCK_MS):
+        self._server = socket.create_server((host, port))
+        self._conn, _ = self._server.accept()
+        super().__init__(params, block_ms, stream=self._conn.makefile('rb'))
+
+    def close(self):
+        self._conn.close()
+        self._server.close()
+
+
+class MicrophoneSource:
+    """Mikrofon przez PyAudio"""
+
+    def __init__(self, params, block_ms=DEFAULT_BLOCK_MS, device_index=None):
+        pyaudio = backends.load('pyaudio')
+        self.params = params
+        self.block_frames = max(params.framerate * block_ms // 1000, 1)
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=self._audio.get_format_from_width(params.sampwidth),
+            channels=params.nchannels,
+            rate=params.framerate,
+            input=True,
+            input_device_index=device_index,
+            frames_per_buffer=self.block_frames,
+        )
+
+    def read(self):
+        # Przepełnienie bufora karty nie przerywa pracy - brakujące ramki widać w metrykach opóźnienia
+        return self._stream.read(self.block_frames, exception_on_overflow=False)
+
+    def close(self):
+        self._stream.stop_stream()
+        self._stream.close()
+        self._audio.terminate()
+
+
+class WavSink:
+    """Zapis wyjścia do pliku WAV"""
+
+    def __init__(self, wav_file, params):
+        self._wf = wave.open(wav_file, 'wb')
+        self._wf.setnchannels(params.nchannels)
+        self._wf.setsampwidth(params.sampwidth)
+        self._wf.setframerate(params.framerate)
+
+    def write(self, raw):
+        self._wf.writeframesraw(raw)
+
+    def close(self):
+        self._wf.close()
+
+
+class RawSink:
+    """Surowy PCM na standardowe wyjście (np. do aplay)"""
+
+    def __init__(self, stream=None):
+        self._stream = stream or sys.stdout.buffer
+
+    def write(self, raw):
+        self._stream.write(raw)
+        self._stream.flush()
+
+    def close(self):
+        self._stream.flush()
+
+
+class SpeakerSink:
+    """Odtwarzanie przez PyAudio"""
+
+    def __init__(self, params):
+        pyaudio = backends.load('pyaudio')
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=self._audio.get_format_from_width(params.sampwidth),
+            channels=params.nchannels,
+            rate=params.framerate,
+            output=True,
+        )
+
+    def write(self, raw):
+        self._stream.write(raw)
+
+    def close(self):
+        self._stream.stop_stream()
+        self._stream.close()
+        self._audio.terminate()
+
+
+class LiveMetrics:
+    """Liczniki opóźnień i zgubionych ramek trybu na żywo"""
+
+    def __init__(self, framerate):
+        self.framerate = framerate
+        self.frames_in = 0
+        self.frames_out = 0
+        self.dropped_frames = 0
+        self.unchecked_frames = 0
+        self.windows = 0
+        self.hits = 0
+        self.recognition_latency = []  # s od nagrania końca okna do gotowych trafień
+        self.recognition_rtf = []  # czas rozpoznawania / długość okna
+        self.max_buffered_frames = 0
+
+    def summary(self):
+        """Słownik z podsumowaniem metryk"""
+        latency = sorted(self.recognition_latency)
+        rate = self.framerate
+        return {
+            'input_s': self.frames_in / rate,
+            'output_s': self.frames_out / rate,
+            'dropped_s': self.dropped_frames / rate,
+            'unchecked_s': self.unchecked_frames / rate,
+            'windows': self.windows,
+            'hits': self.hits,
+            'latency_avg_s': sum(latency) / len(latency) if latency else 0.0,
+            'latency_p95_s': latency[int(0.95 * (len(latency) - 1))] if latency else 0.0,
+            'latency_max_s': latency[-1] if latency else 0.0,
+            'rtf_avg': sum(self.recognition_rtf) / len(self.recognition_rtf) if self.recognition_rtf else 0.0,
+            'max_buffered_s': self.max_buffered_frames / rate,
+        }
+
+    def format(self):
+        s = self.summary()
+        return (
+            f"wejście {s['input_s']:.1f}s, wyjście {s['output_s']:.1f}s, zgubione {s['dropped_s']:.2f}s, "
+            f"bez sprawdzenia {s['unchecked_s']:.2f}s | okna {s['windows']}, trafienia {s['hits']} | "
+            f"opóźnienie rozpoznawania śr. {s['latency_avg_s']:.2f}s, p95 {s['latency_p95_s']:.2f}s, "
+            f"maks. {s['latency_max_s']:.2f}s | RTF {s['rtf_avg']:.2f}"
+        )
+
+
+def to_recognition_audio(samples, params):
+    """Próbki (ramki, kanały) -> float32 mono 16 kHz dla Whisper"""
+    full_scale = float(1 << (8 * params.sampwidth - 1))
+    mono = samples.astype(np.float32).mean(axis=1) / full_scale
+    if params.framerate == RECOGNITION_RATE or len(mono) == 0:
+        return mono
+    count = int(round(len(mono) * RECOGNITION_RATE / params.framerate))
+    positions = np.arange(count) * (params.framerate / RECOGNITION_RATE)
+    return np.interp(positions, np.arange(len(mono)), mono).astype(np.float32)
+
+
+def whisper_recognizer(model_name='base'):
+    """Funkcja rozpoznająca okno audio (float32 16 kHz) lokalnym modelem Whisper"""
+    from model_cache import get_model_cache
+    model = get_model_cache().get(model_name)
+
+    def recognize(audio):
+        return model.transcribe(
+            audio, language='pl', word_timestamps=True, fp16=False, condition_on_previous_text=False
+        )
+
+    return recognize
+
+
+class LiveCensor:
+    """Opóźniona pętla wejście -> rozpoznawanie -> beep -> wyjście.
+
+    Wątek czytający przenosi bloki ze źródła do ograniczonej kolejki (gdy jest
+    pełna, blok jest gubiony i liczony). Wątek rozpoznawania co hop_s sekund
+    rozpoznaje ostatnie window_s sekund. Główna pętla wypuszcza na wyjście
+    bloki starsze niż delay_s, nakładając beep na trafienia.
+    """
+
+    def __init__(self, source, sink, matcher, recognize, delay_s=DEFAULT_DELAY_S,
+                 window_s=DEFAULT_WINDOW_S, hop_s=DEFAULT_HOP_S, queue_s=DEFAULT_QUEUE_S, effect=DEFAULT_EFFECT,
+                 log=None):
+        self.source = source
+        self.sink = sink
+        self.matcher = matcher
+        self.recognize = recognize
+        self.params = source.params
+        self.effect = effect
+        self.delay_frames = int(delay_s * self.params.framerate)
+        self.window_s = window_s
+        self.hop_frames = int(hop_s * self.params.framerate)
+        self.queue_s = queue_s
+        # Źródło czytane szybciej niż w czasie rzeczywistym (plik) - bez gubienia ramek
+        self.realtime = getattr(source, 'realtime', True)
+        self._log = log or (lambda message: print(message, file=sys.stderr, flush=True))
+        self.metrics = LiveMetrics(self.params.framerate)
+
+        self._queue = None
+        self._pending = deque()  # (offset, surowe ramki) czekające na wypuszczenie
+        self._emitted = deque()  # (offset, surowe ramki) ostatnio wypuszczone - ziarna zmiany głosu sprzed bloku
+        self._history = deque()  # (offset, audio 16 kHz) dla okna rozpoznawania
+        self._history_samples = 0
+        self._captured = 0  # ramki odebrane ze źródła
+        self._checked = 0  # ramki, do których rozpoznawanie jest pewne
+        self._recognized_to = 0  # koniec ostatnio rozpoznanego okna
+        self._hits = []
+        self._lock = threading.Condition()
+        self._captured_at = None  # kiedy odebrano ostatni blok
+        self._finished = False
+        self.recognition_error = None
+
+    def _read_loop(self):
+        """Wątek czytający ze źródła - nie blokuje się na przetwarzaniu"""
+        try:
+            while True:
+                raw = self.source.read()
+                if not raw:
+                    break
+                if not self.realtime:
+                    self._queue.put((raw, time.perf_counter()))
+                    continue
+                try:
+                    self._queue.put_nowait((raw, time.perf_counter()))
+                except queue.Full:
+                    self.metrics.dropped_frames += len(raw) // self.params.frame_bytes
+        finally:
+            self._queue.put((None, None))
+
+    def _snapshot(self):
+        """Ostatnie window_s sekund audio do rozpoznania: (audio, czas początku, ramka końca)"""
+        audio = np.concatenate([chunk for _, chunk in self._history]) if self._history else np.zeros(0, np.float32)
+        end = self._captured
+        start_time = end / self.params.framerate - len(audio) / RECOGNITION_RATE
+        return audio, max(start_time, 0.0), end
+
+    def _recognition_loop(self):
+        """Wątek rozpoznawania przesuwających się okien"""
+        rate = self.params.framerate
+        guard = int(EDGE_GUARD_S * rate)
+        while True:
+            with self._lock:
+                self._lock.wait_for(
+                    lambda: self._finished or self._captured - self._recognized_to >= self.hop_frames
+                )
+                if self._captured <= self._recognized_to:
+                    # Koniec strumienia tuż po ostatnim oknie - nic więcej nie dojdzie, koniec jest pewny
+                    self._checked = self._recognized_to
+                    self._lock.notify_all()
+                    return
+                final = self._finished
+                audio, start_time, end = self._snapshot()
+                captured_at = self._captured_at or time.perf_counter()
+
+            started = time.perf_counter()
+            try:
+                result = self.recognize(audio)
+            except Exception as e:
+                with self._lock:
+                    self.recognition_error = e
+                    self._lock.notify_all()
+                return
+            elapsed = time.perf_counter() - started
+            hits = self.matcher.find_in_segments(shift_and_trim(result, start_time))
+
+            with self._lock:
+                added = self._merge_hits(hits)
+                self._recognized_to = end
+                self._checked = end if final else max(self._checked, end - guard)
+                self.metrics.windows += 1
+                self.metrics.hits += added
+                self.metrics.recognition_latency.append(time.perf_counter() - captured_at)
+                if len(audio):
+                    self.metrics.recognition_rtf.append(elapsed / (len(audio) / RECOGNITION_RATE))
+                self._lock.notify_all()
+
+    def _merge_hits(self, hits):
+        """Dodaj nowe trafienia; to samo słowo z zachodzących okien liczymy raz"""
+        added = 0
+        for hit in hits:
+            duplicate = any(
+                h['term'] == hit['term'] and h['start'] < hit['end'] and hit['start'] < h['end']
+                for h in self._hits
+            )
+            if not duplicate:
+                self._hits.append(hit)
+                added += 1
+                self._log(f"🔇 '{hit['word']}' w {hit['start']:.2f}s - {hit['end']:.2f}s")
+        return added
+
+    def _emit(self, until):
+        """Wypuść na wyjście oczekujące bloki kończące się przed ramką until"""
+        rate = self.params.framerate
+        while self._pending:
+            offset, raw = self._pending[0]
+            frames = len(raw) // self.params.frame_bytes
+            if offset + frames > until:
+                break
+            self._pending.popleft()
+            self._emitted.append((offset, raw))
+            while len(self._emitted) > 1 and self._emitted[1][0] <= offset - pitch_grain_frames(rate):
+                self._emitted.popleft()
+            with self._lock:
+                # Trafienie zostaje, dopóki słowo mieści się w oknie rozpoznawania - inaczej byłoby liczone ponownie
+                horizon = min(offset, self._recognized_to - self.window_s * rate)
+                self._hits = [h for h in self._hits if h['end'] * rate > horizon]
+                hits = [h for h in self._hits if h['end'] * rate > offset]
+                checked = self._checked
+            if offset + frames > checked:
+                self.metrics.unchecked_frames += offset + frames - max(offset, checked)
+            regions = hits_to_regions(hits, rate, self._captured)
+            if regions and regions[0][0] < offset + frames:
+                samples = bytes_to_samples(raw, self.params.sampwidth, self.params.nchannels)
+                render_regions(samples, regions, rate, self.params.sampwidth, offset=offset, effect=self.effect,
+                               read_original=self._read_original)
+                raw = samples_to_bytes(samples, self.params.sampwidth)
+            self.sink.write(raw)
+            self.metrics.frames_out += frames
+
+    def _read_original(self, first, last):
+        """Oryginalne ramki [first, last) z bloków wypuszczonych i oczekujących (tyle, ile jest w pamięci)"""
+        parts = []
+        available = None
+        for offset, raw in list(self._emitted) + list(self._pending):
+            frames = len(raw) // self.params.frame_bytes
+            lo, hi = max(first, offset), min(last, offset + frames)
+            if lo >= hi:
+                continue
+            if available is None:
+                available = lo
+            samples = bytes_to_samples(raw, self.params.sampwidth, self.params.nchannels)
+            parts.append(samples[lo - offset:hi - offset])
+        return np.concatenate(parts), available
+
+    def run(self, report_every_s=10.0):
+        """Przetwarzaj strumień do jego końca (lub Ctrl+C); zwraca metryki"""
+        rate = self.params.framerate
+        block_guess = max(rate * DEFAULT_BLOCK_MS // 1000, 1)
+        self._queue = queue.Queue(maxsize=max(int(self.queue_s * rate / block_guess), 1))
+        window_samples = int(self.window_s * RECOGNITION_RATE)
+
+        reader = threading.Thread(target=self._read_loop, daemon=True)
+        recognizer = threading.Thread(target=self._recognition_loop, daemon=True)
+        reader.start()
+        recognizer.start()
+        next_report = time.perf_counter() + report_every_s
+
+        try:
+            while True:
+                raw, captured_at = self._queue.get()
+                if raw is None:
+                    break
+                samples = bytes_to_samples(raw, self.params.sampwidth, self.params.nchannels)
+                frames = len(samples)
+                with self._lock:
+                    offset = self._captured
+                    self._pending.append((offset, raw))
+                    self._history.append((offset, to_recognition_audio(samples, self.params)))
+                    self._history_samples += len(self._history[-1][1])
+                    while self._history_samples - len(self._history[0][1]) >= window_samples:
+                        self._history_samples -= len(self._history.popleft()[1])
+                    self._captured += frames
+                    self._captured_at = captured_at
+                    self.metrics.frames_in += frames
+                    self.metrics.max_buffered_frames = max(
+                        self.metrics.max_buffered_frames, self._captured - self.metrics.frames_out
+                    )
+                    self._lock.notify_all()
+                    if not self.realtime:
+                        # Plik bez tempa nagrania: czekamy na rozpoznawanie zamiast wypuszczać niesprawdzone audio
+                        self._lock.wait_for(lambda: self._captured - self._recognized_to < self.hop_frames
+                                            or self.recognition_error is not None)
+                if self.recognition_error is not None:
+                    break
+                self._emit(self._captured - self.delay_frames)
+
+                if time.perf_counter() >= next_report:
+                    self._log(f"📊 {self.metrics.format()}")
+                    next_report += report_every_s
+        except KeyboardInterrupt:
+            self._log("Przerwano - wypuszczanie bufora...")
+        finally:
+            # Koniec strumienia: rozpoznaj resztę i wypuść cały bufor
+            with self._lock:
+                self._finished = True
+                self._lock.notify_all()
+            recognizer.join()
+            self._emit(self._captured)
+            self.source.close()
+            self.sink.close()
+
+        if self.recognition_error is not None:
+            self._log(f"❌ Błąd rozpoznawania: {self.recognition_error}")
+        return self.metrics
+
+
+def build_parser():
+    """Parser argumentów trybu na żywo"""
+    parser = argparse.ArgumentParser(description="Cenzura na żywo z opóźnieniem wyjścia")
+    parser.add_argument('--source', choices=('mic', 'stdin', 'socket', 'file'), default='mic',
+                        help="źródło dźwięku (domyślnie: %(default)s)")
+    parser.add_argument('--input', help="plik WAV dla --source file")
+    parser.add_argument('--port', type=int, default=5055, help="port TCP dla --source socket")
+    parser.add_argument('--rate', type=int, default=RECOGNITION_RATE, help="częstotliwość PCM mic/stdin/socket")
+    parser.add_argument('--channels', type=int, default=1, help="liczba kanałów PCM mic/stdin/socket")
+    parser.add_argument('--no-realtime', action='store_true', help="--source file: czytaj plik bez czekania")
+    parser.add_argument('--output', help="plik WAV, '-' dla surowego PCM na stdout (domyślnie głośniki)")
+    parser.add_argument('-w', '--word', action='append', dest='words', help="słowo do ocenzurowania (można powtarzać)")
+    parser.add_argument('--words-file', help="plik ze słowami do ocenzurowania (jedno w linii)")
+    parser.add_argument('--match', choices=MATCH_MODES, default='whole', help="dopasowanie całych słów lub prefiksów")
+    parser.add_argument('--exact-forms', action='store_true', help="nie dopasowuj odmian słów")
+    parser.add_argument('-m', '--model', default="base", help="model lokalnego Whisper (domyślnie: %(default)s)")
+    parser.add_argument('--delay', type=float, default=DEFAULT_DELAY_S, help="opóźnienie wyjścia w sekundach")
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW_S, help="długość okna rozpoznawania")
+    parser.add_argument('--hop', type=float, default=DEFAULT_HOP_S, help="co ile sekund rozpoznawać nowe okno")
+    parser.add_argument('--effect', choices=EFFECTS, default=DEFAULT_EFFECT, help="efekt cenzury (domyślnie: %(default)s)")
+    return parser
+
+
+def open_source(args):
+    """Utwórz źródło dźwięku z argumentów"""
+    params = AudioParams(args.rate, args.channels)
+    if args.source == 'file':
+        return FileSource(args.input, realtime=not args.no_realtime)
+    if args.source == 'stdin':
+        return StdinSource(params)
+    if args.source == 'socket':
+        print(f"Oczekiwanie na połączenie na 127.0.0.1:{args.port}...", file=sys.stderr)
+        return SocketSource(params, args.port)
+    return MicrophoneSource(params)
+
+
+def main(argv=None):
+    """Uruchom cenzurę na żywo; zwraca kod wyjścia procesu"""
+    args = build_parser().parse_args(argv)
+    words = load_words(args.words, args.words_file)
+    if not words:
+        print("❌ Podaj słowa do ocenzurowania (--word lub --words-file)", file=sys.stderr)
+        return 2
+    if args.source == 'file' and not args.input:
+        print("❌ --source file wymaga --input", file=sys.stderr)
+        return 2
+    if args.delay < args.hop + EDGE_GUARD_S:
+        print(f"⚠️ Opóźnienie {args.delay}s jest krótsze niż hop + {EDGE_GUARD_S}s - część audio wyjdzie bez sprawdzenia",
+              file=sys.stderr)
+
+    print(f"Ładowanie modelu Whisper: {args.model}", file=sys.stderr)
+    recognize = whisper_recognizer(args.model)
+    matcher = WordMatcher(words, mode=args.match, inflection=not args.exact_forms)
+
+    source = open_source(args)
+    if args.output == '-':
+        sink = RawSink()
+    elif args.output:
+        sink = WavSink(args.output, source.params)
+    else:
+        sink = SpeakerSink(source.params)
+
+    live = LiveCensor(source, sink, matcher, recognize, delay_s=args.delay, window_s=args.window, hop_s=args.hop,
+                      effect=args.effect)
+    metrics = live.run()
+    print(f"📊 {metrics.format()}", file=sys.stderr)
+    return 1 if live.recognition_error is not None else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
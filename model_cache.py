@@ -0,0 +1,147 @@
+"""Współdzielony cache załadowanych modeli Whisper.
+
+Ładowanie modelu (szczególnie medium/large) trwa od kilku do kilkudziesięciu
+sekund, dlatego modele są trzymane w pamięci między zadaniami i zwalniane
+według zasady LRU po przekroczeniu budżetu pamięci.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+# Przybliżone rozmiary modeli w MB (fp32) - używane gdy nie da się policzyć parametrów
+APPROX_MODEL_SIZE_MB = {
+    'tiny': 150,
+    'base': 290,
+    'small': 970,
+    'medium': 3060,
+    'large': 6180,
+}
+
+DEFAULT_CACHE_MB = 8192
+
+
+def _default_loader(name, device):
+    """Załaduj model Whisper (import dopiero przy pierwszym użyciu)"""
+    import whisper
+    return whisper.load_model(name, device=device)
+
+
+def default_device():
+    """Ustal urządzenie, którego użyje whisper.load_model przy device=None"""
+    try:
+        import torch
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+def estimate_model_size(model, name=None):
+    """Oszacuj rozmiar modelu w bajtach"""
+    try:
+        return sum(p.numel() * p.element_size() for p in model.parameters())
+    except Exception:
+        base_name = (name or '').split('.')[0].split('-')[0]
+        return APPROX_MODEL_SIZE_MB.get(base_name, 1024) * 1024 * 1024
+
+
+class WhisperModelCache:
+    """Cache modeli Whisper kluczowany nazwą modelu i urządzeniem, z limitem pamięci (LRU)"""
+
+    def __init__(self, max_memory_mb=DEFAULT_CACHE_MB, loader=None):
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self._loader = loader or _default_loader
+        self._models = OrderedDict()  # (nazwa, urządzenie) -> (model, rozmiar)
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name, device=None):
+        """Zwróć model z cache lub załaduj go, jeśli nie był jeszcze używany"""
+        key = (name, device or default_device())
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key][0]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Osobna blokada dla każdego klucza - dwa wątki nie ładują tego samego modelu
+        with load_lock:
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    self.hits += 1
+                    return self._models[key][0]
+                self.misses += 1
+
+            model = self._loader(name, key[1])
+            size = estimate_model_size(model, name)
+
+            with self._lock:
+                self._models[key] = (model, size)
+                self._evict(keep=key)
+            return model
+
+    def warm_up(self, names, device=None):
+        """Załaduj wskazane modele z wyprzedzeniem (np. przy starcie aplikacji)"""
+        loaded = []
+        for name in names:
+            name = name.strip()
+            if name:
+                self.get(name, device)
+                loaded.append(name)
+        return loaded
+
+    def _evict(self, keep):
+        """Usuwaj najdawniej używane modele dopóki nie zmieścimy się w budżecie"""
+        while self.memory_bytes() > self.max_memory_bytes and len(self._models) > 1:
+            oldest = next(iter(self._models))
+            if oldest == keep:
+                break
+            del self._models[oldest]
+            self.evictions += 1
+
+    def memory_bytes(self):
+        """Łączny szacowany rozmiar modeli w cache"""
+        return sum(size for _, size in self._models.values())
+
+    def clear(self):
+        """Usuń wszystkie modele z cache"""
+        with self._lock:
+            self._models.clear()
+
+    def stats(self):
+        """Statystyki cache: trafienia, chybienia, usunięcia i zajęta pamięć"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'models': [f"{name}@{device}" for name, device in self._models],
+                'memory_mb': self.memory_bytes() / (1024 * 1024),
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_model_cache():
+    """Zwróć współdzielony (na cały proces) cache modeli Whisper"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            max_mb = float(os.getenv('WHISPER_MODEL_CACHE_MB', DEFAULT_CACHE_MB))
+            _shared_cache = WhisperModelCache(max_memory_mb=max_mb)
+        return _shared_cache
+
+
+def preload_models_from_env(device=None):
+    """Załaduj modele wymienione w WHISPER_PRELOAD_MODELS (oddzielone przecinkami)"""
+    names = [n for n in os.getenv('WHISPER_PRELOAD_MODELS', '').split(',') if n.strip()]
+    if not names:
+        return []
+    return get_model_cache().warm_up(names, device)
@@ -0,0 +1,171 @@
+"""Równoległe rozpoznawanie lokalnym Whisper na wielu rdzeniach CPU.
+
+Bez GPU jedno wywołanie model.transcribe wykorzystuje tylko część rdzeni
+(dekodowanie jest w dużej mierze sekwencyjne). Nagranie jest więc dzielone
+w miejscach ciszy na fragmenty, które rozpoznaje pula procesów. Każdy proces
+ładuje model raz i trzyma go między zadaniami, a liczba wątków torch na
+proces jest ograniczona tak, żeby procesy nie walczyły o te same rdzenie.
+Wyniki są sklejane w kolejności fragmentów (transcript_merge).
+"""
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from chunking import DEFAULT_OVERLAP_S, DEFAULT_SEARCH_S, WAV_HEADER_BYTES, split_wav_on_silence
+from transcript_merge import remove_chunk_files, stitch_transcriptions
+from wav_stream import wav_params
+
+MIN_SHARD_S = 60  # krótsze fragmenty tracą na narzucie i kontekście
+SHARDS_PER_WORKER = 2  # więcej fragmentów niż procesów wyrównuje obciążenie
+THREADS_PER_WORKER = 4
+
+# Stan procesu roboczego
+_worker_model = None
+
+
+def _init_worker(model_name, threads):
+    """Inicjalizacja procesu puli: limity wątków i jednorazowe załadowanie modelu"""
+    global _worker_model
+    os.environ['OMP_NUM_THREADS'] = str(threads)
+    os.environ['MKL_NUM_THREADS'] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # można ustawić tylko przed pierwszą operacją równoległą
+    import whisper
+    _worker_model = whisper.load_model(model_name, device='cpu')
+
+
+def _transcribe_shard(path):
+    """Rozpoznaj jeden fragment w procesie roboczym"""
+    result = _worker_model.transcribe(path, language='pl', word_timestamps=True, fp16=False)
+    return {'segments': result['segments']}
+
+
+def default_workers():
+    """Liczba procesów z WHISPER_WORKERS ('auto' - rdzenie / THREADS_PER_WORKER)"""
+    value = os.getenv('WHISPER_WORKERS', 'auto')
+    if value == 'auto':
+        return max((os.cpu_count() or 1) // THREADS_PER_WORKER, 1)
+    return max(int(value), 1)
+
+
+def shard_count(duration, workers):
+    """Liczba fragmentów dla nagrania o danej długości"""
+    if workers <= 1:
+        return 1
+    return max(min(workers * SHARDS_PER_WORKER, int(duration // MIN_SHARD_S)), 1)
+
+
+class ParallelWhisper:
+    """Pula procesów z załadowanym modelem Whisper rozpoznająca fragmenty nagrania równolegle"""
+
+    def __init__(self, model_name, workers=None, threads_per_worker=None):
+        self.model_name = model_name
+        self.workers = workers or default_workers()
+        if threads_per_worker is None:
+            threads_per_worker = int(os.getenv('WHISPER_THREADS_PER_WORKER', 0)) or \
+                max((os.cpu_count() or 1) // self.workers, 1)
+        self.threads_per_worker = threads_per_worker
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: świeże procesy bez stanu wątków torch i Tk z procesu głównego
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.model_name, self.threads_per_worker),
+                )
+            return self._pool
+
+    def _discard_pool(self, pool):
+        """Porzuć uszkodzoną pulę (np. proces zabity przy braku pamięci) - następne wywołanie utworzy nową"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self, wav_file):
+        """Uruchom wszystkie procesy i załaduj w nich model (krótkie nagranie na każdy proces)"""
+        pool = self._get_pool()
+        try:
+            for future in [pool.submit(_transcribe_shard, wav_file) for _ in range(self.workers)]:
+                future.result()
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise
+
+    def transcribe(self, wav_file, on_shard_done=None, scratch_dir=None):
+        """Rozpoznaj plik WAV; zwraca {'segments': [...]} z czasami względem całego nagrania"""
+        params = wav_params(wav_file)
+        duration = params.nframes / params.framerate
+        shards = shard_count(duration, self.workers)
+        if shards > 1:
+            # Cięcie w ciszy przed limitem i zakładka wydłużają fragmenty - bez zapasu powstałby dodatkowy, krótki
+            slack = int((DEFAULT_OVERLAP_S + DEFAULT_SEARCH_S) * params.framerate)
+            shard_bytes = (math.ceil(params.nframes / shards) + slack) * params.nchannels * params.sampwidth
+            chunks = split_wav_on_silence(wav_file, WAV_HEADER_BYTES + shard_bytes, out_dir=scratch_dir)
+        else:
+            chunks = [{'path': wav_file, 'start': 0.0, 'end': duration}]
+
+        try:
+            pool = self._get_pool()
+            futures = []
+            results = []
+            try:
+                futures = [pool.submit(_transcribe_shard, chunk['path']) for chunk in chunks]
+                for i, future in enumerate(futures):
+                    results.append(future.result())
+                    if on_shard_done:
+                        on_shard_done(i, len(chunks))
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+                raise
+            except BaseException:
+                # Błąd lub przerwanie zadania - nie rozpoznawaj pozostałych fragmentów
+                for future in futures:
+                    future.cancel()
+                raise
+        finally:
+            remove_chunk_files(chunks, keep=wav_file)
+        return stitch_transcriptions(results, chunks)
+
+    def shutdown(self):
+        """Zakończ procesy robocze (modele zostaną zwolnione)"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_parallel_engine(model_name, workers=None):
+    """Współdzielona pula dla modelu - procesy z modelem żyją między plikami"""
+    workers = workers or default_workers()
+    with _engines_lock:
+        key = (model_name, workers)
+        if key not in _engines:
+            _engines[key] = ParallelWhisper(model_name, workers)
+        return _engines[key]
+
+
+@atexit.register
+def shutdown_engines():
+    """Zamknij wszystkie pule przy wyjściu z programu"""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.shutdown()
+        _engines.clear()
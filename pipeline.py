@@ -0,0 +1,814 @@
+"""Potok cenzury niezależny od interfejsu.
+
+Wyciąganie audio, rozpoznawanie mowy, wyszukiwanie słów i nakładanie
+cenzury na jeden plik. Z tego modułu korzysta zarówno aplikacja okienkowa
+(main.py), jak i tryb wsadowy z wiersza poleceń (cli.py).
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import wave
+from dotenv import load_dotenv
+import backends
+from recognizers import audio_duration
+from instrumentation import JsonLinesSink, StageRecorder
+from job_manifest import get_job_manifest, job_key
+from scratch import ScratchWorkspace, remove_stale_workspaces
+from transcriber import get_transcriber
+from ffmpeg_tools import extract_audio, ffmpeg_available, remux_with_audio, transcode_to_wav
+from transcription_cache import audio_fingerprint, cache_key, get_transcription_cache
+from word_matcher import WordMatcher
+
+# Załaduj zmienne środowiskowe z pliku .env
+load_dotenv()
+
+# Sprawdź dostępność bibliotek (bez importowania - import przy pierwszym użyciu)
+SPEECH_RECOGNITION_AVAILABLE = backends.is_installed('speech_recognition')
+if not SPEECH_RECOGNITION_AVAILABLE:
+    print("Uwaga: SpeechRecognition nie jest zainstalowany. Używanie prostego rozpoznawania.")
+
+WHISPER_AVAILABLE = backends.is_installed('whisper')
+if WHISPER_AVAILABLE:
+    print("✅ OpenAI Whisper dostępny - używanie dla lepszego rozpoznawania polskiej mowy")
+else:
+    print("Uwaga: OpenAI Whisper nie jest zainstalowany. Używanie Google Speech Recognition.")
+
+FASTER_WHISPER_AVAILABLE = backends.is_installed('faster_whisper')
+if FASTER_WHISPER_AVAILABLE:
+    print("✅ faster-whisper dostępny - szybsze rozpoznawanie na CPU (int8)")
+
+OPENAI_API_AVAILABLE = backends.is_installed('openai')
+if OPENAI_API_AVAILABLE:
+    # Sprawdź czy klucz API jest dostępny
+    openai_api_key = os.getenv('OPENAI_API_KEY')
+    if openai_api_key:
+        print("✅ OpenAI API klucz załadowany - dostępne Whisper API")
+    else:
+        print("⚠️ Brak klucza OPENAI_API_KEY w pliku .env - tylko lokalny Whisper")
+        OPENAI_API_AVAILABLE = False
+else:
+    print("Uwaga: Biblioteka openai nie jest zainstalowana.")
+
+PYDUB_AVAILABLE = backends.is_installed('pydub')
+if not PYDUB_AVAILABLE:
+    print("Uwaga: pydub nie jest zainstalowany. Ograniczona funkcjonalność audio.")
+
+MOVIEPY_AVAILABLE = backends.is_installed('moviepy')
+if not MOVIEPY_AVAILABLE:
+    print("Uwaga: moviepy nie jest zainstalowany. Brak obsługi wideo.")
+
+NUMPY_RENDER_AVAILABLE = backends.is_installed('numpy')
+if not NUMPY_RENDER_AVAILABLE:
+    print("Uwaga: numpy nie jest zainstalowany. Używanie wolniejszego nakładania cenzury przez pydub.")
+
+
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv']
+AUDIO_EXTENSIONS = ['.wav', '.mp3', '.m4a', '.aac', '.ogg', '.flac', '.mpeg', '.mpga', '.webm']
+# Te same nazwy co censor_effects.EFFECTS (bez importowania numpy przy starcie)
+CENSOR_EFFECTS = ['beep', 'mute', 'noise', 'pitch', 'legacy']
+# Te same nazwy co boundary_refine.REFINE_MODES
+REFINE_MODES = ['energy', 'zero', 'off']
+
+
+class JobCancelled(BaseException):
+    """Zadanie przerwane przez użytkownika.
+
+    Dziedziczy po BaseException (jak KeyboardInterrupt), żeby nie przechwytywały
+    go bloki except Exception z metodami zapasowymi.
+    """
+
+
+def is_video_file(path):
+    """Czy plik jest plikiem wideo (na podstawie rozszerzenia)"""
+    return os.path.splitext(path)[1].lower() in VIDEO_EXTENSIONS
+
+
+class CensorPipeline:
+    """Cenzurowanie pojedynczych plików - wspólne dla GUI i trybu wsadowego"""
+
+    def __init__(self, whisper_model="small", use_api=False, log=None, use_cache=True,
+                 match_mode='whole', inflection=True, streaming=False, window_seconds=None, effect=None,
+                 vad=None, backend=None, metrics=None, profile_dir=None, progress=None, cancel_event=None,
+                 refine=None, pad_ms=None, transcriber=None, manifest=None, force=False):
+        self.whisper_model = whisper_model
+        self.use_api = use_api
+        # Lokalna metoda rozpoznawania: auto (faster-whisper, jeśli zainstalowany), whisper lub faster-whisper
+        self.backend = backend or os.getenv('WHISPER_BACKEND', 'auto')
+        self.streaming = streaming
+        # Efekt cenzury: beep, mute, noise, pitch lub legacy (dawny beep 1 s z pydub)
+        self.effect = effect or os.getenv('CENSOR_EFFECT', 'beep')
+        self.window_seconds = window_seconds or float(os.getenv('STREAM_WINDOW_SECONDS', 60))
+        self.match_mode = match_mode
+        self.inflection = inflection
+        self.use_cache = use_cache and os.getenv('TRANSCRIPTION_CACHE', '1') != '0'
+        # Wykrywanie mowy przed rozpoznawaniem - do rozpoznawania trafiają tylko fragmenty z mową
+        self.vad = (os.getenv('VAD', '1') != '0') if vad is None else vad
+        self.vad_report = None
+        # Czy bieżące zadanie rozpoznała metoda zapasowa (wynik nie trafia wtedy do cache)
+        self.fallback_used = False
+        # Usługa rozpoznawania (transcriber.Transcriber); domyślnie wspólna dla modelu i ustawień
+        self.transcriber = transcriber
+        # Manifest zadań (job_manifest.JobManifest): None - z JOB_MANIFEST, False - wyłączony.
+        # force - przetwórz ponownie także zadania zakończone wcześniej
+        self._manifest = manifest
+        self.force = force
+        self.job = None  # klucz bieżącego zadania w manifeście
+        # Dopasowanie granic trafień do nagrania: energy, zero lub off; margines w ms ('20' lub 'przed,po')
+        self.refine = refine or os.getenv('BOUNDARY_REFINE', 'energy')
+        self.pad_ms = pad_ms if pad_ms is not None else os.getenv('BOUNDARY_PAD_MS')
+        # Katalog roboczy bieżącego zadania (pliki pośrednie, usuwany po zakończeniu run)
+        self.workspace = None
+        # Pomiary etapów: funkcja przyjmująca rekord (domyślnie plik JSON lines z METRICS_FILE)
+        if metrics is None and os.getenv('METRICS_FILE'):
+            metrics = JsonLinesSink(os.getenv('METRICS_FILE'))
+        self.metrics = metrics
+        self.profile_dir = profile_dir or os.getenv('PROFILE_DIR') or None
+        # progress(etap, ułamek 0..1) - postęp bieżącego etapu; cancel_event (threading.Event) przerywa zadanie
+        self._progress = progress
+        self.cancel_event = cancel_event
+        self._log = log or print
+        
+    def log_message(self, message):
+        """Przekaż wiadomość do logów interfejsu"""
+        self._log(message)
+        
+    def checkpoint(self):
+        """Przerwij zadanie (JobCancelled), jeśli użytkownik o to poprosił"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise JobCancelled()
+        
+    def checked_log(self, message):
+        """Wiadomość z długiej operacji (segmenty, fragmenty) - także punkt przerwania zadania"""
+        self.log_message(message)
+        self.checkpoint()
+        
+    def report_progress(self, stage, fraction):
+        """Przekaż postęp etapu (0..1) i sprawdź, czy zadania nie przerwano"""
+        if self._progress is not None:
+            self._progress(stage, fraction)
+        self.checkpoint()
+        
+    def stage_plan(self, input_file):
+        """Etapy, przez które przejdzie zadanie (do wyliczenia postępu całości)"""
+        first = 'extract' if is_video_file(input_file) else 'convert'
+        if self.uses_streaming():
+            stages = [first, 'stream']
+        else:
+            stages = [first, 'transcribe', 'match', 'render']
+        if is_video_file(input_file):
+            stages.append('mux')
+        return stages
+        
+    def temp_file(self, suffix='.wav'):
+        """Ścieżka pliku pośredniego - w katalogu roboczym zadania, jeśli trwa run()"""
+        if self.workspace is not None:
+            return self.workspace.file(suffix)
+        temp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+        temp.close()
+        return temp.name
+        
+    def scratch_dir(self):
+        """Katalog na pliki segmentów (None - katalog tymczasowy systemu)"""
+        return self.workspace.path if self.workspace is not None else None
+        
+    def run(self, input_file, output_file, words):
+        """Ocenzuruj plik i zapisz wynik.
+        
+        Zwraca słownik z kluczami: status ('ok', 'not_found', 'error'),
+        hits (liczba ocenzurowanych fragmentów), timings (czas etapów w sekundach),
+        stages (pomiary etapów i okien: czas, CPU, pamięć, bajty, szybkość - patrz instrumentation),
+        vad (długość nagrania, mowy i pominiętej ciszy w sekundach, jeśli użyto VAD),
+        disk (szczytowa zajętość katalogu roboczego w MB) oraz error (opis błędu, jeśli wystąpił).
+        Po przerwaniu przez cancel_event status to 'cancelled', a niedokończony wynik jest usuwany.
+        resumed: 'done' (zadanie pominięte - wykonane wcześniej), 'hits' (trafienia z manifestu) lub None.
+        
+        Pliki pośrednie powstają w katalogu roboczym zadania (SCRATCH_DIR), który
+        jest usuwany po zakończeniu - także po błędzie lub przerwaniu.
+        """
+        recorder = StageRecorder(input_file, self.metrics, self.profile_dir)
+        result = {'input': input_file, 'output': output_file, 'status': 'error', 'hits': 0,
+                  'timings': recorder.timings, 'stages': recorder.records, 'error': None, 'vad': None, 'disk': None,
+                  'resumed': None}
+        started = time.perf_counter()
+        
+        try:
+            remove_stale_workspaces()
+        except OSError:
+            pass
+        workspace = self.workspace = ScratchWorkspace()
+        self.fallback_used = False
+        
+        def stage(name, **details):
+            recorder.mark(name, **details)
+            workspace.usage_bytes()
+            if 'chunk' not in details:
+                self.report_progress(name, 1.0)
+        
+        output_mtime = os.path.getmtime(output_file) if os.path.exists(output_file) else None
+        try:
+            words = [w.strip() for w in words if w.strip()]
+            saved = self.open_job(input_file, output_file, words)
+            if saved and saved['status'] in ('done', 'not_found'):
+                self.log_message("⏭️ Zadanie wykonane wcześniej z tymi samymi ustawieniami - pomijanie")
+                result['status'] = 'ok' if saved['status'] == 'done' else 'not_found'
+                result['hits'] = len(saved['hits'] or [])
+                result['resumed'] = 'done'
+                return result
+            
+            if is_video_file(input_file):
+                # Wyciągnij audio z wideo
+                self.log_message("Wykryto plik wideo - wyciąganie audio...")
+                self.report_progress('extract', 0.0)
+                extracted = self.extract_audio_from_video(input_file)
+                if not extracted:
+                    result['error'] = "Nie udało się wyciągnąć audio"
+                    return result
+                # Rozpoznawanie na wersji 16 kHz mono, cenzura na audio w oryginalnej jakości
+                wav_file, render_wav = extracted
+                recorder.audio_seconds = audio_duration(wav_file)
+                stage('extract')
+            else:
+                # Konwertuj do WAV jeśli potrzeba
+                self.log_message("Konwertowanie audio do formatu WAV...")
+                self.report_progress('convert', 0.0)
+                wav_file = self.convert_to_wav(input_file)
+                if not wav_file:
+                    result['error'] = "Nie udało się skonwertować audio"
+                    return result
+                render_wav = wav_file
+                recorder.audio_seconds = audio_duration(wav_file)
+                stage('convert')
+            
+            matcher = WordMatcher(words, mode=self.match_mode, inflection=self.inflection)
+            
+            if self.uses_streaming():
+                return self.run_streaming(input_file, output_file, wav_file, render_wav, matcher, result, stage)
+            
+            if saved and saved['status'] == 'matched':
+                # Wznowienie: rozpoznawanie i wyszukiwanie zakończyły się przed przerwaniem
+                censored_segments = saved['hits']
+                self.log_message(f"Wznawianie zadania: {len(censored_segments)} wystąpień zapisanych wcześniej")
+                result['resumed'] = 'hits'
+            else:
+                # Rozpoznaj mowę
+                self.log_message("Rozpoznawanie mowy...")
+                self.report_progress('transcribe', 0.0)
+                transcription = self.transcribe_audio(wav_file)
+                result['vad'] = self.vad_report
+                if not transcription:
+                    result['error'] = "Nie udało się rozpoznać mowy"
+                    return result
+                stage('transcribe')
+                
+                # Znajdź słowa do ocenzurowania (wszystkie naraz, jednym przebiegiem)
+                if len(words) <= 10:
+                    self.log_message(f"Szukanie słów {', '.join(repr(w) for w in words)} w transkrypcji...")
+                else:
+                    self.log_message(f"Szukanie {len(words)} słów i fraz w transkrypcji...")
+                self.report_progress('match', 0.0)
+                censored_segments = self.find_and_censor_words(transcription['segments'], matcher)
+                censored_segments = self.refine_boundaries(render_wav, censored_segments)
+                stage('match')
+                self.record_job(input_file, output_file, 'matched' if censored_segments else 'not_found',
+                                censored_segments)
+            
+            if not censored_segments:
+                self.log_message("❌ Nie znaleziono szukanych słów w nagraniu")
+                result['status'] = 'not_found'
+                return result
+            
+            # Zastosuj cenzurę
+            self.log_message(f"Znaleziono {len(censored_segments)} wystąpień. Stosowanie cenzury...")
+            self.report_progress('render', 0.0)
+            video = is_video_file(input_file)
+            direct = not video and os.path.abspath(output_file) != os.path.abspath(render_wav)
+            # Audio jest zapisywane od razu do pliku wynikowego - bez pełnej kopii pośredniej
+            censored_audio = self.apply_censorship(render_wav, censored_segments, output_file if direct else None)
+            if not censored_audio:
+                if direct and os.path.exists(output_file):
+                    os.unlink(output_file)  # niekompletny wynik
+                result['error'] = "Nie udało się nałożyć cenzury"
+                return result
+            stage('render')
+            
+            if video:
+                # Połącz z wideo
+                self.log_message("Łączenie ocenzurowanego audio z wideo...")
+                self.report_progress('mux', 0.0)
+                if not self.combine_audio_with_video(input_file, censored_audio, output_file):
+                    result['error'] = "Nie udało się połączyć audio z wideo"
+                    return result
+                stage('mux')
+            elif not direct:
+                shutil.copy2(censored_audio, output_file)
+                stage('write')
+            
+            self.record_job(input_file, output_file, 'done', censored_segments)
+            self.log_message("✅ Cenzura zakończona pomyślnie!")
+            result['status'] = 'ok'
+            result['hits'] = len(censored_segments)
+            return result
+            
+        except JobCancelled:
+            self.log_message("⏹️ Zadanie przerwane")
+            result['status'] = 'cancelled'
+            result['error'] = "Przerwano"
+            self.remove_partial_output(output_file, output_mtime)
+            return result
+        except Exception as e:
+            self.log_message(f"❌ Błąd: {str(e)}")
+            result['error'] = str(e)
+            self.remove_partial_output(output_file, output_mtime)
+            return result
+        finally:
+            recorder.close()
+            recorder.timings['total'] = time.perf_counter() - started
+            result['disk'] = workspace.report()
+            self.log_message(f"Pliki pośrednie: szczytowo {result['disk']['peak_mb']:.0f} MB, usuwanie...")
+            workspace.cleanup()
+            self.workspace = None
+            self.job = None
+            
+    def remove_partial_output(self, output_file, output_mtime):
+        """Usuń wynik zapisany tylko częściowo (audio i tryb strumieniowy piszą bezpośrednio do output_file)"""
+        try:
+            if os.path.exists(output_file) and os.path.getmtime(output_file) != output_mtime:
+                os.unlink(output_file)
+        except OSError:
+            pass
+        
+    def run_streaming(self, input_file, output_file, wav_file, render_wav, matcher, result, stage):
+        """Rozpoznawanie i cenzura okno po oknie - wynik jest zapisywany w trakcie przetwarzania.
+        
+        Transkrypcja nie trafia do cache, bo całe nagranie nie jest rozpoznawane naraz.
+        """
+        from streaming import censor_streaming
+        
+        video = is_video_file(input_file)
+        if video:
+            censored_audio = self.temp_file('_ocenzurowane.wav')
+        else:
+            censored_audio = output_file
+        
+        self.log_message(f"Przetwarzanie strumieniowe (okna po {self.window_seconds:.0f}s)...")
+        self.report_progress('stream', 0.0)
+        progress = None
+        found = []
+        stream = censor_streaming(wav_file, render_wav, censored_audio, matcher,
+                                  self.transcribe_uncached, self.window_seconds,
+                                  scratch_dir=self.scratch_dir(), effect=self.effect,
+                                  refine=self.boundary_refiner())
+        try:
+            for progress in stream:
+                window = progress['window']
+                found.extend(progress['hits'])
+                for hit in progress['hits']:
+                    self.log_message(f"Znaleziono '{hit['word']}' w czasie {hit['start']:.2f}s - {hit['end']:.2f}s")
+                self.log_message(
+                    f"Okno {window['index']+1} ({window['start']:.0f}s - {window['end']:.0f}s) gotowe, "
+                    f"zapisano {progress['written']:.0f}s z {progress['duration']:.0f}s"
+                )
+                stage('stream', chunk=window['index'], audio_s=window['end'] - window['start'])
+                self.report_progress('stream', progress['written'] / progress['duration'] if progress['duration'] else 1.0)
+        finally:
+            # Zamknij plik wynikowy także po przerwaniu (inaczej nie dałoby się go usunąć)
+            stream.close()
+        hits = progress['total_hits'] if progress else 0
+        
+        if not hits:
+            self.log_message("❌ Nie znaleziono szukanych słów w nagraniu")
+            os.unlink(censored_audio)
+            self.record_job(input_file, output_file, 'not_found')
+            result['status'] = 'not_found'
+            return result
+        
+        if video:
+            self.log_message("Łączenie ocenzurowanego audio z wideo...")
+            self.report_progress('mux', 0.0)
+            try:
+                if not self.combine_audio_with_video(input_file, censored_audio, output_file):
+                    result['error'] = "Nie udało się połączyć audio z wideo"
+                    return result
+            finally:
+                os.unlink(censored_audio)
+            stage('mux')
+        
+        self.record_job(input_file, output_file, 'done', found)
+        self.log_message(f"✅ Cenzura zakończona pomyślnie! ({hits} wystąpień)")
+        result['status'] = 'ok'
+        result['hits'] = hits
+        return result
+        
+    def extract_audio_from_video(self, input_file):
+        """Wyciągnij audio z pliku wideo.
+        
+        Zwraca parę (plik do rozpoznawania mowy, plik do nałożenia cenzury).
+        """
+        if ffmpeg_available():
+            # Jeden przebieg ffmpeg: tylko strumień audio, od razu 16 kHz mono dla Whisper
+            try:
+                return extract_audio(input_file, self.temp_file('_16k.wav'), self.temp_file('_audio.wav'))
+            except Exception as e:
+                self.log_message(f"Wyciąganie audio przez ffmpeg nieudane ({str(e)}), próba przez moviepy...")
+        
+        if not MOVIEPY_AVAILABLE:
+            self.log_message("❌ Nie można wyciągnąć audio - brak biblioteki moviepy")
+            return None
+            
+        try:
+            mp = backends.load('moviepy')
+            video = mp.VideoFileClip(input_file)
+            temp_audio = self.temp_file('_audio.wav')
+            video.audio.write_audiofile(temp_audio, verbose=False, logger=None)
+            video.close()
+            return temp_audio, temp_audio
+        except Exception as e:
+            self.log_message(f"❌ Błąd wyciągania audio: {str(e)}")
+            return None
+            
+    def convert_to_wav(self, audio_file):
+        """Konwertuj plik audio do formatu WAV"""
+        if audio_file.lower().endswith('.wav'):
+            return audio_file
+        
+        if ffmpeg_available():
+            # FFmpeg dekoduje strumieniowo - bez wczytywania całego nagrania do pamięci
+            try:
+                return transcode_to_wav(audio_file, self.temp_file('.wav'))
+            except Exception as e:
+                self.log_message(f"Konwersja przez ffmpeg nieudana ({str(e)}), próba przez pydub...")
+            
+        if not PYDUB_AVAILABLE:
+            self.log_message("❌ Nie można konwertować - brak biblioteki pydub")
+            return None
+            
+        try:
+            AudioSegment = backends.load('pydub').AudioSegment
+            audio = AudioSegment.from_file(audio_file)
+            temp_wav = self.temp_file('.wav')
+            audio.export(temp_wav, format='wav')
+            return temp_wav
+        except Exception as e:
+            self.log_message(f"❌ Błąd konwersji: {str(e)}")
+            return None
+            
+    def transcription_service(self):
+        """Transcriber z metodami rozpoznawania (wybraną i zapasowymi) - tworzony raz, wspólny dla zadań"""
+        if self.transcriber is None:
+            self.transcriber = get_transcriber(self.whisper_model, self.use_api and OPENAI_API_AVAILABLE,
+                                               self.backend)
+        return self.transcriber
+        
+    def transcription_settings(self):
+        """Metoda rozpoznawania, model i temperatura, które zostaną użyte (część klucza cache)"""
+        return self.transcription_service().settings()
+        
+    def job_manifest(self):
+        """Manifest zadań (None, jeśli wyłączony lub niedostępny)"""
+        if self._manifest is None:
+            try:
+                self._manifest = get_job_manifest() or False
+            except (OSError, sqlite3.Error) as e:
+                self.log_message(f"Manifest zadań niedostępny ({str(e)})")
+                self._manifest = False
+        return self._manifest or None
+        
+    def uses_streaming(self):
+        """Czy zadanie będzie przetwarzane strumieniowo (okno po oknie)"""
+        return self.streaming and NUMPY_RENDER_AVAILABLE
+        
+    def uses_vad(self):
+        """Czy przed rozpoznawaniem działa VAD - tryb strumieniowy rozpoznaje całe okna, bez VAD"""
+        return bool(self.vad and NUMPY_RENDER_AVAILABLE and not self.uses_streaming())
+        
+    def job_settings(self, words):
+        """Ustawienia, od których zależy wynik zadania (część klucza w manifeście)"""
+        backend, model, temperature = self.transcription_settings()
+        return {
+            'words': sorted(words),
+            'match': [self.match_mode, self.inflection],
+            'recognizer': [backend, model, temperature, 'pl'],
+            'vad': self.uses_vad(),
+            'streaming': self.window_seconds if self.uses_streaming() else None,
+            'effect': self.effect,
+            'refine': [self.refine, str(self.pad_ms)] if NUMPY_RENDER_AVAILABLE else None,
+        }
+        
+    def open_job(self, input_file, output_file, words):
+        """Zarejestruj bieżące zadanie w manifeście; zwraca zapisany stan (do pominięcia lub wznowienia) lub None"""
+        manifest = self.job_manifest()
+        if manifest is None:
+            return None
+        try:
+            self.job = job_key(manifest.input_hash(input_file), self.job_settings(words))
+            if self.force:
+                return None
+            finished = manifest.finished_job(self.job, output_file)
+            if finished is not None:
+                return finished
+            saved = manifest.get_job(self.job)
+            return saved if saved and saved['status'] == 'matched' else None
+        except (OSError, sqlite3.Error) as e:
+            self.log_message(f"Manifest zadań niedostępny ({str(e)})")
+            self.job = None
+            return None
+        
+    def record_job(self, input_file, output_file, status, hits=None):
+        """Zapisz ukończony etap bieżącego zadania w manifeście.
+        
+        Klucz zadania zawiera ustawienia wybranej metody rozpoznawania - wynik metody
+        zapasowej nie jest zapisywany, więc po awarii zadanie zostanie powtórzone.
+        """
+        if self.job is None or self.fallback_used:
+            return
+        try:
+            self.job_manifest().record(self.job, input_file, output_file, status, hits)
+        except (OSError, sqlite3.Error) as e:
+            self.log_message(f"Nie udało się zapisać stanu zadania ({str(e)})")
+        
+    def chunk_checkpoints(self, wav_file):
+        """Gotowe segmenty transkrypcji nagrania z manifestu (tylko dla Whisper API - płatne żądania)"""
+        manifest = self.job_manifest()
+        if manifest is None or self.job is None or not (self.use_api and OPENAI_API_AVAILABLE):
+            return None
+        try:
+            backend, model, temperature = self.transcription_settings()
+            return manifest.chunk_checkpoints(cache_key(audio_fingerprint(wav_file), backend, model, 'pl', temperature))
+        except (OSError, wave.Error) as e:
+            self.log_message(f"Zapis postępu segmentów niedostępny ({str(e)})")
+            return None
+        
+    def transcribe_audio(self, wav_file):
+        """Rozpoznaj mowę w pliku audio (z użyciem cache transkrypcji)"""
+        if not self.use_cache:
+            return self.transcribe_speech(wav_file)
+        
+        backend, model, temperature = self.transcription_settings()
+        if backend is None:
+            return self.transcribe_speech(wav_file)
+        if self.uses_vad():
+            # Czasy z VAD mogą się nieznacznie różnić - osobne wpisy w cache
+            model = f"{model}+vad"
+        
+        try:
+            cache = get_transcription_cache()
+            key = cache_key(audio_fingerprint(wav_file), backend, model, 'pl', temperature)
+            cached = cache.get(key)
+        except Exception as e:
+            self.log_message(f"Cache transkrypcji niedostępny ({str(e)})")
+            return self.transcribe_speech(wav_file)
+        
+        if cached is not None:
+            self.log_message(f"✅ Transkrypcja z cache ({backend}/{model})")
+            return cached
+        
+        transcription = self.transcribe_speech(wav_file)
+        if transcription and self.fallback_used:
+            self.log_message("Transkrypcja z metody zapasowej - bez zapisu w cache")
+        elif transcription:
+            try:
+                cache.put(key, transcription)
+            except Exception as e:
+                self.log_message(f"Nie udało się zapisać transkrypcji w cache ({str(e)})")
+        return transcription
+        
+    def transcribe_speech(self, wav_file):
+        """Rozpoznaj tylko fragmenty z mową (VAD) i przelicz czasy słów na oś czasu oryginału"""
+        if not self.uses_vad():
+            return self.transcribe_uncached(wav_file)
+        
+        try:
+            from vad import condense_speech, detect_speech, speech_duration
+            from wav_stream import wav_params
+            params = wav_params(wav_file)
+            regions = detect_speech(wav_file)
+        except Exception as e:
+            self.log_message(f"Wykrywanie mowy niedostępne ({str(e)}), rozpoznawanie całego nagrania...")
+            return self.transcribe_uncached(wav_file)
+        
+        total = params.nframes / params.framerate
+        speech = speech_duration(regions, params.framerate)
+        self.vad_report = {'total_s': total, 'speech_s': speech, 'skipped_s': total - speech}
+        skipped_pct = 100 * (total - speech) / total if total else 0.0
+        self.log_message(f"VAD: mowa {speech:.1f}s z {total:.1f}s (pominięto {skipped_pct:.0f}%)")
+        
+        if not regions:
+            return {'segments': []}
+        if skipped_pct < 5:
+            return self.transcribe_uncached(wav_file)
+        
+        condensed, timeline = condense_speech(wav_file, regions, self.temp_file('_mowa.wav'))
+        try:
+            return timeline.remap(self.transcribe_uncached(condensed))
+        finally:
+            try:
+                os.unlink(condensed)
+            except OSError:
+                pass
+        
+    def transcribe_uncached(self, wav_file):
+        """Rozpoznaj mowę w pliku audio wybraną metodą (po błędzie - kolejnymi metodami zapasowymi)"""
+        def progress(done, total):
+            self.report_progress('transcribe', done / total if total else 1.0)
+        
+        checkpoints = self.chunk_checkpoints(wav_file)
+        service = self.transcription_service()
+        # Z profilowaniem rozpoznawanie musi działać w wątku zadania - inaczej profil pokazałby tylko czekanie
+        transcription, recognizer = service.transcribe(
+            wav_file, log=self.checked_log, progress=progress, checkpoint=self.checkpoint,
+            inline=bool(self.profile_dir), split_audio=self.split_audio_file, scratch_dir=self.scratch_dir(), checkpoints=checkpoints,
+        )
+        if transcription is not None and not service.is_primary(recognizer):
+            self.fallback_used = True
+        if transcription is not None and checkpoints is not None:
+            try:
+                checkpoints.clear()  # cała transkrypcja jest gotowa (i w cache)
+            except sqlite3.Error:
+                pass
+        return transcription
+            
+    def get_audio_duration(self, wav_file):
+        """Pobierz długość pliku audio"""
+        return audio_duration(wav_file)
+        
+    def boundary_refiner(self):
+        """Obiekt dopasowujący granice trafień (None bez numpy)"""
+        if not NUMPY_RENDER_AVAILABLE:
+            return None
+        from boundary_refine import BoundaryRefiner
+        return BoundaryRefiner(self.refine, self.pad_ms)
+        
+    def refine_boundaries(self, wav_file, hits):
+        """Przesuń granice trafień do cichych miejsc nagrania i dodaj margines"""
+        refiner = self.boundary_refiner()
+        if refiner is None or not hits:
+            return hits
+        try:
+            refined = refiner.refine(wav_file, hits)
+        except (wave.Error, KeyError) as e:
+            # Nietypowy format WAV (np. float) - czasy z rozpoznawania bez zmian
+            self.log_message(f"Dopasowanie granic słów niedostępne ({str(e)})")
+            return hits
+        if refiner.mode != 'off':
+            shift = sum(abs(h['start'] - h['raw_start']) + abs(h['end'] - h['raw_end']) for h in refined)
+            self.log_message(f"Dopasowano granice {len(refined)} wystąpień do nagrania "
+                             f"(średnio o {1000 * shift / (2 * len(refined)):.0f} ms)")
+        return refined
+        
+    def find_and_censor_words(self, segments, matcher):
+        """Znajdź wystąpienia słów z listy w segmentach i zwróć informacje o cenzurze"""
+        censored_segments = matcher.find_in_segments(segments)
+        for hit in censored_segments[:50]:
+            self.log_message(f"Znaleziono '{hit['word']}' w czasie {hit['start']:.2f}s - {hit['end']:.2f}s")
+        if len(censored_segments) > 50:
+            self.log_message(f"... oraz {len(censored_segments) - 50} kolejnych wystąpień")
+        return censored_segments
+        
+    def apply_censorship(self, wav_file, censored_segments, output_file=None):
+        """Zastosuj cenzurę do pliku audio; zapis do output_file lub pliku pośredniego, zwraca ścieżkę"""
+        output_file = output_file or self.temp_file('_ocenzurowane.wav')
+        if NUMPY_RENDER_AVAILABLE:
+            try:
+                from wav_stream import censor_wav_streaming
+                censor_wav_streaming(wav_file, censored_segments, output_file, effect=self.effect)
+                return output_file
+            except (wave.Error, KeyError) as e:
+                # Nietypowy format WAV (np. float) - użyj pydub
+                self.log_message(f"Szybkie nakładanie cenzury niedostępne ({str(e)}), używanie pydub...")
+            except Exception as e:
+                self.log_message(f"❌ Błąd stosowania cenzury: {str(e)}")
+                return None
+        
+        if not PYDUB_AVAILABLE:
+            self.log_message("❌ Nie można zastosować cenzury - brak biblioteki pydub")
+            return None
+        if self.effect != 'legacy':
+            self.log_message(f"Efekt '{self.effect}' wymaga numpy - używanie zwykłego beepa")
+            
+        try:
+            from pydub import AudioSegment
+            from pydub.generators import Sine
+            audio = AudioSegment.from_wav(wav_file)
+            
+            # Utwórz dźwięk cenzury (beep)
+            beep_duration = 1000  # 1 sekunda w ms
+            beep_freq = 1000  # 1000 Hz
+            beep = Sine(beep_freq).to_audio_segment(duration=beep_duration)
+            
+            # Zastosuj cenzurę dla każdego segmentu (od końca do początku, żeby nie zmieniać indeksów)
+            for segment in reversed(censored_segments):
+                start_ms = int(segment['start'] * 1000)
+                end_ms = int(segment['end'] * 1000)
+                
+                # Upewnij się, że nie przekraczamy długości audio
+                end_ms = min(end_ms, len(audio))
+                
+                if start_ms < end_ms:
+                    # Dostosuj długość beepa do długości słowa
+                    word_duration = end_ms - start_ms
+                    if word_duration < len(beep):
+                        beep_adjusted = beep[:word_duration]
+                    else:
+                        beep_adjusted = beep
+                    
+                    # Zastąp fragment beepem
+                    audio = audio[:start_ms] + beep_adjusted + audio[end_ms:]
+            
+            # Zapisz ocenzurowane audio
+            audio.export(output_file, format='wav')
+            
+            return output_file
+            
+        except Exception as e:
+            self.log_message(f"❌ Błąd stosowania cenzury: {str(e)}")
+            return None
+            
+    def combine_audio_with_video(self, input_file, censored_audio, output_file):
+        """Połącz ocenzurowane audio z oryginalnym wideo (zwraca True przy powodzeniu)"""
+        if ffmpeg_available():
+            # Kopiuj strumień wideo bez zmian, koduj tylko nową ścieżkę audio
+            try:
+                remux_with_audio(input_file, censored_audio, output_file)
+                return True
+            except Exception as e:
+                self.log_message(f"Kopiowanie strumienia wideo niemożliwe ({str(e)}), ponowne kodowanie przez moviepy...")
+        
+        if not MOVIEPY_AVAILABLE:
+            self.log_message("❌ Nie można połączyć z wideo - brak biblioteki moviepy")
+            return False
+            
+        try:
+            # Załaduj oryginalne wideo i zastąp audio
+            mp = backends.load('moviepy')
+            video = mp.VideoFileClip(input_file)
+            new_audio = mp.AudioFileClip(censored_audio)
+            
+            final_video = video.set_audio(new_audio)
+            final_video.write_videofile(output_file, verbose=False, logger=None)
+            
+            video.close()
+            new_audio.close()
+            final_video.close()
+            return True
+            
+        except Exception as e:
+            self.log_message(f"❌ Błąd łączenia z wideo: {str(e)}")
+            return False
+            
+    def split_audio_file(self, wav_file, max_size_mb=20):
+        """Dzieli plik audio na mniejsze części (w miejscach ciszy) jeśli przekracza maksymalny rozmiar.
+        
+        Zwraca listę słowników {'path', 'start', 'end'} z czasami segmentów w sekundach.
+        """
+        file_size = os.path.getsize(wav_file)
+        max_size_bytes = int(max_size_mb * 1024 * 1024)
+        
+        if file_size <= max_size_bytes:
+            return [{'path': wav_file, 'start': 0.0, 'end': self.get_audio_duration(wav_file)}]
+        
+        self.log_message(f"📂 Plik jest za duży ({file_size / (1024*1024):.1f}MB). Dzielenie na mniejsze części...")
+        
+        if NUMPY_RENDER_AVAILABLE:
+            try:
+                from chunking import split_wav_on_silence
+                chunks = split_wav_on_silence(wav_file, max_size_bytes, out_dir=self.scratch_dir())
+                for i, chunk in enumerate(chunks):
+                    self.log_message(
+                        f"Utworzono segment {i+1}/{len(chunks)}: {chunk['start']:.2f}s - {chunk['end']:.2f}s"
+                    )
+                return chunks
+            except Exception as e:
+                self.log_message(f"Dzielenie w miejscach ciszy niedostępne ({str(e)}), dzielenie na równe części...")
+        
+        if not PYDUB_AVAILABLE:
+            self.log_message("❌ Nie można podzielić pliku - brak biblioteki pydub")
+            return [{'path': wav_file, 'start': 0.0, 'end': self.get_audio_duration(wav_file)}]
+        
+        try:
+            audio = backends.load('pydub').AudioSegment.from_wav(wav_file)
+            
+            # Oblicz ile segmentów potrzebujemy
+            num_segments = (file_size // max_size_bytes) + 1
+            segment_duration = len(audio) // num_segments
+            
+            segments = []
+            for i in range(num_segments):
+                start_time = i * segment_duration
+                end_time = len(audio) if i == num_segments - 1 else (i + 1) * segment_duration
+                
+                segment = audio[start_time:end_time]
+                
+                # Zapisz segment do tymczasowego pliku
+                temp_segment = self.temp_file(f'_segment_{i}.wav')
+                segment.export(temp_segment, format='wav')
+                segments.append({'path': temp_segment, 'start': start_time / 1000.0, 'end': end_time / 1000.0})
+                
+                self.log_message(f"Utworzono segment {i+1}/{num_segments}: {os.path.basename(temp_segment)}")
+            
+            return segments
+            
+        except Exception as e:
+            self.log_message(f"❌ Błąd dzielenia pliku: {str(e)}")
+            return [{'path': wav_file, 'start': 0.0, 'end': self.get_audio_duration(wav_file)}]
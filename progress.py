@@ -0,0 +1,108 @@
+"""Postęp zadania i kanał zdarzeń między wątkiem roboczym a oknem aplikacji.
+
+Wątek roboczy nie dotyka Tk: potok wrzuca zdarzenia (log, postęp etapu,
+koniec zadania) do kolejki, a okno odbiera je paczkami w root.after.
+ProgressTracker zamienia postęp kolejnych etapów na postęp całego zadania
+(według przybliżonych wag etapów) i szacuje pozostały czas.
+"""
+import queue
+import time
+
+# Przybliżony udział etapów w czasie zadania
+STAGE_WEIGHTS = {
+    'extract': 5,
+    'convert': 5,
+    'transcribe': 70,
+    'match': 2,
+    'render': 10,
+    'mux': 8,
+    'write': 3,
+    'stream': 85,
+}
+
+STAGE_LABELS = {
+    'extract': "Wyciąganie audio",
+    'convert': "Konwersja audio",
+    'transcribe': "Rozpoznawanie mowy",
+    'match': "Szukanie słów",
+    'render': "Nakładanie cenzury",
+    'mux': "Łączenie z wideo",
+    'write': "Zapisywanie",
+    'stream': "Przetwarzanie strumieniowe",
+}
+
+MIN_FRACTION_FOR_ETA = 0.03  # wcześniej oszacowanie jest zbyt niepewne
+
+
+class ProgressTracker:
+    """Postęp całego zadania na podstawie postępu etapów z planu"""
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.total_weight = sum(STAGE_WEIGHTS.get(s, 0) for s in self.stages) or 1
+        self.started = time.monotonic()
+        self.stage = None
+        self.stage_fraction = 0.0
+        self._done_weight = 0
+
+    def update(self, stage, fraction):
+        """Zapisz postęp etapu (0..1); zwraca postęp całego zadania (0..1)"""
+        if stage in self.stages:
+            index = self.stages.index(stage)
+            self._done_weight = sum(STAGE_WEIGHTS.get(s, 0) for s in self.stages[:index])
+        self.stage = stage
+        self.stage_fraction = min(max(fraction, 0.0), 1.0)
+        return self.fraction()
+
+    def fraction(self):
+        """Postęp całego zadania (0..1)"""
+        current = STAGE_WEIGHTS.get(self.stage, 0) * self.stage_fraction if self.stage in self.stages else 0
+        return min((self._done_weight + current) / self.total_weight, 1.0)
+
+    def eta(self):
+        """Szacowany pozostały czas w sekundach (None, jeśli jeszcze nie wiadomo)"""
+        fraction = self.fraction()
+        if fraction < MIN_FRACTION_FOR_ETA:
+            return None
+        elapsed = time.monotonic() - self.started
+        return elapsed * (1 - fraction) / fraction
+
+    def describe(self):
+        """Opis do paska stanu, np. 'Rozpoznawanie mowy - 43% (pozostało ok. 2 min)'"""
+        text = f"{STAGE_LABELS.get(self.stage, self.stage)} - {100 * self.fraction():.0f}%"
+        eta = self.eta()
+        if eta is not None:
+            text += f" (pozostało ok. {format_duration(eta)})"
+        return text
+
+
+def format_duration(seconds):
+    """Krótki zapis czasu: '45 s', '3 min', '1 h 05 min'"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} s"
+    minutes = (seconds + 30) // 60
+    if minutes < 60:
+        return f"{minutes} min"
+    return f"{minutes // 60} h {minutes % 60:02d} min"
+
+
+class EventChannel:
+    """Kolejka zdarzeń (rodzaj, dane) z wątku roboczego do wątku okna"""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def post(self, kind, *payload):
+        """Wrzuć zdarzenie (bez czekania - bezpieczne z dowolnego wątku)"""
+        self._queue.put((kind, payload))
+
+    def drain(self, limit=500):
+        """Odbierz do limit oczekujących zdarzeń (bez czekania)"""
+        events = []
+        try:
+            while len(events) < limit:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
@@ -0,0 +1,497 @@
+"""Wspólny interfejs metod rozpoznawania mowy.
+
+Każda metoda (OpenAI Whisper API, faster-whisper, lokalny Whisper, Google)
+jest klasą z tym samym interfejsem: transcribe(plik_wav) zwraca
+{'segments': [{'start', 'end', 'text', 'words': [{'start', 'end', 'word',
+'probability'}]}]}, a settings() - metodę, model i temperaturę do klucza
+cache transkrypcji. Potok wybiera metodę i kolejne metody zapasowe, a
+nie zna szczegółów żadnej z nich.
+
+Obiekty metod są tworzone raz i współdzielone (transcriber.Transcriber):
+dane jednego wywołania - log, postęp, katalog roboczy zadania - dostaje
+lekka kopia z bind().
+
+faster-whisper (CTranslate2) z kwantyzacją int8 rozpoznaje na CPU kilka
+razy szybciej niż openai-whisper w PyTorch fp32, przy zbliżonej jakości.
+"""
+import copy
+import os
+import threading
+import wave
+
+import backends
+from ffmpeg_tools import ffmpeg_available
+from model_cache import DEFAULT_CACHE_MB, WhisperModelCache, default_device, get_model_cache
+
+# Jeden model openai-whisper jest współdzielony przez zadania - transkrypcje wykonujemy po kolei
+_local_model_lock = threading.Lock()
+
+MAX_API_FILE_SIZE_MB = 25
+
+
+def audio_duration(wav_file):
+    """Długość pliku audio w sekundach (z nagłówka WAV, w razie potrzeby przez pydub)"""
+    try:
+        # Długość z nagłówka WAV - bez dekodowania nagrania
+        with wave.open(wav_file, 'rb') as wf:
+            return wf.getnframes() / wf.getframerate()
+    except (wave.Error, EOFError, OSError):
+        pass
+    if backends.is_installed('pydub'):
+        try:
+            audio = backends.load('pydub').AudioSegment.from_wav(wav_file)
+            return len(audio) / 1000.0  # Konwertuj ms na sekundy
+        except Exception:
+            pass
+    return 60.0  # Domyślna wartość jeśli nie można określić
+
+
+class Recognizer:
+    """Metoda rozpoznawania mowy (klasa bazowa)"""
+
+    name = None
+    label = None
+    backend = None  # biblioteka (nazwa z backends.BACKEND_MODULES), którą metoda importuje przy pierwszym użyciu
+    # Opcje ustawiane osobno dla każdego wywołania (bind), np. katalog roboczy zadania
+    call_options = ()
+    # Model nie obsługuje równoległych wywołań - żądania trafiają do kolejki jednego wątku (Transcriber)
+    serial = False
+
+    def __init__(self, model=None, log=None, progress=None):
+        self.model = model
+        self._log = log or print
+        self._progress = progress  # progress(gotowe, wszystkie) - np. segmenty lub sekundy nagrania
+
+    def bind(self, log=None, progress=None, **options):
+        """Kopia metody z logiem, postępem i opcjami jednego wywołania (model, klient itp. są wspólne)"""
+        bound = copy.copy(self)
+        bound._log = log or self._log
+        bound._progress = progress
+        for name, value in options.items():
+            if name not in self.call_options:
+                raise TypeError(f"{type(self).__name__}: nieznana opcja wywołania {name}")
+            setattr(bound, name, value)
+        return bound
+
+    def log_message(self, message):
+        self._log(message)
+
+    def report_progress(self, done, total):
+        if self._progress is not None:
+            self._progress(done, total)
+
+    @classmethod
+    def available(cls):
+        """Czy potrzebne biblioteki (i ewentualnie klucz API) są dostępne"""
+        return False
+
+    def settings(self):
+        """(metoda, model, temperatura) - część klucza cache transkrypcji"""
+        return self.name, self.model or 'default', 'default'
+
+    def transcribe(self, wav_file):
+        """Rozpoznaj mowę; zwraca {'segments': [...]} albo zgłasza wyjątek"""
+        raise NotImplementedError
+
+    def transcribe_batch(self, requests):
+        """Rozpoznaj kilka nagrań naraz; requests to lista (metoda z bind(), plik WAV).
+
+        Zwraca listę wyników lub wyjątków (błąd jednego nagrania nie przerywa pozostałych).
+        Domyślnie po kolei - metody, które potrafią więcej, nadpisują tę metodę.
+        """
+        results = []
+        for recognizer, wav_file in requests:
+            try:
+                results.append(recognizer.transcribe(wav_file))
+            except BaseException as e:  # także JobCancelled jednego z zadań
+                results.append(e)
+        return results
+
+
+class WhisperApiRecognizer(Recognizer):
+    """OpenAI Whisper API - nagranie jest kompresowane (mono 16 kHz), duże pliki dzielone i wysyłane równolegle"""
+
+    name = 'api'
+    label = "OpenAI Whisper API"
+    backend = 'openai'
+    call_options = ('split_audio', 'scratch_dir', 'checkpoints')
+
+    def __init__(self, model=None, log=None, progress=None, split_audio=None, chunk_size_mb=None,
+                 scratch_dir=None, upload_format=None):
+        super().__init__(model or os.getenv('WHISPER_API_MODEL', 'whisper-1'), log, progress)
+        self.temperature = float(os.getenv('WHISPER_TEMPERATURE', 0.0))
+        self.max_file_size_bytes = MAX_API_FILE_SIZE_MB * 1024 * 1024
+        self.chunk_size_mb = chunk_size_mb or float(os.getenv('MAX_FILE_SIZE_MB', 20))
+        self.scratch_dir = scratch_dir
+        # mp3, opus, flac lub wav (wysyłka bez kompresji) - patrz upload_encoding
+        self.upload_format = (upload_format or os.getenv('UPLOAD_FORMAT', 'mp3')).lower()
+        self.split_audio = split_audio  # split_audio(plik, rozmiar_mb) -> segmenty; domyślnie chunking
+        # Gotowe segmenty przerwanego zadania (job_manifest.ChunkCheckpoints) - nie są wysyłane ponownie
+        self.checkpoints = None
+
+    @classmethod
+    def available(cls):
+        return backends.is_installed('openai') and bool(os.getenv('OPENAI_API_KEY'))
+
+    def compressed_upload(self):
+        """Czy nagranie będzie kodowane przed wysyłką (wymaga ffmpeg i numpy)"""
+        return self.upload_format != 'wav' and ffmpeg_available() and backends.is_installed('numpy')
+
+    def settings(self):
+        # Kompresja może nieznacznie zmienić wynik - osobne wpisy w cache
+        model = f"{self.model}@{self.upload_format}" if self.compressed_upload() else self.model
+        return self.name, model, self.temperature
+
+    def transcribe(self, wav_file):
+        from api_transcription import get_api_client, transcribe_with_retry
+
+        if self.compressed_upload():
+            try:
+                chunks = self.encode(wav_file)
+            except Exception as e:
+                self.log_message(f"Kompresja przed wysyłką nieudana ({str(e)}), wysyłanie WAV...")
+            else:
+                return self.transcribe_chunk_files(chunks)
+
+        file_size = os.path.getsize(wav_file)
+        if file_size > self.max_file_size_bytes:
+            self.log_message(f"📂 Plik jest za duży ({file_size / (1024*1024):.1f}MB). Dzielenie na mniejsze części...")
+            return self.transcribe_large_file(wav_file)
+        return transcribe_with_retry(get_api_client(), wav_file, model=self.model, temperature=self.temperature)
+
+    def encode(self, wav_file):
+        """Zakoduj nagranie do wysyłki; segmenty są wyliczane z rozmiaru po kompresji"""
+        from upload_encoding import prepare_upload
+
+        chunks = prepare_upload(wav_file, int(self.chunk_size_mb * 1024 * 1024), self.upload_format,
+                                self.scratch_dir)
+        encoded = sum(os.path.getsize(c['path']) for c in chunks)
+        self.log_message(
+            f"Wysyłka w formacie {self.upload_format} (mono 16 kHz): {encoded / (1024*1024):.1f}MB "
+            f"zamiast {os.path.getsize(wav_file) / (1024*1024):.1f}MB WAV, segmentów: {len(chunks)}"
+        )
+        return chunks
+
+    def transcribe_large_file(self, wav_file):
+        """Podziel duży plik audio i transkrybuj segmenty równolegle"""
+        return self.transcribe_chunk_files(self.split(wav_file), keep=wav_file)
+
+    def transcribe_chunk_files(self, chunks, keep=None):
+        """Wyślij segmenty (równolegle, jeśli jest ich kilka) i sklej wyniki; pliki segmentów są usuwane"""
+        from api_transcription import get_api_client, get_concurrency, transcribe_chunks, transcribe_with_retry
+        from transcript_merge import remove_chunk_files, stitch_transcriptions
+
+        results = [None] * len(chunks)
+        checkpoints = self.checkpoints if len(chunks) > 1 else None
+        if checkpoints is not None:
+            for i, chunk in enumerate(chunks):
+                results[i] = checkpoints.get(chunk['start'], chunk['end'])
+        pending = [i for i, result in enumerate(results) if result is None]
+        if len(pending) < len(chunks):
+            self.log_message(f"Wznawianie: {len(chunks) - len(pending)}/{len(chunks)} segmentów gotowych wcześniej")
+        if len(pending) > 1:
+            self.log_message(f"Wysyłanie {len(pending)} segmentów do API (równolegle: {get_concurrency()})...")
+
+        def on_chunk_result(index, result):
+            # Zapisywane od razu - po awarii zadanie nie zapłaci drugi raz za ten segment
+            chunk = chunks[pending[index]]
+            checkpoints.put(chunk['start'], chunk['end'], result)
+
+        def on_chunk_done(index, done, total):
+            self.log_message(f"Segment {pending[index]+1} przetworzony ({done}/{total})")
+            self.report_progress(len(chunks) - total + done, len(chunks))
+
+        try:
+            if len(pending) == 1:
+                results[pending[0]] = transcribe_with_retry(get_api_client(), chunks[pending[0]]['path'],
+                                                            model=self.model, temperature=self.temperature)
+            elif pending:
+                sent = transcribe_chunks([chunks[i]['path'] for i in pending], on_chunk_done=on_chunk_done,
+                                         on_chunk_result=on_chunk_result if checkpoints is not None else None,
+                                         model=self.model, temperature=self.temperature)
+                for i, result in zip(pending, sent):
+                    results[i] = result
+        finally:
+            # Usuń tymczasowe segmenty
+            remove_chunk_files(chunks, keep=keep)
+
+        # Przesuń czasy słów o początek segmentu i usuń duplikaty z zakładek
+        return stitch_transcriptions(results, chunks)
+
+    def split(self, wav_file):
+        """Segmenty {'path', 'start', 'end'} nie większe niż chunk_size_mb"""
+        if self.split_audio is not None:
+            return self.split_audio(wav_file, self.chunk_size_mb)
+        from chunking import split_wav_on_silence
+        return split_wav_on_silence(wav_file, int(self.chunk_size_mb * 1024 * 1024), out_dir=self.scratch_dir)
+
+
+class FasterWhisperRecognizer(Recognizer):
+    """faster-whisper (CTranslate2) - domyślnie int8 na CPU"""
+
+    name = 'faster-whisper'
+    label = "faster-whisper"
+    backend = 'faster_whisper'
+    serial = True  # model i tak używa wszystkich rdzeni (cpu_threads)
+
+    def __init__(self, model=None, log=None, progress=None, compute_type=None, device=None):
+        super().__init__(model or "small", log, progress)
+        self.compute_type = compute_type or os.getenv('FASTER_WHISPER_COMPUTE', 'int8')
+        self.device = device or os.getenv('FASTER_WHISPER_DEVICE', 'cpu')
+
+    @classmethod
+    def available(cls):
+        return backends.is_installed('faster_whisper')
+
+    def settings(self):
+        # Kwantyzacja zmienia wynik - osobne wpisy w cache
+        return self.name, f"{self.model}@{self.compute_type}", 'default'
+
+    def transcribe(self, wav_file):
+        cache = get_faster_whisper_cache()
+        model = cache.get(self.model, f"{self.device}/{self.compute_type}")
+        self.log_message(f"Model faster-whisper {self.model} ({self.compute_type}) załadowany, rozpoczynanie transkrypcji...")
+        segments, info = model.transcribe(wav_file, language='pl', word_timestamps=True, beam_size=5)
+        # Segmenty są dekodowane leniwie - postęp według końca ostatniego segmentu
+        result = []
+        for segment in segments:
+            result.append(convert_faster_whisper_segment(segment))
+            self.report_progress(segment.end, info.duration)
+        return {'segments': result}
+
+
+def convert_faster_whisper_segment(segment):
+    """Segment faster-whisper (namedtuple) -> słownik w formacie openai-whisper"""
+    return {
+        'id': segment.id,
+        'start': segment.start,
+        'end': segment.end,
+        'text': segment.text,
+        'words': [
+            {'start': w.start, 'end': w.end, 'word': w.word, 'probability': w.probability}
+            for w in segment.words or []
+        ],
+    }
+
+
+def _load_faster_whisper(name, device):
+    """Załaduj model faster-whisper; device ma postać 'urządzenie/typ_obliczeń' (np. 'cpu/int8')"""
+    device, compute_type = device.split('/')
+    faster_whisper = backends.load('faster_whisper')
+    return faster_whisper.WhisperModel(name, device=device, compute_type=compute_type,
+                                       cpu_threads=os.cpu_count() or 4)
+
+
+_faster_whisper_cache = None
+_faster_whisper_cache_lock = threading.Lock()
+
+
+def get_faster_whisper_cache():
+    """Cache modeli faster-whisper (ten sam budżet pamięci co dla openai-whisper)"""
+    global _faster_whisper_cache
+    with _faster_whisper_cache_lock:
+        if _faster_whisper_cache is None:
+            max_mb = float(os.getenv('WHISPER_MODEL_CACHE_MB', DEFAULT_CACHE_MB))
+            _faster_whisper_cache = WhisperModelCache(max_memory_mb=max_mb, loader=_load_faster_whisper)
+        return _faster_whisper_cache
+
+
+class WhisperRecognizer(Recognizer):
+    """Lokalny openai-whisper - na CPU długie nagrania w puli procesów"""
+
+    name = 'whisper'
+    label = "lokalny Whisper"
+    backend = 'whisper'
+    call_options = ('scratch_dir',)
+    serial = True
+
+    def __init__(self, model=None, log=None, progress=None, scratch_dir=None):
+        super().__init__(model or "small", log, progress)
+        self.scratch_dir = scratch_dir  # katalog na fragmenty przy rozpoznawaniu równoległym
+
+    @classmethod
+    def available(cls):
+        return backends.is_installed('whisper')
+
+    def use_parallel(self, wav_file):
+        """Czy rozpoznawać równolegle w puli procesów (CPU, kilka procesów, nagranie dość długie)"""
+        if not backends.is_installed('numpy'):
+            return False
+        from parallel_whisper import MIN_SHARD_S, default_workers
+        if default_workers() <= 1 or default_device() != 'cpu':
+            return False
+        return audio_duration(wav_file) >= 2 * MIN_SHARD_S
+
+    def transcribe(self, wav_file):
+        if self.use_parallel(wav_file):
+            from parallel_whisper import get_parallel_engine
+            engine = get_parallel_engine(self.model)
+            self.log_message(
+                f"Równoległe rozpoznawanie: {engine.workers} procesów po {engine.threads_per_worker} wątków..."
+            )
+
+            def on_shard_done(index, total):
+                self.log_message(f"Fragment {index+1}/{total} rozpoznany")
+                self.report_progress(index + 1, total)
+
+            return engine.transcribe(wav_file, on_shard_done=on_shard_done, scratch_dir=self.scratch_dir)
+
+        self.log_message(f"Ładowanie modelu Whisper: {self.model}")
+        model_cache = get_model_cache()
+        model = model_cache.get(self.model)
+        stats = model_cache.stats()
+        self.log_message(
+            f"Model załadowany (cache: {stats['hits']} trafień, {stats['misses']} chybień), "
+            "rozpoczynanie transkrypcji..."
+        )
+
+        with _local_model_lock:
+            result = model.transcribe(wav_file, language='pl', word_timestamps=True)
+
+        return {
+            'segments': result['segments']
+        }
+
+    def batchable(self, wav_file):
+        """Czy nagranie może trafić do wspólnej paczki (krótkie, bez puli procesów)"""
+        from batched_whisper import MAX_FILE_S
+        return audio_duration(wav_file) <= MAX_FILE_S and not self.use_parallel(wav_file)
+
+    def transcribe_batch(self, requests):
+        """Krótkie nagrania - okna wszystkich plików we wspólnych paczkach kodera i dekodera"""
+        if len(requests) < 2 or not backends.is_installed('numpy'):
+            return super().transcribe_batch(requests)
+        results = [None] * len(requests)
+        batch = []
+        for i, (recognizer, wav_file) in enumerate(requests):
+            try:
+                if not recognizer.batchable(wav_file):
+                    continue
+                recognizer.log_message(f"Rozpoznawanie w paczce {len(requests)} nagrań (model {self.model})...")
+            except BaseException as e:  # zadanie przerwane w kolejce
+                results[i] = e
+                continue
+            batch.append(i)
+
+        if len(batch) > 1:
+            from batched_whisper import transcribe_files
+            try:
+                model = get_model_cache().get(self.model)
+                with _local_model_lock:
+                    outputs = transcribe_files(model, [requests[i][1] for i in batch])
+            except Exception as e:
+                try:
+                    requests[batch[0]][0].log_message(f"Rozpoznawanie w paczce nieudane ({str(e)}), po kolei...")
+                except BaseException as cancelled:
+                    results[batch[0]] = cancelled
+            else:
+                for i, output in zip(batch, outputs):
+                    # Przerwanie jednego zadania nie może odebrać wyników pozostałym
+                    try:
+                        requests[i][0].report_progress(1, 1)
+                    except BaseException as cancelled:
+                        output = cancelled
+                    results[i] = output
+
+        rest = [i for i, result in enumerate(results) if result is None]
+        for i, result in zip(rest, super().transcribe_batch([requests[i] for i in rest])):
+            results[i] = result
+        return results
+
+
+class GoogleRecognizer(Recognizer):
+    """Google Speech Recognition - bez czasów słów (czasy są przybliżane)"""
+
+    name = 'google'
+    label = "Google Speech Recognition"
+    backend = 'speech_recognition'
+
+    def __init__(self, model=None, log=None, progress=None):
+        super().__init__(None, log, progress)
+        self._shared = {}  # sr.Recognizer tworzony przy pierwszym użyciu, wspólny dla kopii z bind()
+        self._shared_lock = threading.Lock()
+
+    @classmethod
+    def available(cls):
+        return backends.is_installed('speech_recognition')
+
+    def recognizer(self):
+        """Współdzielony obiekt sr.Recognizer"""
+        with self._shared_lock:
+            if 'recognizer' not in self._shared:
+                self._shared['recognizer'] = backends.load('speech_recognition').Recognizer()
+            return self._shared['recognizer']
+
+    def transcribe(self, wav_file):
+        sr = backends.load('speech_recognition')
+        r = self.recognizer()
+
+        with sr.AudioFile(wav_file) as source:
+            audio = r.record(source)
+
+        text = r.recognize_google(audio, language='pl-PL')
+
+        # Utwórz prosty segment (bez timestampów słów)
+        duration = audio_duration(wav_file)
+
+        segment = {
+            'start': 0.0,
+            'end': duration,
+            'text': text,
+            'words': []  # Google SR nie dostarcza timestampów słów
+        }
+
+        # Podziel tekst na słowa i przypisz przybliżone timestampy
+        words = text.split()
+        if words:
+            word_duration = duration / len(words)
+            for i, word in enumerate(words):
+                segment['words'].append({
+                    'start': i * word_duration,
+                    'end': (i + 1) * word_duration,
+                    'word': word,
+                    'probability': 1.0
+                })
+
+        return {
+            'segments': [segment]
+        }
+
+
+RECOGNIZERS = {
+    cls.name: cls for cls in (WhisperApiRecognizer, FasterWhisperRecognizer, WhisperRecognizer, GoogleRecognizer)
+}
+LOCAL_BACKENDS = ('auto', 'whisper', 'faster-whisper')
+
+
+def local_recognizer_name(preference=None):
+    """Lokalna metoda z WHISPER_BACKEND ('auto' - faster-whisper, jeśli zainstalowany)"""
+    preference = preference or os.getenv('WHISPER_BACKEND', 'auto')
+    if preference != 'auto':
+        return preference if RECOGNIZERS[preference].available() else None
+    for name in ('faster-whisper', 'whisper'):
+        if RECOGNIZERS[name].available():
+            return name
+    return None
+
+
+def recognizer_chain(use_api=False, local_backend=None):
+    """Nazwy metod w kolejności użycia: wybrana metoda, potem zapasowe"""
+    chain = []
+    if use_api and WhisperApiRecognizer.available():
+        chain.append('api')
+    local = local_recognizer_name(local_backend)
+    if local:
+        chain.append(local)
+    if GoogleRecognizer.available():
+        chain.append('google')
+    return chain
+
+
+def create_recognizer(name, model=None, log=None, **options):
+    """Utwórz metodę rozpoznawania po nazwie"""
+    try:
+        cls = RECOGNIZERS[name]
+    except KeyError:
+        raise ValueError(f"Nieznana metoda rozpoznawania: {name} (dostępne: {', '.join(RECOGNIZERS)})")
+    return cls(model=model, log=log, **options)
@@ -0,0 +1,131 @@
+"""Katalog roboczy zadania na pliki pośrednie (WAV z wideo, segmenty, wynik przed złączeniem).
+
+Każde zadanie dostaje własny katalog w SCRATCH_DIR (domyślnie katalog
+tymczasowy systemu; może to być np. tmpfs albo szybki dysk SSD). Wszystkie
+pliki pośrednie trafiają do niego, a po zakończeniu zadania - udanym,
+z błędem lub przerwanym - katalog jest usuwany w całości. Katalogi, które
+zostały po zabitym procesie, są usuwane przy starcie kolejnego zadania.
+Zajętość katalogu jest próbkowana w tle (co SCRATCH_SAMPLE_S) i na granicach
+etapów - raport podaje szczyt w MB.
+"""
+import atexit
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+WORKSPACE_PREFIX = 'cenzura_'
+SCRATCH_SAMPLE_S = 1.0
+STALE_AFTER_S = 24 * 3600  # starsze katalogi zadań uznajemy za pozostałość po przerwanym procesie
+
+_active = set()
+_active_lock = threading.Lock()
+
+
+def scratch_root():
+    """Katalog nadrzędny na katalogi zadań (SCRATCH_DIR lub katalog tymczasowy systemu)"""
+    root = os.getenv('SCRATCH_DIR') or tempfile.gettempdir()
+    os.makedirs(root, exist_ok=True)
+    return root
+
+
+def directory_size(path):
+    """Łączny rozmiar plików w katalogu (rekurencyjnie) w bajtach"""
+    total = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                total += directory_size(entry.path)
+            else:
+                total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass  # plik usunięty w międzyczasie
+    return total
+
+
+def remove_stale_workspaces(root=None, max_age_s=STALE_AFTER_S):
+    """Usuń katalogi zadań, które zostały po przerwanych procesach; zwraca ich liczbę"""
+    root = root or scratch_root()
+    removed = 0
+    now = time.time()
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.name.startswith(WORKSPACE_PREFIX) or not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            if now - entry.stat().st_mtime < max_age_s:
+                continue
+        except OSError:
+            continue
+        with _active_lock:
+            if entry.path in _active:
+                continue
+        shutil.rmtree(entry.path, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+class ScratchWorkspace:
+    """Katalog roboczy jednego zadania z pomiarem zajętości i gwarantowanym sprzątaniem"""
+
+    def __init__(self, root=None, sample_interval=SCRATCH_SAMPLE_S):
+        self.path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=root or scratch_root())
+        self.peak_bytes = 0
+        self._counter = itertools.count()
+        self._stop = threading.Event()
+        with _active_lock:
+            _active.add(self.path)
+        if sample_interval:
+            threading.Thread(target=self._sample, args=(sample_interval,), daemon=True).start()
+
+    def _sample(self, interval):
+        while not self._stop.wait(interval):
+            self.usage_bytes()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+        return False
+
+    def file(self, suffix='.wav'):
+        """Ścieżka nowego (jeszcze nieistniejącego) pliku w katalogu zadania"""
+        return os.path.join(self.path, f"{next(self._counter):04d}{suffix}")
+
+    def usage_bytes(self):
+        """Bieżąca zajętość katalogu; aktualizuje szczyt"""
+        used = directory_size(self.path)
+        self.peak_bytes = max(self.peak_bytes, used)
+        return used
+
+    def report(self):
+        """Zajętość dysku przez zadanie: {'peak_mb', 'current_mb'}"""
+        current = self.usage_bytes()
+        return {'peak_mb': self.peak_bytes / (1024 * 1024), 'current_mb': current / (1024 * 1024)}
+
+    def cleanup(self):
+        """Usuń katalog zadania ze wszystkimi plikami pośrednimi"""
+        self._stop.set()
+        shutil.rmtree(self.path, ignore_errors=True)
+        with _active_lock:
+            _active.discard(self.path)
+
+
+@atexit.register
+def cleanup_all():
+    """Usuń katalogi zadań przerwanych przy wyjściu z programu (np. wątki GUI w tle)"""
+    with _active_lock:
+        paths = list(_active)
+        _active.clear()
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
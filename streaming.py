@@ -0,0 +1,173 @@
+"""Strumieniowa cenzura długich nagrań - okno po oknie.
+
+Potok składa się z generatorów: kolejne okna audio (cięte w miejscach ciszy)
+są rozpoznawane, przeszukiwane i od razu cenzurowane, a gotowy fragment
+wyniku jest dopisywany do pliku wyjściowego. Pierwsze ocenzurowane minuty
+pojawiają się po przetworzeniu pierwszego okna, a pamięć zależy od długości
+okna, nie całego nagrania. Ten sam układ generatorów może obsłużyć
+nagranie, które wciąż trwa.
+"""
+import os
+import tempfile
+
+from censor_effects import DEFAULT_EFFECT
+from censor_render import hits_to_regions
+from chunking import ENERGY_WINDOW_MS, find_quiet_frame_in_file
+from transcript_merge import shift_and_trim
+from wav_stream import copy_frames, open_writer, wav_params, write_censored_range
+
+DEFAULT_WINDOW_S = 60.0
+DEFAULT_OVERLAP_S = 1.0
+DEFAULT_SEARCH_S = 5.0
+
+INF = float('inf')
+
+
+def iter_windows(wav_file, window_s=DEFAULT_WINDOW_S, overlap_s=DEFAULT_OVERLAP_S, search_s=DEFAULT_SEARCH_S):
+    """Kolejne okna nagrania zakończone w miejscu ciszy, zachodzące na siebie o overlap_s.
+
+    Każde okno to słownik z czasami (s): start, end, keep_from, keep_until
+    (zakres, z którego bierzemy słowa) i next_start (początek następnego okna
+    albo None), oraz zakresem ramek start_frame, end_frame.
+    """
+    params = wav_params(wav_file)
+    rate = params.framerate
+    total = params.nframes
+    overlap_frames = int(overlap_s * rate)
+    search_frames = int(search_s * rate)
+    energy_window = max(rate * ENERGY_WINDOW_MS // 1000, 1)
+    # Jak w chunking.plan_wav_chunks: każde okno posuwa się o co najmniej sekundę
+    max_frames = max(int(window_s * rate), overlap_frames + search_frames + max(energy_window, rate))
+
+    start = 0
+    keep_from = 0.0
+    index = 0
+    while True:
+        if total - start <= max_frames:
+            end = total
+            next_start = None
+        else:
+            target = start + max_frames
+            lo = max(target - search_frames, start + overlap_frames + energy_window)
+            end = find_quiet_frame_in_file(wav_file, energy_window, lo, target)
+            next_start = max(end - overlap_frames, start + 1)
+
+        keep_until = INF if next_start is None else (next_start + end) / 2 / rate
+        yield {
+            'index': index,
+            'start': start / rate,
+            'end': end / rate,
+            'keep_from': keep_from,
+            'keep_until': keep_until,
+            'next_start': None if next_start is None else next_start / rate,
+            'start_frame': start,
+            'end_frame': end,
+        }
+        if next_start is None:
+            return
+        start = next_start
+        keep_from = keep_until
+        index += 1
+
+
+def transcribe_windows(wav_file, windows, transcribe, scratch_dir=None):
+    """Rozpoznaj kolejne okna; zwraca (okno, segmenty z czasami względem całego nagrania)"""
+    for window in windows:
+        temp_window = tempfile.NamedTemporaryFile(suffix=f"_okno_{window['index']}.wav", delete=False, dir=scratch_dir)
+        temp_window.close()
+        try:
+            copy_frames(wav_file, temp_window.name, window['start_frame'], window['end_frame'])
+            result = transcribe(temp_window.name)
+        finally:
+            try:
+                os.unlink(temp_window.name)
+            except OSError:
+                pass
+        if result is None:
+            raise RuntimeError(f"Nie udało się rozpoznać mowy w oknie {window['start']:.1f}s - {window['end']:.1f}s")
+        yield window, shift_and_trim(result, window['start'], window['keep_from'], window['keep_until'])
+
+
+def match_windows(stream, matcher):
+    """Wyszukaj słowa w kolejnych oknach; zwraca (okno, nowe trafienia, czas, do którego wynik jest ostateczny).
+
+    Ostatni segment okna jest dołączany do następnego, żeby znaleźć frazy
+    przechodzące przez granicę okien - audio od początku tego segmentu
+    nie może być jeszcze zapisane.
+    """
+    tail = []
+    seen = set()
+    for window, segments in stream:
+        hits = []
+        for hit in matcher.find_in_segments(tail + segments):
+            key = (hit['start'], hit['end'])
+            if key not in seen:
+                seen.add(key)
+                hits.append(hit)
+
+        if segments:
+            tail = segments[-1:]
+        final_until = INF if window['next_start'] is None else window['next_start']
+        if tail and window['next_start'] is not None:
+            final_until = min(final_until, tail[0]['start'])
+            seen = {key for key in seen if key[1] > tail[0]['start']}
+        yield window, hits, final_until
+
+
+def render_progressively(render_wav, stream, output_file, effect=DEFAULT_EFFECT, refine=None):
+    """Nakładaj cenzurę i dopisuj gotowe fragmenty do output_file w miarę napływu trafień.
+
+    refine (boundary_refine.BoundaryRefiner) dopasowuje granice nowych trafień;
+    zapis wstrzymujemy o refine.reach_s, bo początek trafienia może się cofnąć.
+
+    Zwraca po każdym oknie słownik postępu: window, hits (nowe trafienia),
+    total_hits, written (sekundy zapisanego wyniku), duration.
+    """
+    params = wav_params(render_wav)
+    rate = params.framerate
+    total = params.nframes
+    pending = []
+    written = 0
+    total_hits = 0
+
+    with open_writer(output_file, params) as out:
+        for window, hits, final_until in stream:
+            if refine is not None:
+                hits = refine(render_wav, hits)
+            pending.extend(hits)
+            total_hits += len(hits)
+            if final_until == INF:
+                flush_to = total
+            else:
+                reach = refine.reach_s if refine is not None else 0.0
+                flush_to = min(int((final_until - reach) * rate), total)
+            if flush_to > written:
+                regions = hits_to_regions(pending, rate, total)
+                write_censored_range(out, render_wav, params, regions, written, flush_to, effect=effect)
+                written = flush_to
+                # Zostaw tylko trafienia, które sięgają poza zapisaną część
+                pending = [h for h in pending if h['end'] * rate > written]
+            yield {
+                'window': window,
+                'hits': hits,
+                'total_hits': total_hits,
+                'written': written / rate,
+                'duration': total / rate,
+            }
+
+        if written < total:
+            regions = hits_to_regions(pending, rate, total)
+            write_censored_range(out, render_wav, params, regions, written, total, effect=effect)
+
+
+def censor_streaming(wav_file, render_wav, output_file, matcher, transcribe,
+                     window_s=DEFAULT_WINDOW_S, scratch_dir=None, effect=DEFAULT_EFFECT, refine=None):
+    """Cały potok strumieniowy: okna -> rozpoznawanie -> wyszukiwanie -> zapis.
+
+    wav_file służy do rozpoznawania, a cenzura jest nakładana na render_wav
+    (może mieć inny format, np. oryginalną jakość przy wideo).
+    """
+    windows = iter_windows(wav_file, window_s)
+    transcribed = transcribe_windows(wav_file, windows, transcribe, scratch_dir)
+    matched = match_windows(transcribed, matcher)
+    return render_progressively(render_wav, matched, output_file, effect, refine)
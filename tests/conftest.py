@@ -0,0 +1,29 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from censor_render import write_wav_samples  # noqa: E402
+
+
+class WavParams:
+    def __init__(self, framerate, nchannels, sampwidth=2):
+        self.framerate = framerate
+        self.nchannels = nchannels
+        self.sampwidth = sampwidth
+
+
+@pytest.fixture
+def make_wav(tmp_path):
+    """Zapisz tablicę próbek (ramki, kanały) int16 jako plik WAV; zwraca ścieżkę"""
+    def make(samples, rate=16000, name='input.wav'):
+        samples = np.asarray(samples, dtype=np.int16)
+        if samples.ndim == 1:
+            samples = samples[:, None]
+        path = str(tmp_path / name)
+        write_wav_samples(path, samples, WavParams(rate, samples.shape[1]))
+        return path
+    return make
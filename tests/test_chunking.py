@@ -0,0 +1,52 @@
+import numpy as np
+
+from chunking import DEFAULT_OVERLAP_S, plan_wav_chunks, split_wav_on_silence
+from wav_stream import wav_params
+
+RATE = 16000
+
+
+def speech_with_pauses(seconds, pause_every_s=5.0, pause_s=0.3):
+    """Szum (mowa) z ciszą pause_s przed każdą pełną wielokrotnością pause_every_s"""
+    rng = np.random.default_rng(0)
+    samples = rng.integers(-8000, 8000, size=int(seconds * RATE))
+    for end in np.arange(pause_every_s, seconds, pause_every_s):
+        samples[int((end - pause_s) * RATE):int(end * RATE)] = 0
+    return samples
+
+
+def test_chunks_cover_file_and_cut_in_silence(make_wav):
+    samples = speech_with_pauses(60)
+    path = make_wav(samples)
+    max_frames = 12 * RATE
+    overlap = int(DEFAULT_OVERLAP_S * RATE)
+
+    ranges = plan_wav_chunks(path, max_frames)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(samples)
+    for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert end - start <= max_frames
+        assert next_start == end - overlap
+        assert not samples[end - 100:end + 100].any()
+
+
+def test_small_limit_still_advances(make_wav):
+    path = make_wav(speech_with_pauses(20))
+
+    ranges = plan_wav_chunks(path, 1000)
+
+    assert len(ranges) <= 20
+    assert all(b[0] - a[0] >= RATE for a, b in zip(ranges, ranges[1:]))
+    assert ranges[-1][1] == 20 * RATE
+
+
+def test_split_writes_planned_ranges(make_wav, tmp_path):
+    path = make_wav(speech_with_pauses(30))
+    bytes_per_s = RATE * 2
+
+    chunks = split_wav_on_silence(path, 10 * bytes_per_s, out_dir=str(tmp_path))
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert wav_params(chunk['path']).nframes == round((chunk['end'] - chunk['start']) * RATE)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from censor_effects import EFFECTS
+from censor_render import read_wav_samples, render_censored_wav
+from wav_stream import censor_wav_streaming
+
+HITS = [
+    {'start': 0.213, 'end': 0.9},
+    {'start': 1.5, 'end': 2.37},
+    {'start': 2.2, 'end': 2.6},  # nachodzi na poprzednie
+    {'start': 3.9, 'end': 4.0},
+]
+
+
+@pytest.mark.parametrize('effect', EFFECTS)
+@pytest.mark.parametrize('block_seconds', [0.02, 0.37, 10])
+def test_streaming_matches_in_memory(make_wav, tmp_path, effect, block_seconds):
+    rng = np.random.default_rng(0)
+    src = make_wav(rng.integers(-8000, 8000, size=(16000 * 5, 2)))
+    in_memory = str(tmp_path / 'memory.wav')
+    streamed = str(tmp_path / 'stream.wav')
+
+    render_censored_wav(src, HITS, in_memory, effect=effect)
+    censor_wav_streaming(src, HITS, streamed, block_seconds=block_seconds, effect=effect)
+
+    expected, _ = read_wav_samples(in_memory)
+    assert not np.array_equal(expected, read_wav_samples(src)[0])
+    assert np.array_equal(read_wav_samples(streamed)[0], expected)
@@ -0,0 +1,37 @@
+import math
+
+import numpy as np
+
+from streaming import DEFAULT_OVERLAP_S, iter_windows
+from test_chunking import RATE, speech_with_pauses
+
+
+def test_windows_cover_file_and_end_in_silence(make_wav):
+    samples = speech_with_pauses(120)
+    path = make_wav(samples)
+
+    windows = list(iter_windows(path, window_s=20))
+
+    assert windows[0]['start_frame'] == 0
+    assert windows[-1]['end_frame'] == len(samples)
+    assert windows[-1]['next_start'] is None
+    assert math.isinf(windows[-1]['keep_until'])
+    for window, following in zip(windows, windows[1:]):
+        assert window['end_frame'] - window['start_frame'] <= 20 * RATE
+        assert following['start_frame'] == window['end_frame'] - int(DEFAULT_OVERLAP_S * RATE)
+        assert following['start'] == window['next_start']
+        # Zakresy, z których bierzemy słowa, dzielą oś czasu bez luk i zakładek
+        assert following['keep_from'] == window['keep_until']
+        assert window['start'] < window['keep_until'] < window['end']
+        end = window['end_frame']
+        assert not samples[end - 100:end + 100].any()
+    assert [w['index'] for w in windows] == list(range(len(windows)))
+
+
+def test_short_window_still_advances(make_wav):
+    path = make_wav(np.random.default_rng(1).integers(-8000, 8000, size=20 * RATE))
+
+    windows = list(iter_windows(path, window_s=1))
+
+    assert len(windows) <= 20
+    assert windows[-1]['end_frame'] == 20 * RATE
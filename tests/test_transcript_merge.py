@@ -0,0 +1,36 @@
+from transcript_merge import stitch_transcriptions
+
+
+def words_result(words):
+    """Wynik rozpoznawania segmentu: jeden segment na słowo (słowo, początek, koniec względem segmentu)"""
+    return {'segments': [
+        {'start': start, 'end': end, 'text': word, 'words': [{'word': word, 'start': start, 'end': end}]}
+        for word, start, end in words
+    ]}
+
+
+def test_overlap_words_are_kept_once_in_order():
+    # Segmenty [0, 10) i [9, 20) - zakładka 9-10 s, podział w 9,5 s
+    chunks = [{'start': 0.0, 'end': 10.0}, {'start': 9.0, 'end': 20.0}]
+    results = [
+        words_result([('jeden', 1.0, 1.5), ('dwa', 9.1, 9.3), ('trzy', 9.6, 9.9)]),
+        words_result([('dwa', 0.1, 0.3), ('trzy', 0.6, 0.9), ('cztery', 5.0, 5.5)]),
+    ]
+
+    merged = stitch_transcriptions(results, chunks)
+
+    words = [w for segment in merged['segments'] for w in segment['words']]
+    assert [w['word'] for w in words] == ['jeden', 'dwa', 'trzy', 'cztery']
+    assert [w['start'] for w in words] == [1.0, 9.1, 9.6, 14.0]
+
+
+def test_word_split_by_long_segment_is_trimmed():
+    chunks = [{'start': 0.0, 'end': 10.0}, {'start': 9.0, 'end': 20.0}]
+    first = {'segments': [{'start': 8.0, 'end': 9.9, 'text': 'a b', 'words': [
+        {'word': 'a', 'start': 8.0, 'end': 8.5}, {'word': 'b', 'start': 9.6, 'end': 9.9}]}]}
+    second = words_result([('b', 0.6, 0.9)])
+
+    merged = stitch_transcriptions([first, second], chunks)
+
+    assert [s['text'] for s in merged['segments']] == ['a', 'b']
+    assert merged['segments'][0]['end'] == 8.5
@@ -0,0 +1,203 @@
+"""Długo żyjąca usługa rozpoznawania mowy współdzielona przez zadania i wątki.
+
+Transcriber tworzy raz metody rozpoznawania (wybraną i zapasowe) dla danego
+modelu i ustawień; model lokalny, klient API z pulą połączeń i obiekt
+rozpoznawania Google żyją między plikami, więc kolejne zadania - z okna
+aplikacji, trybu wsadowego (-j), okien trybu strumieniowego - nie płacą
+za ich przygotowanie.
+
+Lokalne modele (Recognizer.serial) nie obsługują równoległych wywołań:
+żądania trafiają do kolejki obsługiwanej przez jeden wątek, który zbiera
+oczekujące żądania w paczki i przekazuje je do Recognizer.transcribe_batch.
+Metody bez tego ograniczenia (API) są wywoływane od razu w wątku zadania.
+"""
+import concurrent.futures
+import os
+import queue
+import threading
+
+from recognizers import create_recognizer, recognizer_chain
+
+DEFAULT_MAX_BATCH = 4
+WAIT_POLL_S = 0.1  # jak często czekające zadanie sprawdza, czy nie zostało przerwane
+
+
+class SerialWorker:
+    """Wątek obsługujący kolejkę żądań do jednej metody rozpoznawania, paczkami"""
+
+    def __init__(self, recognizer, max_batch=DEFAULT_MAX_BATCH):
+        self.recognizer = recognizer
+        self.max_batch = max(max_batch, 1)
+        self.requests = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._busy = threading.Lock()  # model jest zajęty (paczka z kolejki lub wywołanie w wątku zadania)
+        self._thread = threading.Thread(target=self._run, name=f"transcriber-{recognizer.name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, recognizer, wav_file):
+        """Dodaj żądanie (metoda z bind(), plik) do kolejki; zwraca Future z wynikiem"""
+        future = concurrent.futures.Future()
+        self._queue.put((future, recognizer, wav_file))
+        return future
+
+    def run_inline(self, recognizer, wav_file, checkpoint=None):
+        """Rozpoznaj w wątku wywołującym, gdy model nie jest zajęty (np. do profilowania etapu)"""
+        while not self._busy.acquire(timeout=WAIT_POLL_S):
+            if checkpoint:
+                checkpoint()
+        try:
+            self.requests += 1
+            self.batches += 1
+            return recognizer.transcribe(wav_file)
+        finally:
+            self._busy.release()
+
+    def stop(self):
+        self._queue.put(None)
+
+    def _next_batch(self):
+        """Pierwsze żądanie (z czekaniem) i te, które czekają już w kolejce; None po stop()"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # dokończ paczkę, zatrzymaj się przy następnej
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            # Żądania przerwanych zadań, które nie zdążyły się zacząć, są pomijane
+            batch = [item for item in batch if item[0].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            with self._busy:
+                self.requests += len(batch)
+                self.batches += 1
+                try:
+                    results = self.recognizer.transcribe_batch([(recognizer, wav) for _, recognizer, wav in batch])
+                except BaseException as e:
+                    results = [e] * len(batch)
+            for (future, _, _), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+
+def wait_for(future, checkpoint=None):
+    """Czekaj na wynik; checkpoint() (np. CensorPipeline.checkpoint) może przerwać czekanie wyjątkiem"""
+    while True:
+        try:
+            return future.result(timeout=WAIT_POLL_S if checkpoint else None)
+        except concurrent.futures.TimeoutError:
+            try:
+                checkpoint()
+            except BaseException:
+                future.cancel()  # jeszcze w kolejce - nie będzie rozpoznawane
+                raise
+
+
+class Transcriber:
+    """Metody rozpoznawania (wybrana i zapasowe) tworzone raz, bezpieczne do użycia z wielu wątków"""
+
+    def __init__(self, model="small", use_api=False, backend=None, max_batch=None):
+        self.model = model
+        self.use_api = use_api
+        self.backend = backend or os.getenv('WHISPER_BACKEND', 'auto')
+        self.max_batch = max_batch or int(os.getenv('TRANSCRIBER_BATCH', DEFAULT_MAX_BATCH))
+        self.chain = [
+            create_recognizer(name, model if name != 'api' else None)
+            for name in recognizer_chain(use_api, self.backend)
+        ]
+        self._workers = {}
+        self._lock = threading.Lock()
+
+    def settings(self):
+        """(metoda, model, temperatura) pierwszej metody - część klucza cache transkrypcji"""
+        if not self.chain:
+            return None, None, None
+        return self.chain[0].settings()
+
+    def transcribe(self, wav_file, log=None, progress=None, checkpoint=None, inline=False, **options):
+        """Rozpoznaj mowę wybraną metodą (po błędzie - kolejnymi metodami zapasowymi).
+
+        log, progress(gotowe, wszystkie) i options (np. scratch_dir, split_audio)
+        dotyczą tylko tego wywołania; metody, które danej opcji nie używają, ją pomijają.
+        inline - model lokalny też w wątku wywołującym, bez paczek (profilery widzą tylko ten wątek).
+        Zwraca parę ({'segments': [...]}, metoda, która dała wynik) albo (None, None),
+        jeśli żadna metoda nie zadziałała. Wynik metody zapasowej ma inne ustawienia
+        niż settings(), więc nie powinien trafić do cache pod ich kluczem.
+        """
+        log = log or print
+        if not self.chain:
+            log("❌ Brak dostępnych metod rozpoznawania mowy")
+            return None, None
+
+        log(f"Rozpoznawanie mowy: {self.chain[0].label}...")
+        for i, recognizer in enumerate(self.chain):
+            if i:
+                log(f"Próba użycia metody zapasowej: {recognizer.label}...")
+            bound = recognizer.bind(log, progress, **{name: value for name, value in options.items()
+                                                      if name in recognizer.call_options})
+            try:
+                return self.run(bound, wav_file, checkpoint, inline), recognizer
+            except Exception as e:
+                log(f"❌ Błąd {recognizer.label}: {str(e)}")
+        return None, None
+
+    def is_primary(self, recognizer):
+        """Czy to wybrana metoda (pierwsza w łańcuchu), a nie zapasowa"""
+        return bool(self.chain) and recognizer is self.chain[0]
+
+    def run(self, recognizer, wav_file, checkpoint=None, inline=False):
+        """Wywołaj metodę (z bind()) - przez kolejkę, jeśli model nie obsługuje równoległych wywołań"""
+        if not recognizer.serial:
+            return recognizer.transcribe(wav_file)
+        if inline:
+            return self._worker(recognizer).run_inline(recognizer, wav_file, checkpoint)
+        return wait_for(self._worker(recognizer).submit(recognizer, wav_file), checkpoint)
+
+    def _worker(self, recognizer):
+        with self._lock:
+            worker = self._workers.get(recognizer.name)
+            if worker is None:
+                template = next(r for r in self.chain if r.name == recognizer.name)
+                worker = self._workers[recognizer.name] = SerialWorker(template, self.max_batch)
+            return worker
+
+    def stats(self):
+        """Liczba żądań i paczek obsłużonych przez kolejki metod lokalnych"""
+        with self._lock:
+            return {name: {'requests': w.requests, 'batches': w.batches} for name, w in self._workers.items()}
+
+    def close(self):
+        """Zatrzymaj wątki kolejek (po obsłużeniu oczekujących żądań)"""
+        with self._lock:
+            workers, self._workers = list(self._workers.values()), {}
+        for worker in workers:
+            worker.stop()
+
+
+_transcribers = {}
+_transcribers_lock = threading.Lock()
+
+
+def get_transcriber(model="small", use_api=False, backend=None):
+    """Wspólny Transcriber dla danego modelu i ustawień (tworzony przy pierwszym użyciu)"""
+    key = (model, bool(use_api), backend or os.getenv('WHISPER_BACKEND', 'auto'))
+    with _transcribers_lock:
+        if key not in _transcribers:
+            _transcribers[key] = Transcriber(model, use_api, key[2])
+        return _transcribers[key]
@@ -0,0 +1,80 @@
+"""Sklejanie transkrypcji segmentów w jedną, z czasami względem całego nagrania.
+
+Słowa z zakładki między sąsiednimi segmentami są przypisywane do jednego
+segmentu według środka zakładki, więc żadne słowo nie jest zgubione ani
+zdublowane.
+"""
+import os
+
+
+def _keep_bounds(chunks):
+    """Dla każdego segmentu zakres czasu, z którego bierzemy słowa (podział w połowie zakładki)"""
+    bounds = []
+    for i, chunk in enumerate(chunks):
+        lo = float('-inf')
+        hi = float('inf')
+        if i > 0:
+            lo = (chunk['start'] + chunks[i - 1]['end']) / 2
+        if i + 1 < len(chunks):
+            hi = (chunks[i + 1]['start'] + chunk['end']) / 2
+        bounds.append((lo, hi))
+    return bounds
+
+
+def _offset_word(word, offset):
+    """Kopia słowa z czasami przesuniętymi o offset"""
+    shifted = word.copy()
+    shifted['start'] += offset
+    shifted['end'] += offset
+    return shifted
+
+
+def shift_and_trim(result, offset, lo=float('-inf'), hi=float('inf')):
+    """Przesuń czasy wyniku segmentu o offset i zostaw tylko słowa ze środkiem w [lo, hi)"""
+    merged_segments = []
+    if not result or 'segments' not in result:
+        return merged_segments
+    for segment in result['segments']:
+        words = segment.get('words') or []
+        if not words:
+            center = offset + (segment['start'] + segment['end']) / 2
+            if lo <= center < hi:
+                merged_segments.append(dict(segment, start=segment['start'] + offset,
+                                            end=segment['end'] + offset))
+            continue
+
+        shifted = [_offset_word(w, offset) for w in words]
+        kept = [w for w in shifted if lo <= (w['start'] + w['end']) / 2 < hi]
+        if not kept:
+            continue
+        adjusted_segment = dict(segment, words=kept)
+        adjusted_segment['start'] = segment['start'] + offset
+        adjusted_segment['end'] = segment['end'] + offset
+        if len(kept) != len(shifted):
+            adjusted_segment['start'] = kept[0]['start']
+            adjusted_segment['end'] = kept[-1]['end']
+            adjusted_segment['text'] = ' '.join(w['word'].strip() for w in kept)
+        merged_segments.append(adjusted_segment)
+    return merged_segments
+
+
+def stitch_transcriptions(results, chunks):
+    """Połącz wyniki segmentów w jedną transkrypcję z czasami względem całego nagrania.
+
+    Czasy słów są przesuwane o początek segmentu, a słowa z zakładki między
+    sąsiednimi segmentami są zachowywane tylko raz.
+    """
+    merged_segments = []
+    for result, chunk, (lo, hi) in zip(results, chunks, _keep_bounds(chunks)):
+        merged_segments.extend(shift_and_trim(result, chunk['start'], lo, hi))
+    return {'segments': merged_segments}
+
+
+def remove_chunk_files(chunks, keep=None):
+    """Usuń pliki tymczasowe segmentów (poza keep, np. oryginalnym plikiem)"""
+    for chunk in chunks:
+        if chunk['path'] != keep:
+            try:
+                os.unlink(chunk['path'])
+            except OSError:
+                pass
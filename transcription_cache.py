@@ -0,0 +1,138 @@
+"""Dyskowy cache transkrypcji kluczowany skrótem audio i ustawieniami rozpoznawania.
+
+Kluczem jest SHA-256 zdekodowanych ramek WAV (i ich formatu) połączony
+z metodą rozpoznawania, modelem, językiem i temperaturą. Ponowna cenzura
+tego samego nagrania (np. innego słowa) nie wymaga więc ponownej
+transkrypcji ani zapytań do API. Wpisy są zapisywane jako skompresowany
+JSON ze słowami w postaci krótkich list, a po przekroczeniu limitu rozmiaru
+usuwane są najdawniej używane.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import wave
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'censorship-recordings', 'transcripts')
+DEFAULT_CACHE_MB = 500
+FORMAT_VERSION = 1
+_HASH_BLOCK_FRAMES = 1 << 18
+
+
+def audio_fingerprint(wav_file):
+    """SHA-256 formatu i zdekodowanych ramek pliku WAV (niezależny od nazwy i metadanych)"""
+    digest = hashlib.sha256()
+    with wave.open(wav_file, 'rb') as wf:
+        digest.update(f"{wf.getnchannels()}:{wf.getsampwidth()}:{wf.getframerate()}:".encode())
+        while True:
+            raw = wf.readframes(_HASH_BLOCK_FRAMES)
+            if not raw:
+                break
+            digest.update(raw)
+    return digest.hexdigest()
+
+
+def cache_key(fingerprint, backend, model, language, temperature):
+    """Klucz wpisu: skrót audio + ustawienia rozpoznawania"""
+    settings = f"{fingerprint}|{backend}|{model}|{language}|{temperature}"
+    return hashlib.sha256(settings.encode('utf-8')).hexdigest()
+
+
+def _pack(transcription):
+    """Zwięzła postać transkrypcji: słowa jako [start, end, słowo, prawdopodobieństwo]"""
+    segments = []
+    for segment in transcription['segments']:
+        segments.append([
+            round(segment['start'], 3),
+            round(segment['end'], 3),
+            segment.get('text', ''),
+            [[round(w['start'], 3), round(w['end'], 3), w['word'], round(w.get('probability', 1.0), 4)]
+             for w in segment.get('words') or []],
+        ])
+    return {'v': FORMAT_VERSION, 's': segments}
+
+
+def _unpack(packed):
+    """Odtwórz format zwracany przez transcribe_audio"""
+    segments = []
+    for start, end, text, words in packed['s']:
+        segments.append({
+            'start': start,
+            'end': end,
+            'text': text,
+            'words': [{'start': ws, 'end': we, 'word': word, 'probability': p} for ws, we, word, p in words],
+        })
+    return {'segments': segments}
+
+
+class TranscriptionCache:
+    """Cache transkrypcji w katalogu na dysku z limitem rozmiaru (LRU)"""
+
+    def __init__(self, directory=None, max_size_mb=None):
+        self.directory = directory or os.getenv('TRANSCRIPTION_CACHE_DIR') or DEFAULT_CACHE_DIR
+        if max_size_mb is None:
+            max_size_mb = float(os.getenv('TRANSCRIPTION_CACHE_MB', DEFAULT_CACHE_MB))
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def get(self, key):
+        """Zwróć transkrypcję z cache lub None"""
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                packed = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if packed.get('v') != FORMAT_VERSION:
+            return None
+        try:
+            os.utime(path)  # oznacz jako ostatnio używany
+        except OSError:
+            pass
+        return _unpack(packed)
+
+    def put(self, key, transcription):
+        """Zapisz transkrypcję i usuń najstarsze wpisy po przekroczeniu limitu"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            json.dump(_pack(transcription), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Usuwaj najdawniej używane wpisy, dopóki cache przekracza limit rozmiaru"""
+        with self._lock:
+            try:
+                entries = []
+                for name in os.listdir(self.directory):
+                    if name.endswith('.json.gz'):
+                        stat = os.stat(os.path.join(self.directory, name))
+                        entries.append((stat.st_mtime, stat.st_size, name))
+            except OSError:
+                return
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_size_bytes:
+                    break
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                    total -= size
+                except OSError:
+                    pass
+
+
+_shared_cache = None
+
+
+def get_transcription_cache():
+    """Zwróć współdzielony cache transkrypcji"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = TranscriptionCache()
+    return _shared_cache
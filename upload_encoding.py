@@ -0,0 +1,116 @@
+"""Kompaktowy format audio do wysyłki do Whisper API.
+
+Zamiast surowego WAV (często 44,1/48 kHz stereo, ok. 600 MB na godzinę)
+wysyłamy mono 16 kHz - tyle i tak wykorzystuje Whisper - zakodowane przez
+ffmpeg do formatu, który API przyjmuje: MP3 32 kbit/s (ok. 14 MB na godzinę,
+domyślnie), Opus w kontenerze OGG lub bezstratny FLAC. Godzinne nagranie
+mieści się zwykle w jednym żądaniu.
+
+Gdy zakodowany plik przekracza limit, liczba segmentów jest wyliczana
+z rozmiaru po zakodowaniu (a nie z bajtów WAV), granice są cięte w ciszy
+(chunking.plan_wav_chunks), a każdy segment jest kodowany bezpośrednio
+z oryginalnego WAV.
+"""
+import math
+import os
+import tempfile
+
+from chunking import DEFAULT_OVERLAP_S, DEFAULT_SEARCH_S, plan_wav_chunks
+from ffmpeg_tools import run_ffmpeg
+from wav_stream import wav_params
+
+UPLOAD_SAMPLE_RATE = 16000
+DEFAULT_UPLOAD_FORMAT = 'mp3'
+DEFAULT_UPLOAD_BITRATE = '32k'
+SIZE_MARGIN = 0.9  # zapas na nierówną przepływność i zakładki segmentów
+MAX_SPLIT_ATTEMPTS = 4
+
+# Format -> (rozszerzenie, argumenty kodera); {bitrate} jest podstawiane
+UPLOAD_FORMATS = {
+    'mp3': ('.mp3', ['-c:a', 'libmp3lame', '-b:a', '{bitrate}']),
+    'opus': ('.ogg', ['-c:a', 'libopus', '-b:a', '{bitrate}', '-application', 'voip']),
+    'flac': ('.flac', ['-c:a', 'flac', '-compression_level', '8', '-sample_fmt', 's16']),
+    'wav': ('.wav', ['-c:a', 'pcm_s16le']),
+}
+
+
+def upload_format():
+    """Format wysyłki z UPLOAD_FORMAT (mp3, opus, flac lub wav - bez kompresji)"""
+    name = os.getenv('UPLOAD_FORMAT', DEFAULT_UPLOAD_FORMAT).lower()
+    if name not in UPLOAD_FORMATS:
+        raise ValueError(f"Nieznany format wysyłki: {name} (dostępne: {', '.join(UPLOAD_FORMATS)})")
+    return name
+
+
+def encode_range(wav_file, output_file, fmt, start_s=None, end_s=None, bitrate=None):
+    """Zakoduj (fragment) pliku WAV do formatu wysyłki: mono, 16 kHz"""
+    extension, codec = UPLOAD_FORMATS[fmt]
+    bitrate = bitrate or os.getenv('UPLOAD_BITRATE', DEFAULT_UPLOAD_BITRATE)
+    args = []
+    if start_s:
+        args += ['-ss', f"{start_s:.6f}"]
+    if end_s is not None:
+        args += ['-t', f"{end_s - (start_s or 0.0):.6f}"]
+    args += ['-i', wav_file, '-vn', '-ac', '1', '-ar', str(UPLOAD_SAMPLE_RATE)]
+    args += [a.format(bitrate=bitrate) for a in codec]
+    run_ffmpeg(args + [output_file])
+    return output_file
+
+
+def _temp_path(out_dir, suffix):
+    temp = tempfile.NamedTemporaryFile(suffix=suffix, delete=False, dir=out_dir)
+    temp.close()
+    return temp.name
+
+
+def prepare_upload(wav_file, max_bytes, fmt=None, out_dir=None):
+    """Zakoduj nagranie do wysyłki; zwraca segmenty {'path', 'start', 'end'} nie większe niż max_bytes.
+
+    Pliki segmentów są tymczasowe - usuwa je wywołujący (transcript_merge.remove_chunk_files).
+    """
+    fmt = fmt or upload_format()
+    extension = UPLOAD_FORMATS[fmt][0]
+    params = wav_params(wav_file)
+    rate = params.framerate
+    duration = params.nframes / rate
+
+    whole = _temp_path(out_dir, f"_upload{extension}")
+    try:
+        encode_range(wav_file, whole, fmt)
+    except BaseException:
+        os.unlink(whole)
+        raise
+    encoded_size = os.path.getsize(whole)
+    if encoded_size <= max_bytes:
+        return [{'path': whole, 'start': 0.0, 'end': duration}]
+    os.unlink(whole)
+
+    count = math.ceil(encoded_size / (max_bytes * SIZE_MARGIN))
+    for _ in range(MAX_SPLIT_ATTEMPTS):
+        # Cięcie w ciszy przed limitem i zakładka wydłużają segmenty - bez zapasu powstałby dodatkowy, krótki
+        slack = int((DEFAULT_OVERLAP_S + DEFAULT_SEARCH_S) * rate)
+        ranges = plan_wav_chunks(wav_file, math.ceil(params.nframes / count) + slack)
+        chunks = []
+        try:
+            for i, (start, end) in enumerate(ranges):
+                path = encode_range(wav_file, _temp_path(out_dir, f"_upload_{i}{extension}"), fmt,
+                                    start / rate, end / rate)
+                chunks.append({'path': path, 'start': start / rate, 'end': end / rate})
+        except BaseException:
+            _remove(chunks)
+            raise
+        largest = max(os.path.getsize(c['path']) for c in chunks)
+        if largest <= max_bytes:
+            return chunks
+        # Przepływność nierówna w czasie (np. FLAC) - więcej, krótszych segmentów
+        _remove(chunks)
+        count = math.ceil(count * largest / (max_bytes * SIZE_MARGIN))
+    raise RuntimeError(f"Nie udało się podzielić nagrania na segmenty mniejsze niż {max_bytes / (1024*1024):.1f}MB")
+
+
+def _remove(chunks):
+    for chunk in chunks:
+        try:
+            os.unlink(chunk['path'])
+        except OSError:
+            pass
@@ -0,0 +1,174 @@
+"""Wykrywanie mowy (VAD) przed rozpoznawaniem - pomijanie ciszy i przerw.
+
+Z nagrania wybierane są fragmenty z mową: domyślnie detektorem energii
+(RMS w oknach 30 ms liczone wektorowo, próg względem poziomu tła), a gdy
+zainstalowany jest webrtcvad i format na to pozwala (16 bit mono,
+8/16/32/48 kHz) - detektorem WebRTC, który odróżnia mowę także od muzyki.
+Fragmenty są sklejane w krótszy plik z krótkimi przerwami ciszy między nimi,
+a czasy słów z rozpoznawania są przeliczane z powrotem na oś czasu oryginału.
+"""
+import bisect
+import tempfile
+
+import numpy as np
+
+import backends
+from chunking import wav_window_energy
+from wav_stream import iter_raw_blocks, open_writer, wav_params
+
+VAD_FRAME_MS = 30
+THRESHOLD_DB = 12.0  # ile ponad poziom tła musi być okno z mową
+NOISE_PERCENTILE = 10
+ABSOLUTE_FLOOR_DBFS = -60.0  # poniżej zawsze cisza
+MIN_SPEECH_MS = 150
+MIN_SILENCE_MS = 500  # krótsze przerwy nie dzielą fragmentu
+PAD_MS = 200  # margines wokół mowy (początki i końce słów są ciche)
+JOIN_GAP_MS = 300  # cisza wstawiana między fragmentami w sklejonym pliku
+WEBRTC_AGGRESSIVENESS = 2
+WEBRTC_RATES = (8000, 16000, 32000, 48000)
+
+
+def energy_speech_flags(wav_file, frame_frames):
+    """Czy w kolejnych oknach jest mowa - detektor energii z progiem względem tła"""
+    params = wav_params(wav_file)
+    energy = wav_window_energy(wav_file, frame_frames)
+    if not len(energy):
+        return np.zeros(0, dtype=bool)
+    full_scale = float(1 << (8 * params.sampwidth - 1))
+    db = 10 * np.log10(np.maximum(energy, 1e-12) / (full_scale * full_scale))
+    floor = max(np.percentile(db, NOISE_PERCENTILE), ABSOLUTE_FLOOR_DBFS)
+    return db > floor + THRESHOLD_DB
+
+
+def webrtc_available(params):
+    """Czy można użyć webrtcvad dla tego formatu"""
+    return (backends.is_installed('webrtcvad') and params.nchannels == 1 and params.sampwidth == 2
+            and params.framerate in WEBRTC_RATES)
+
+
+def webrtc_speech_flags(wav_file, frame_frames, aggressiveness=WEBRTC_AGGRESSIVENESS):
+    """Czy w kolejnych oknach jest mowa - detektor WebRTC"""
+    params = wav_params(wav_file)
+    detector = backends.load('webrtcvad').Vad(aggressiveness)
+    frame_bytes = frame_frames * params.sampwidth
+    flags = []
+    leftover = b''
+    for _, raw in iter_raw_blocks(wav_file):
+        data = leftover + raw
+        usable = len(data) // frame_bytes * frame_bytes
+        for pos in range(0, usable, frame_bytes):
+            flags.append(detector.is_speech(data[pos:pos + frame_bytes], params.framerate))
+        leftover = data[usable:]
+    return np.array(flags, dtype=bool)
+
+
+def flags_to_regions(flags, frame_frames, total_frames, frame_rate):
+    """Zamień flagi okien na posortowane zakresy ramek [start, end) z mową.
+
+    Krótkie przerwy są wypełniane, zbyt krótkie zrywy odrzucane, a każdy
+    zakres poszerzany o margines.
+    """
+    if not len(flags) or not flags.any():
+        return []
+    # Początki i końce ciągów okien z mową
+    padded = np.concatenate([[False], flags, [False]])
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    runs = edges.reshape(-1, 2) * frame_frames
+
+    min_silence = MIN_SILENCE_MS * frame_rate // 1000
+    min_speech = MIN_SPEECH_MS * frame_rate // 1000
+    pad = PAD_MS * frame_rate // 1000
+
+    merged = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_silence:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    regions = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start = max(int(start) - pad, 0)
+        end = min(int(end) + pad, total_frames)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def detect_speech(wav_file, detector=None):
+    """Zakresy ramek z mową; detector: 'energy', 'webrtc' albo None (webrtc, jeśli dostępny)"""
+    params = wav_params(wav_file)
+    frame_frames = params.framerate * VAD_FRAME_MS // 1000
+    if detector is None:
+        detector = 'webrtc' if webrtc_available(params) else 'energy'
+    if detector == 'webrtc':
+        flags = webrtc_speech_flags(wav_file, frame_frames)
+    else:
+        flags = energy_speech_flags(wav_file, frame_frames)
+    return flags_to_regions(flags, frame_frames, params.nframes, params.framerate)
+
+
+class Timeline:
+    """Przeliczanie czasów ze sklejonego pliku na czasy oryginału"""
+
+    def __init__(self, pieces):
+        # pieces: [(początek w sklejonym pliku, początek w oryginale, długość)] w sekundach
+        self.pieces = pieces
+        self._starts = [p[0] for p in pieces]
+
+    def to_original(self, t):
+        """Czas w oryginale dla czasu t w sklejonym pliku (przerwy przypisane do krawędzi fragmentu)"""
+        if not self.pieces:
+            return t
+        i = max(bisect.bisect_right(self._starts, t) - 1, 0)
+        condensed_start, original_start, duration = self.pieces[i]
+        return original_start + min(max(t - condensed_start, 0.0), duration)
+
+    def remap(self, result):
+        """Kopia wyniku rozpoznawania z czasami segmentów i słów na osi oryginału"""
+        if not result or 'segments' not in result:
+            return result
+        segments = []
+        for segment in result['segments']:
+            words = [dict(w, start=self.to_original(w['start']), end=self.to_original(w['end']))
+                     for w in segment.get('words') or []]
+            segments.append(dict(segment, start=self.to_original(segment['start']),
+                                 end=self.to_original(segment['end']), words=words))
+        return dict(result, segments=segments)
+
+
+def condense_speech(wav_file, regions, output_file=None):
+    """Sklej fragmenty z mową w jeden plik WAV; zwraca (ścieżka, Timeline)"""
+    params = wav_params(wav_file)
+    rate = params.framerate
+    if output_file is None:
+        temp = tempfile.NamedTemporaryFile(suffix='_mowa.wav', delete=False)
+        temp.close()
+        output_file = temp.name
+
+    gap_frames = JOIN_GAP_MS * rate // 1000
+    silence = b'\0' * (gap_frames * params.nchannels * params.sampwidth)
+    if params.sampwidth == 1:
+        silence = b'\x80' * len(silence)  # WAV 8-bit jest bez znaku
+
+    pieces = []
+    written = 0
+    with open_writer(output_file, params) as out:
+        for i, (start, end) in enumerate(regions):
+            if i:
+                out.writeframesraw(silence)
+                written += gap_frames
+            pieces.append((written / rate, start / rate, (end - start) / rate))
+            for _, raw in iter_raw_blocks(wav_file, start, end):
+                out.writeframesraw(raw)
+            written += end - start
+    return output_file, Timeline(pieces)
+
+
+def speech_duration(regions, frame_rate):
+    """Łączna długość fragmentów z mową w sekundach"""
+    return sum(end - start for start, end in regions) / frame_rate
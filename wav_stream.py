@@ -0,0 +1,117 @@
+"""Strumieniowy odczyt i zapis plików WAV blok po bloku.
+
+Nic tutaj nie dekoduje całego nagrania do pamięci: długość jest czytana
+z nagłówka, podział na segmenty przesuwa się do odpowiednich ramek, a przy
+cenzurze bloki bez trafień są kopiowane bez zmian - do NumPy trafiają
+tylko bloki zawierające fragmenty do ocenzurowania. Zużycie pamięci zależy
+od rozmiaru bloku, a nie od długości nagrania.
+"""
+import wave
+
+from censor_render import bytes_to_samples, hits_to_regions, render_regions, samples_to_bytes
+
+DEFAULT_BLOCK_SECONDS = 10
+
+
+def wav_params(wav_file):
+    """Parametry pliku WAV (odczyt samego nagłówka)"""
+    with wave.open(wav_file, 'rb') as wf:
+        return wf.getparams()
+
+
+def wav_duration(wav_file):
+    """Długość nagrania w sekundach na podstawie nagłówka"""
+    params = wav_params(wav_file)
+    return params.nframes / params.framerate
+
+
+def block_frames_for(params, block_seconds=DEFAULT_BLOCK_SECONDS):
+    """Liczba ramek w bloku o podanej długości"""
+    return max(int(params.framerate * block_seconds), 1)
+
+
+def iter_raw_blocks(wav_file, start=0, end=None, block_seconds=DEFAULT_BLOCK_SECONDS):
+    """Zwracaj kolejne bloki surowych ramek (offset, bajty) z zakresu [start, end)"""
+    with wave.open(wav_file, 'rb') as wf:
+        params = wf.getparams()
+        end = params.nframes if end is None else min(end, params.nframes)
+        block = block_frames_for(params, block_seconds)
+        wf.setpos(start)
+        position = start
+        while position < end:
+            count = min(block, end - position)
+            raw = wf.readframes(count)
+            if not raw:
+                break
+            yield position, raw
+            position += len(raw) // (params.nchannels * params.sampwidth)
+
+
+def iter_blocks(wav_file, start=0, end=None, block_seconds=DEFAULT_BLOCK_SECONDS):
+    """Zwracaj kolejne bloki próbek (offset, tablica (ramki, kanały))"""
+    params = wav_params(wav_file)
+    for offset, raw in iter_raw_blocks(wav_file, start, end, block_seconds):
+        yield offset, bytes_to_samples(raw, params.sampwidth, params.nchannels)
+
+
+def read_frames(wav_file, start, end):
+    """Ramki [start, end) jako tablica (ramki, kanały) razem z numerem pierwszej ramki"""
+    with wave.open(wav_file, 'rb') as wf:
+        params = wf.getparams()
+        start = max(start, 0)
+        wf.setpos(start)
+        raw = wf.readframes(max(min(end, params.nframes) - start, 0))
+    return bytes_to_samples(raw, params.sampwidth, params.nchannels), start
+
+
+def open_writer(wav_file, params):
+    """Otwórz plik WAV do zapisu z tymi samymi parametrami co źródło"""
+    wf = wave.open(wav_file, 'wb')
+    wf.setnchannels(params.nchannels)
+    wf.setsampwidth(params.sampwidth)
+    wf.setframerate(params.framerate)
+    return wf
+
+
+def copy_frames(wav_file, output_file, start, end, block_seconds=DEFAULT_BLOCK_SECONDS):
+    """Skopiuj zakres ramek [start, end) do nowego pliku WAV bez dekodowania"""
+    params = wav_params(wav_file)
+    with open_writer(output_file, params) as out:
+        for _, raw in iter_raw_blocks(wav_file, start, end, block_seconds):
+            out.writeframesraw(raw)
+
+
+def write_censored_range(out, wav_file, params, regions, start, end, block_seconds=DEFAULT_BLOCK_SECONDS,
+                         effect='legacy'):
+    """Dopisz do out ramki [start, end) z wav_file, nakładając cenzurę z regions (posortowanych).
+
+    Bloki bez trafień są kopiowane bez dekodowania.
+    """
+    next_region = 0
+    for offset, raw in iter_raw_blocks(wav_file, start, end, block_seconds):
+        block_end = offset + len(raw) // (params.nchannels * params.sampwidth)
+        # Pomiń zakresy, które kończą się przed tym blokiem (lista jest posortowana)
+        while next_region < len(regions) and regions[next_region][1] <= offset:
+            next_region += 1
+        touching = []
+        i = next_region
+        while i < len(regions) and regions[i][0] < block_end:
+            if regions[i][1] > offset:
+                touching.append(regions[i])
+            i += 1
+
+        if touching:
+            samples = bytes_to_samples(raw, params.sampwidth, params.nchannels)
+            render_regions(samples, touching, params.framerate, params.sampwidth, offset=offset, effect=effect,
+                           read_original=lambda first, last: read_frames(wav_file, first, last))
+            raw = samples_to_bytes(samples, params.sampwidth)
+        out.writeframesraw(raw)
+
+
+def censor_wav_streaming(wav_file, hits, output_file, block_seconds=DEFAULT_BLOCK_SECONDS, effect='legacy'):
+    """Ocenzuruj plik WAV blok po bloku; bloki bez trafień są kopiowane bez zmian"""
+    params = wav_params(wav_file)
+    regions = hits_to_regions(hits, params.framerate, params.nframes)
+    with open_writer(output_file, params) as out:
+        write_censored_range(out, wav_file, params, regions, 0, params.nframes, block_seconds, effect)
+    return len(regions)
@@ -0,0 +1,166 @@
+"""Wyszukiwanie wielu słów i fraz w transkrypcji jednym przebiegiem.
+
+Lista słów (także wielowyrazowych fraz) jest zamieniana na drzewo prefiksowe
+(trie) znormalizowanych tokenów. Transkrypcja jest przechodzona raz, a
+w każdej pozycji drzewo jest schodzone tylko tak głęboko, jak długa jest
+najdłuższa fraza - koszt nie zależy od liczby słów na liście.
+
+Normalizacja: małe litery, usunięcie interpunkcji i polskich znaków
+diakrytycznych (ą->a, ł->l, ...) oraz opcjonalnie prosta redukcja końcówek
+fleksyjnych (kota, kotem, kotów -> kot).
+"""
+import re
+import unicodedata
+
+MATCH_MODES = ('whole', 'prefix')
+
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_DIACRITICS = str.maketrans({'ł': 'l', 'Ł': 'l', 'ø': 'o', 'đ': 'd'})
+
+# Końcówki fleksyjne (od najdłuższych) - wystarczające do dopasowania odmian, bez pełnej analizy morfologicznej
+_SUFFIXES = sorted([
+    'owie', 'ami', 'ach', 'owi', 'ego', 'emu', 'ych', 'ymi', 'imi', 'ich', 'iem', 'om', 'ow', 'ie',
+    'em', 'ej', 'mi', 'a', 'e', 'i', 'y', 'u', 'o',
+], key=len, reverse=True)
+_MIN_STEM = 3
+
+_TERMINAL = '\0'  # klucz węzła trie oznaczający koniec frazy
+_PREFIX_TERMINAL = '\1'  # klucz z frazami, których ostatni token dopasowujemy jako prefiks
+
+
+def fold(text):
+    """Małe litery bez polskich znaków diakrytycznych"""
+    text = text.lower().translate(_DIACRITICS)
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def stem(token):
+    """Usuń najdłuższą pasującą końcówkę fleksyjną, zostawiając co najmniej _MIN_STEM liter"""
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= _MIN_STEM:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text, inflection=True):
+    """Podziel tekst na znormalizowane tokeny"""
+    tokens = _TOKEN_RE.findall(fold(text))
+    return [stem(t) for t in tokens] if inflection else tokens
+
+
+class WordMatcher:
+    """Dopasowanie listy słów/fraz do transkrypcji w jednym przebiegu"""
+
+    def __init__(self, terms, mode='whole', inflection=True):
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Nieznany tryb dopasowania: {mode} (dostępne: {', '.join(MATCH_MODES)})")
+        self.mode = mode
+        self.inflection = inflection
+        self.max_length = 0
+        self._root = {}
+        for term in terms:
+            self.add(term)
+
+    def add(self, term):
+        """Dodaj słowo lub frazę do automatu"""
+        tokens = self._term_tokens(term)
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens[:-1]:
+            node = node.setdefault(token, {})
+        if self.mode == 'prefix':
+            node.setdefault(_PREFIX_TERMINAL, {})[tokens[-1]] = term
+        else:
+            node.setdefault(tokens[-1], {})[_TERMINAL] = term
+        self.max_length = max(self.max_length, len(tokens))
+
+    def _term_tokens(self, term):
+        tokens = _TOKEN_RE.findall(fold(term))
+        if not self.inflection:
+            return tokens
+        if self.mode == 'prefix':
+            # Ostatni token jest prefiksem - nie skracamy go, żeby nie poszerzać dopasowania
+            return [stem(t) for t in tokens[:-1]] + tokens[-1:]
+        return [stem(t) for t in tokens]
+
+    def _candidates(self, node, raw_token, stemmed_token):
+        """Węzły potomne i frazy zakończone na danym tokenie"""
+        child = node.get(stemmed_token)
+        ended = []
+        if child is not None and _TERMINAL in child:
+            ended.append(child[_TERMINAL])
+        prefixes = node.get(_PREFIX_TERMINAL)
+        if prefixes:
+            for end in range(1, len(raw_token) + 1):
+                term = prefixes.get(raw_token[:end])
+                if term is not None:
+                    ended.append(term)
+        return child, ended
+
+    def find(self, tokens):
+        """Znajdź wszystkie wystąpienia w liście tokenów [(tekst, start, end, słowo), ...].
+
+        Zwraca listę (indeks_początku, indeks_końca_włącznie, fraza).
+        """
+        normalized = [(raw, stem(raw) if self.inflection else raw) for raw in (t[0] for t in tokens)]
+        matches = []
+        for i in range(len(tokens)):
+            node = self._root
+            for j in range(i, min(i + self.max_length, len(tokens))):
+                raw, stemmed = normalized[j]
+                node, ended = self._candidates(node, raw, stemmed)
+                for term in ended:
+                    matches.append((i, j, term))
+                if node is None:
+                    break
+        return matches
+
+    def find_in_segments(self, segments):
+        """Znajdź wystąpienia w segmentach transkrypcji; zwraca trafienia {'start', 'end', 'word', 'term'}"""
+        tokens = transcript_tokens(segments)
+        hits = []
+        for first, last, term in self.find(tokens):
+            hits.append({
+                'start': tokens[first][1],
+                'end': tokens[last][2],
+                'word': ' '.join(dict.fromkeys(t[3] for t in tokens[first:last + 1])),
+                'term': term,
+            })
+        # Jedno słowo transkrypcji może dać kilka trafień (np. dwa pasujące terminy)
+        unique = {(h['start'], h['end']): h for h in hits}
+        return sorted(unique.values(), key=lambda h: (h['start'], h['end']))
+
+
+def transcript_tokens(segments):
+    """Spłaszcz transkrypcję do listy tokenów (tekst, start, end, oryginalne słowo).
+
+    Słowa z interpunkcją lub łącznikiem dają kilka tokenów z tymi samymi
+    czasami. Segmenty bez czasów słów są dzielone na tokeny z czasem całego
+    segmentu.
+    """
+    tokens = []
+    for segment in segments:
+        words = segment.get('words') or []
+        if words:
+            for word in words:
+                text = word['word'].strip()
+                for token in _TOKEN_RE.findall(fold(text)):
+                    tokens.append((token, word['start'], word['end'], text))
+        else:
+            for token in _TOKEN_RE.findall(fold(segment.get('text', ''))):
+                tokens.append((token, segment['start'], segment['end'], token))
+    return tokens
+
+
+def load_words(words, words_file):
+    """Połącz słowa z listy (np. z --word) i z pliku (jedno słowo lub fraza w linii, # to komentarz)"""
+    result = [w.strip() for w in words or [] if w.strip()]
+    if words_file:
+        with open(words_file, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    result.append(line)
+    return list(dict.fromkeys(result))